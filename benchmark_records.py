@@ -0,0 +1,110 @@
+"""Memory footprint of alert and coin records versus plain dicts.
+
+Usage: python benchmark_records.py [--alerts 100000] [--coins coingecko_coins.json]
+
+Builds 100k alerts and the full CoinGecko coin list (from the bot's coin list
+file when present, otherwise a synthetic list of the same size) both as the
+old JSON-shaped dicts and as AlertRecord/CoinRecord, and reports the traced
+allocation size of each.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DISCORD_TOKEN", "benchmark")
+
+import bot  # noqa: E402
+
+SYNTHETIC_COINS = 17_000
+
+
+def measure(label, build):
+    """Build a structure under tracemalloc and print its size."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {size / 1024 / 1024:8.2f} MB   {elapsed:6.2f}s")
+    return result, size
+
+
+def load_coin_dicts(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        return data['all_coins'] if isinstance(data, dict) else data
+    rng = random.Random(7)
+    return [{'id': f"coin-{i}", 'symbol': f"c{rng.randrange(6000)}", 'name': f"Coin {i}"}
+            for i in range(SYNTHETIC_COINS)]
+
+
+def make_alert_dicts(count, coins):
+    rng = random.Random(42)
+    # Real datetime.now().isoformat() output carries microseconds; older alerts have null fields
+    base = datetime.now()
+    alerts = {}
+    for i in range(count):
+        coin = coins[rng.randrange(min(len(coins), 500))]
+        user_id = str(100000 + rng.randrange(count // 10 or 1))
+        alerts.setdefault(user_id, []).append({
+            'coin_id': coin['id'],
+            'symbol': coin['symbol'].upper(),
+            'name': coin['name'],
+            'target_price': round(rng.uniform(0.01, 100000), 4),
+            'current_price': round(rng.uniform(0.01, 100000), 4),
+            'timestamp': (base - timedelta(microseconds=rng.randrange(30_000_000_000_000))).isoformat(),
+            'channel_id': 900000000000000000 + rng.randrange(50),
+            'user_id': user_id,
+            'user_name': f"user{user_id}",
+            'triggered': False,
+            'vs_currency': 'usd',
+            'last_checked_price': None if i % 3 else round(rng.uniform(0.01, 100000), 4)
+        })
+    return alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=100_000)
+    parser.add_argument('--coins', default=bot.COIN_LIST_FILE)
+    args = parser.parse_args()
+
+    coin_dicts = load_coin_dicts(args.coins)
+    coins_json = json.dumps(coin_dicts)
+    print(f"{len(coin_dicts):,} coins, {args.alerts:,} alerts\n")
+
+    # Coins: the old cache file stored all four structures, so json.load gave
+    # every coin four separate dicts
+    old_file = json.dumps(bot.build_coin_index(json.loads(coins_json)))
+    _, old_coins = measure("coins: dict cache loaded from file", lambda: json.loads(old_file))
+    _, new_coins = measure("coins: CoinRecord cache",
+                           lambda: bot.build_coin_index(bot.parse_coin_list(coins_json)))
+
+    alerts_json = json.dumps(make_alert_dicts(args.alerts, coin_dicts))
+    _, old_alerts = measure("alerts: dicts", lambda: json.loads(alerts_json))
+
+    def build_records():
+        data = json.loads(alerts_json)
+        return {user_id: [bot.AlertRecord.from_dict(a) for a in user_alerts]
+                for user_id, user_alerts in data.items()}
+
+    records, new_alerts = measure("alerts: AlertRecord", build_records)
+
+    roundtrip = {user_id: [a.to_dict() for a in user_alerts] for user_id, user_alerts in records.items()}
+    assert roundtrip == json.loads(alerts_json), "alert round trip is not lossless"
+
+    print(f"\nper coin:  {old_coins / len(coin_dicts):6.0f} B -> {new_coins / len(coin_dicts):6.0f} B")
+    print(f"per alert: {old_alerts / args.alerts:6.0f} B -> {new_alerts / args.alerts:6.0f} B")
+    print("alert round trip: lossless")
+
+
+if __name__ == '__main__':
+    main()
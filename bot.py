@@ -1,15 +1,36 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 import feedparser
 import requests
 import json
 import os
 import re
+import sys
 import random
 import asyncio
+import time
+import math
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+import logging.handlers
+import threading
+import queue
+import heapq
+import hashlib
+import sqlite3
+import secrets
+import gzip
+import weakref
+import abc
+import itertools
+import functools
+import contextvars
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import deque, namedtuple, OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 # Load environment variables
 load_dotenv()
@@ -23,30 +44,149 @@ ALERTS_CHANNEL_ID = int(os.getenv("ALERTS_CHANNEL_ID", 0))
 PRICE_CHANNEL_ID = int(os.getenv("PRICE_CHANNEL_ID", 0))
 NEWS_CHANNEL_ID = int(os.getenv("NEWS_CHANNEL_ID", 0))
 CHAT_CHANNEL_ID = int(os.getenv("CHAT_CHANNEL_ID", 0))
+STATS_CHANNEL_ID = int(os.getenv("STATS_CHANNEL_ID", 0))
+SLASH_GUILD_ID = int(os.getenv("SLASH_GUILD_ID", 0))
+SYNC_SLASH_COMMANDS = os.getenv("SYNC_SLASH_COMMANDS", "true").lower() == "true"
 
 # Validate required token
 if not TOKEN:
     raise ValueError("DISCORD_TOKEN not found in .env")
 
+# ==================== CACHE POLICY ====================
+# Subscribe to and cache only what the bot's features use. No command reads
+# member lists or reacts to reaction events, so both are off unless asked for.
+MESSAGE_CONTENT_INTENT = os.getenv("MESSAGE_CONTENT_INTENT", "true").lower() == "true"
+MEMBERS_INTENT = os.getenv("MEMBERS_INTENT", "false").lower() == "true"
+REACTION_EVENTS = os.getenv("REACTION_EVENTS", "false").lower() == "true"
+CHUNK_GUILDS_AT_STARTUP = os.getenv("CHUNK_GUILDS_AT_STARTUP", "false").lower() == "true"
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", 0))
+# discord.py disables the message cache below 100 messages
+MESSAGE_CACHE_SIZE = MAX_MESSAGES if MAX_MESSAGES >= 100 else None
+CHUNK_GUILDS = CHUNK_GUILDS_AT_STARTUP and MEMBERS_INTENT
+
+def build_intents():
+    """Gateway intents for the enabled features."""
+    intents = discord.Intents.none()
+    intents.guilds = True            # channel lookups for the alert/price/news/chat channels
+    intents.guild_messages = True    # prefix commands, mentions and keyword replies
+    intents.dm_messages = True       # prefix commands in DMs
+    # Prefix commands and chat replies need message content; slash commands do not
+    intents.message_content = MESSAGE_CONTENT_INTENT
+    intents.members = MEMBERS_INTENT
+    intents.guild_reactions = REACTION_EVENTS
+    return intents
+
+def describe_intents(intents):
+    """Comma-separated names of the enabled intents."""
+    return ', '.join(name for name, enabled in intents if enabled)
+
+intents = build_intents()
+COMMAND_PREFIX = '!'
 # Bot setup - DISABLE BUILT-IN HELP COMMAND
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.reactions = True
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+bot = commands.Bot(
+    command_prefix=COMMAND_PREFIX,
+    intents=intents,
+    help_command=None,
+    member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+    # The bot never looks messages up from the cache (the price board is held directly)
+    max_messages=MESSAGE_CACHE_SIZE,
+    chunk_guilds_at_startup=CHUNK_GUILDS
+)
+gateway_events = Counter()
 
 # ==================== FILES & CONSTANTS ====================
 ALERTS_FILE = 'crypto_alerts.json'
 COIN_LIST_FILE = 'coingecko_coins.json'
+HTTP_CACHE_FILE = os.getenv("HTTP_CACHE_FILE", 'http_cache.sqlite3')
+STATE_FILE = os.getenv("STATE_FILE", 'bot_state.json.gz')
+ALERT_ARCHIVE_FILE = os.getenv("ALERT_ARCHIVE_FILE", 'crypto_alerts_archive.sqlite3')
+ALERT_EXPIRY_DAYS = int(os.getenv("ALERT_EXPIRY_DAYS", 90))
+ALERT_HISTORY_DAYS = int(os.getenv("ALERT_HISTORY_DAYS", 180))
+ALERT_SWEEP_MINUTES = int(os.getenv("ALERT_SWEEP_MINUTES", 60))
+STATS_DASHBOARD_SECONDS = int(os.getenv("STATS_DASHBOARD_SECONDS", 60))
+STATE_SNAPSHOT_MINUTES = int(os.getenv("STATE_SNAPSHOT_MINUTES", 5))
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", 64))
 COIN_LIST_REFRESH_HOURS = int(os.getenv("COIN_LIST_REFRESH_HOURS", 24))
 UPDATE_INTERVAL = int(os.getenv("UPDATE_INTERVAL", 60))
 TOP_N = int(os.getenv("TOP_N", 20))
+CHAT_REPLY_COOLDOWN = int(os.getenv("CHAT_REPLY_COOLDOWN", 30))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 30))
+HOT_USER_RATE = int(os.getenv("HOT_USER_RATE", 3))
+HOT_CHANNEL_RATE = int(os.getenv("HOT_CHANNEL_RATE", 10))
+HOT_COOLDOWN_PER = float(os.getenv("HOT_COOLDOWN_PER", 10))
+FAN_OUT_CONCURRENCY = int(os.getenv("FAN_OUT_CONCURRENCY", 20))
+FAN_OUT_DEADLINE = float(os.getenv("FAN_OUT_DEADLINE", 8))
+PRICE_SOURCES = os.getenv("PRICE_SOURCES", "coingecko,mexc")
+PRICE_LOOKUP_TIMEOUT = float(os.getenv("PRICE_LOOKUP_TIMEOUT", 10))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", 1.0))
+PRICE_STATS_WINDOW = int(os.getenv("PRICE_STATS_WINDOW", 200))
+PRICE_SOURCE_WORKERS = int(os.getenv("PRICE_SOURCE_WORKERS", 16))
+CPU_POOL = os.getenv("CPU_POOL", "thread").lower()
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", 2))
+FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", 2))
+FUZZY_PREFIX_LENGTH = int(os.getenv("FUZZY_PREFIX_LENGTH", 6))
+MARKET_PAGES = int(os.getenv("MARKET_PAGES", 4))
+MARKET_PAGE_SIZE = 250
+MARKET_REFRESH_MINUTES = int(os.getenv("MARKET_REFRESH_MINUTES", 15))
+DESCRIPTION_TTL_HOURS = int(os.getenv("DESCRIPTION_TTL_HOURS", 24))
+DESCRIPTION_CACHE_SIZE = int(os.getenv("DESCRIPTION_CACHE_SIZE", 500))
+MEXC_SNAPSHOT_TTL = int(os.getenv("MEXC_SNAPSHOT_TTL", 30))
+ADAPTIVE_INTERVAL = os.getenv("ADAPTIVE_INTERVAL", "true").lower() in ("1", "true", "yes")
+MIN_UPDATE_INTERVAL = int(os.getenv("MIN_UPDATE_INTERVAL", 15))
+MAX_UPDATE_INTERVAL = int(os.getenv("MAX_UPDATE_INTERVAL", 300))
+VOLATILITY_WINDOW = int(os.getenv("VOLATILITY_WINDOW", 10))
+VOLATILITY_HIGH = float(os.getenv("VOLATILITY_HIGH", 0.002))
+VOLATILITY_LOW = float(os.getenv("VOLATILITY_LOW", 0.0005))
+NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", 300))
+PRICE_BATCH_SIZE = int(os.getenv("PRICE_BATCH_SIZE", 250))
+ALERT_SEND_CONCURRENCY = int(os.getenv("ALERT_SEND_CONCURRENCY", 5))
+ALERT_SEND_RETRIES = int(os.getenv("ALERT_SEND_RETRIES", 3))
+ALERT_RETRY_DELAY = float(os.getenv("ALERT_RETRY_DELAY", 5))
+FX_REFRESH_MINUTES = int(os.getenv("FX_REFRESH_MINUTES", 30))
+HIGH_LOW_ALERTS = os.getenv("HIGH_LOW_ALERTS", "true").lower() in ("1", "true", "yes")
+HIGH_LOW_MAX_COINS = int(os.getenv("HIGH_LOW_MAX_COINS", 200))
+KLINE_MAX_MINUTES = 1000
+PROFILE_DIR = os.getenv("PROFILE_DIR", 'profiles')
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 10))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 300))
+TRACE_FILE = os.getenv("TRACE_FILE", 'traces.jsonl')
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.05))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", 2000))
+TRACE_MAX_MB = int(os.getenv("TRACE_MAX_MB", 20))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", 3))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", 500))
+TRACE_CONTENT = os.getenv("TRACE_CONTENT", "false").lower() in ("1", "true", "yes")
+JOB_DEADLINE_FACTOR = float(os.getenv("JOB_DEADLINE_FACTOR", 2.0))
+JOB_JITTER = float(os.getenv("JOB_JITTER", 0.1))
+JOB_JITTER_MAX_SECONDS = float(os.getenv("JOB_JITTER_MAX_SECONDS", 30))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", 5))
+JOB_THREAD_WORKERS = int(os.getenv("JOB_THREAD_WORKERS", 8))
 
 # ==================== GLOBAL VARIABLES ====================
 coin_cache = {'by_id': {}, 'by_symbol': {}, 'by_name': {}, 'all_coins': []}
+coin_cache_lock = threading.Lock()  # held while swapping in a new coin_cache
 coin_list_last_updated = None
+coin_list_hash = None
 posted_news = set()
 auto_price_message = None
+stats_dashboard_message = None
+last_chat_reply = {}
+mexc_snapshot = {'tickers': [], 'updated': None}
+news_cache = {'items': [], 'updated': None}
+startup_complete = False
+warmup_status = {'coins': False, 'mexc': False, 'news': False}
+market_data = {'rows': {}, 'updated': None}
+market_data_lock = threading.Lock()  # writers build a new rows dict under it and swap; readers never lock
+description_cache = OrderedDict()
+fx_rates = {'rates': {'usd': 1.0}, 'units': {}, 'updated': None}
+resume_schedule = {}
+board_interval = {'seconds': UPDATE_INTERVAL, 'volatility': None}
+loop_schedule = {}
+profile_report_task = None
+last_alert_check = None
+alerts_generation = 0  # bumped by every save_alerts, so readers can tell the file changed
+alert_check_cache = None  # (alerts_generation, alerts) as check_alerts last saved them
+alerts_lock = asyncio.Lock()  # held across every load-modify-save of the alerts file; the I/O itself runs in threads
 
 # ==================== COIN SUPPORT ====================
 COINS = {
@@ -74,6 +214,16 @@ COIN_NAMES = {
     "link": "Chainlink"
 }
 
+# Coin command subcommand aliases -> canonical view (also the response cache key)
+COIN_SUBCOMMANDS = {
+    'price': 'price', 'p': 'price',
+    'volume': 'volume', 'vol': 'volume', 'v': 'volume',
+    'h/l': 'h/l', 'hl': 'h/l', 'highlow': 'h/l',
+    's/r': 's/r', 'sr': 's/r', 'supportresistance': 's/r',
+    'support': 'support',
+    'resistance': 'resistance'
+}
+
 # ==================== ENHANCED CHAT RESPONSES ====================
 CHAT_REPLIES = [
     # ENTHUSIASTIC RESPONSES
@@ -152,6 +302,26 @@ CRYPTO_KEYWORDS = {
     'trade': ['⚡', '📊', '🎮', '💎']
 }
 
+# Precompiled whole-word matchers, built once from the keyword table. Longest
+# keywords first so 'bitcoin' wins over 'btc' and 'eth' no longer matches 'something'.
+KEYWORD_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(CRYPTO_KEYWORDS, key=len, reverse=True)) + r')\b'
+)
+GREETING_PATTERN = re.compile(r'\b(gm|gn)\b')
+
+def match_crypto_keyword(content):
+    """Return the first crypto keyword in the (lower-cased) message, or None."""
+    match = KEYWORD_PATTERN.search(content)
+    return match.group(1) if match else None
+
+def chat_reply_allowed(channel_id):
+    """Allow at most one unsolicited chat reply per channel every CHAT_REPLY_COOLDOWN seconds."""
+    now = time.monotonic()
+    if now - last_chat_reply.get(channel_id, float('-inf')) < CHAT_REPLY_COOLDOWN:
+        return False
+    last_chat_reply[channel_id] = now
+    return True
+
 # ==================== FUNNY PRICE REACTIONS ====================
 PRICE_REACTIONS = {
     'big_pump': [
@@ -177,44 +347,931 @@ PRICE_REACTIONS = {
     ]
 }
 
+# ==================== COMPACT RECORDS ====================
+# Alerts and coins are held as __slots__ records instead of dicts. Both keep the
+# dict-style item access the rest of the bot uses and convert to and from the
+# JSON file shape.
+def iso_to_epoch(value):
+    """ISO timestamp string -> epoch seconds (float, keeping microseconds); None stays None."""
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def epoch_to_iso(value):
+    """Epoch seconds -> local ISO timestamp string, as stored in the alerts file."""
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+class CoinRecord:
+    """One CoinGecko coin; the same object is shared by every coin_cache index."""
+    __slots__ = ('id', 'symbol', 'name')
+
+    def __init__(self, id, symbol, name):
+        self.id = sys.intern(id)
+        self.symbol = sys.intern(symbol)
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['id'], data['symbol'], data['name'])
+
+    def to_dict(self):
+        return {'id': self.id, 'symbol': self.symbol, 'name': self.name}
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other):
+        return isinstance(other, CoinRecord) and self.id == other.id and \
+               self.symbol == other.symbol and self.name == other.name
+
+    def __hash__(self):
+        return hash((self.id, self.symbol, self.name))
+
+    def __repr__(self):
+        return f"CoinRecord({self.id!r}, {self.symbol!r}, {self.name!r})"
+
+class AlertRecord:
+    """One price alert.
+
+    `timestamp`, `triggered_at` and `last_checked_at` are kept as epoch seconds
+    (`created_at`, `triggered_ts`, `checked_ts`) and only rendered as ISO
+    strings in the file. Keys the
+    record has no slot for are kept in `extra`, and keys the file held as null
+    are remembered in `nulls`, so nothing is lost on a round trip.
+    """
+    __slots__ = ('unique_id', 'coin_id', 'symbol', 'name', 'target_price', 'current_price', 'created_at',
+                 'channel_id', 'user_id', 'user_name', 'triggered', 'vs_currency',
+                 'last_checked_price', 'triggered_ts', 'triggered_price', 'direction', 'checked_ts', 'extra', 'nulls')
+    FIELDS = ('unique_id', 'coin_id', 'symbol', 'name', 'target_price', 'current_price', 'channel_id',
+              'user_id', 'user_name', 'triggered', 'vs_currency', 'last_checked_price',
+              'triggered_price', 'direction')
+    INTERNED = ('coin_id', 'symbol', 'name', 'user_id', 'user_name', 'vs_currency', 'direction')
+    TIMESTAMPS = {'timestamp': 'created_at', 'triggered_at': 'triggered_ts', 'last_checked_at': 'checked_ts'}
+    KNOWN = frozenset(FIELDS) | frozenset(TIMESTAMPS)
+    NULL_SETS = {}  # shared frozensets for `nulls`; files tend to repeat the same few
+    KEY_ORDER = ('unique_id', 'coin_id', 'symbol', 'name', 'target_price', 'current_price', 'timestamp',
+                 'channel_id', 'user_id', 'user_name', 'triggered', 'vs_currency',
+                 'last_checked_price', 'last_checked_at', 'triggered_at', 'triggered_price', 'direction')
+
+    def __init__(self):
+        for slot in self.__slots__:
+            setattr(self, slot, None)
+
+    @classmethod
+    def from_dict(cls, data):
+        alert = cls()
+        get = data.get
+        for key in cls.FIELDS:
+            value = get(key)
+            if key in cls.INTERNED and value is not None:
+                value = sys.intern(value)
+            setattr(alert, key, value)
+        for key, slot in cls.TIMESTAMPS.items():
+            setattr(alert, slot, iso_to_epoch(get(key)))
+        if not cls.KNOWN.issuperset(data):
+            alert.extra = {key: value for key, value in data.items() if key not in cls.KNOWN}
+        nulls = frozenset(key for key in cls.KNOWN if key in data and data[key] is None)
+        if nulls:
+            alert.nulls = cls.NULL_SETS.setdefault(nulls, nulls)
+        return alert
+
+    def to_dict(self):
+        data = {}
+        nulls = self.nulls
+        timestamps = self.TIMESTAMPS
+        for key in self.KEY_ORDER:
+            slot = timestamps.get(key)
+            value = getattr(self, slot or key)
+            if value is not None:
+                data[key] = epoch_to_iso(value) if slot else value
+            elif nulls and key in nulls:
+                data[key] = None
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        """Known fields read as None when unset; only unknown keys raise KeyError."""
+        if key in self.TIMESTAMPS:
+            return epoch_to_iso(getattr(self, self.TIMESTAMPS[key]))
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.TIMESTAMPS:
+            setattr(self, self.TIMESTAMPS[key], iso_to_epoch(value))
+        elif key in self.FIELDS:
+            if key in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        """Like dict.get, but a None value also falls back to `default` (files hold nulls for unset fields)."""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+def to_json(obj):
+    """json.dump `default` hook for the record types."""
+    if isinstance(obj, (CoinRecord, AlertRecord)):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+# ==================== TRACING ====================
+# Every command invocation and task loop iteration is a trace; upstream HTTP
+# calls, Discord REST calls, alert store reads/writes and the traced() data
+# functions below open child spans. A trace is written out when it was sampled
+# (TRACE_SAMPLE_RATE) or when its root span took at least TRACE_SLOW_MS.
+TRACING_ENABLED = TRACE_SAMPLE_RATE > 0 or TRACE_SLOW_MS > 0
+current_span = contextvars.ContextVar('current_span', default=None)
+trace_logger = logging.getLogger('bot.traces')
+trace_logger.propagate = False
+trace_logger.setLevel(logging.INFO)
+trace_listener = None
+
+class Trace:
+    """The spans of one command or loop iteration."""
+    __slots__ = ('trace_id', 'spans', 'sampled', 'ids', 'dropped')
+
+    def __init__(self, sampled):
+        self.trace_id = secrets.token_hex(8)
+        self.spans = []
+        self.sampled = sampled
+        self.ids = itertools.count(1)
+        self.dropped = 0
+
+class Span:
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attrs', 'started', 'perf', 'duration', 'error')
+
+    def __init__(self, trace, name, parent_id, attrs):
+        self.trace = trace
+        self.span_id = next(trace.ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.started = time.time()
+        self.perf = time.perf_counter()
+        self.duration = None
+        self.error = None
+        trace.spans.append(self)  # list.append is atomic, so worker threads can add spans too
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self, error=None):
+        self.duration = time.perf_counter() - self.perf
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"[:200]
+
+    def to_dict(self):
+        return {
+            'trace': self.trace.trace_id,
+            'span': self.span_id,
+            'parent': self.parent_id,
+            'name': self.name,
+            'ts': round(self.started, 3),
+            'ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'attrs': self.attrs,
+            'error': self.error
+        }
+
+class NullSpan:
+    """Stands in for a span when nothing is being traced."""
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+NULL_SPAN = NullSpan()
+
+def start_trace_writer():
+    """Write spans from a background thread to the rotating TRACE_FILE."""
+    global trace_listener
+    handler = logging.handlers.RotatingFileHandler(
+        TRACE_FILE, maxBytes=TRACE_MAX_MB * 1024 * 1024, backupCount=TRACE_BACKUPS
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    trace_queue = queue.SimpleQueue()
+    trace_logger.addHandler(logging.handlers.QueueHandler(trace_queue))
+    trace_listener = logging.handlers.QueueListener(trace_queue, handler)
+    trace_listener.start()
+
+def begin_trace(name, **attrs):
+    """Open a root span and make it current; returns (span, token) for end_trace."""
+    if not TRACING_ENABLED:
+        return NULL_SPAN, None
+    root = Span(Trace(random.random() < TRACE_SAMPLE_RATE), name, None, attrs)
+    return root, current_span.set(root)
+
+def end_trace(root, token, error=None):
+    """Close a root span and export its trace if it was sampled or slow."""
+    if token is None:
+        return
+    current_span.reset(token)
+    root.finish(error)
+    trace = root.trace
+    if not (trace.sampled or root.duration * 1000 >= TRACE_SLOW_MS):
+        return
+    if trace_listener is None:
+        start_trace_writer()
+    if trace.dropped:
+        root.set(dropped_spans=trace.dropped)
+    for item in list(trace.spans):
+        trace_logger.info(json.dumps(item.to_dict(), default=str))
+
+@contextmanager
+def trace_root(name, **attrs):
+    root, token = begin_trace(name, **attrs)
+    try:
+        yield root
+    except BaseException as e:
+        end_trace(root, token, e)
+        raise
+    end_trace(root, token)
+
+@contextmanager
+def span(name, **attrs):
+    """Child span of the current span; a no-op outside a trace."""
+    parent = current_span.get()
+    if parent is None:
+        yield NULL_SPAN
+        return
+    trace = parent.trace
+    if len(trace.spans) >= TRACE_MAX_SPANS:
+        trace.dropped += 1
+        yield NULL_SPAN
+        return
+    child = Span(trace, name, parent.span_id, attrs)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.finish(e)
+        raise
+    finally:
+        current_span.reset(token)
+    child.finish()
+
+def traced(func):
+    """Run a blocking function inside a child span named after it."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_span.get() is None:
+            return func(*args, **kwargs)
+        with span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+def traced_loop(coro):
+    """Make each iteration of a task loop its own trace (apply under @tasks.loop)."""
+    @functools.wraps(coro)
+    async def wrapper(*args, **kwargs):
+        with trace_root(f"task:{coro.__name__}"):
+            return await coro(*args, **kwargs)
+    return wrapper
+
+def in_context(func):
+    """Bind func to a copy of the current context so executor threads keep the span."""
+    return functools.partial(contextvars.copy_context().run, func)
+
+# Every Discord REST call (send, edit, reaction, typing...) goes through HTTPClient.request
+discord_request = bot.http.request
+
+async def traced_discord_request(route, **kwargs):
+    if current_span.get() is None:
+        return await discord_request(route, **kwargs)
+    with span('discord', method=route.method, route=route.path):
+        return await discord_request(route, **kwargs)
+
+bot.http.request = traced_discord_request
+
+# ==================== WORKER POOL ====================
+# CPU-heavy parsing/sorting runs here instead of on the event-loop thread. The
+# default thread pool needs no pickling; CPU_POOL=process sidesteps the GIL for
+# jobs whose results are small, at the cost of pickling arguments and results.
+if CPU_POOL == 'process':
+    cpu_executor = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS)
+else:
+    cpu_executor = ThreadPoolExecutor(max_workers=CPU_POOL_WORKERS, thread_name_prefix='cpu')
+cpu_job_stats = {}
+
+def record_cpu_job(label, elapsed):
+    """Track per-job timings and log slow jobs."""
+    count, total = cpu_job_stats.get(label, (0, 0.0))
+    cpu_job_stats[label] = (count + 1, total + elapsed)
+    if elapsed > 0.1:
+        logging.info(f"CPU job '{label}' took {elapsed * 1000:.0f}ms")
+
+def run_cpu_job(label, func, *args):
+    """Run func(*args) on the worker pool from blocking code and wait for the result."""
+    started = time.perf_counter()
+    try:
+        with span(f"cpu:{label}"):
+            return cpu_executor.submit(func, *args).result()
+    finally:
+        record_cpu_job(label, time.perf_counter() - started)
+
+async def offload(label, func, *args):
+    """Run func(*args) on the worker pool without blocking the event loop."""
+    started = time.perf_counter()
+    try:
+        with span(f"cpu:{label}"):
+            return await asyncio.get_running_loop().run_in_executor(cpu_executor, func, *args)
+    finally:
+        record_cpu_job(label, time.perf_counter() - started)
+
+def quote_volume(ticker):
+    """Sort key for MEXC tickers."""
+    try:
+        return float(ticker.get("quoteVolume", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+def select_top_pairs(tickers, n):
+    """Pick the top n tickers by quote volume (partial selection, no full sort) as {COIN: PAIR}."""
+    top = heapq.nlargest(n, tickers, key=quote_volume)
+    return {item["symbol"].replace("USDT", ""): item["symbol"]
+            for item in top if "USDT" in item["symbol"]}
+
+def outranks(coin, current, ranks):
+    """Whether coin should replace current for a shared symbol/name: higher market cap wins.
+
+    Unranked coins never beat ranked ones; among unranked coins the later one wins,
+    matching the original list-order behaviour.
+    """
+    if current is None:
+        return True
+    coin_rank = ranks.get(coin['id'])
+    current_rank = ranks.get(current['id'])
+    if current_rank is None:
+        return True
+    return coin_rank is not None and coin_rank < current_rank
+
+def build_ranked_index(coins, field, ranks):
+    """{lower-cased field value: coin}, resolving collisions by market cap rank."""
+    index = {}
+    for coin in coins:
+        key = coin[field].lower()
+        if outranks(coin, index.get(key), ranks):
+            index[key] = coin
+    return index
+
+def build_coin_index(coins, ranks=None):
+    """Build the coin_cache lookup indexes from a CoinGecko coin list."""
+    ranks = ranks or {}
+    return {
+        'by_id': {coin['id'].lower(): coin for coin in coins},
+        'by_symbol': build_ranked_index(coins, 'symbol', ranks),
+        'by_name': build_ranked_index(coins, 'name', ranks),
+        'all_coins': coins
+    }
+
+def coin_list_digest(coins):
+    """Content hash of a coin list, independent of JSON formatting."""
+    canonical = json.dumps(coins, sort_keys=True, separators=(',', ':'), default=to_json)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def rebuild_coin_cache(current, coins, ranks=None):
+    """Apply a fresh coin list to the current indexes copy-on-write.
+
+    Only ids that were added, removed or renamed (symbol/name changed) touch the
+    indexes; unchanged coins keep their existing objects. Returns (new_cache, diff)
+    and never mutates `current`, so readers keep a consistent view until the caller
+    swaps the new cache in.
+    """
+    ranks = ranks or {}
+    old_by_id = current['by_id']
+    if not old_by_id:
+        return build_coin_index(coins, ranks), {'added': len(coins), 'removed': 0, 'renamed': 0}
+    
+    all_coins = []
+    seen_ids = set()
+    added, renamed = [], []
+    for coin in coins:
+        coin_id = coin['id'].lower()
+        seen_ids.add(coin_id)
+        old = old_by_id.get(coin_id)
+        if old is None:
+            added.append(coin)
+        elif old['symbol'] != coin['symbol'] or old['name'] != coin['name']:
+            renamed.append((old, coin))
+        else:
+            coin = old
+        all_coins.append(coin)
+    removed = [coin for coin_id, coin in old_by_id.items() if coin_id not in seen_ids]
+    
+    by_id = dict(old_by_id)
+    for coin in removed:
+        del by_id[coin['id'].lower()]
+    for coin in added:
+        by_id[coin['id'].lower()] = coin
+    for _, coin in renamed:
+        by_id[coin['id'].lower()] = coin
+    
+    # Symbol/name keys touched by the diff are re-resolved in one pass over the new list
+    changed = added + removed + [c for pair in renamed for c in pair]
+    touched = {
+        'by_symbol': {c['symbol'].lower() for c in changed},
+        'by_name': {c['name'].lower() for c in changed}
+    }
+    new_cache = {'by_id': by_id, 'all_coins': all_coins}
+    for index, field in (('by_symbol', 'symbol'), ('by_name', 'name')):
+        keys = touched[index]
+        winners = {}
+        for coin in all_coins:
+            key = coin[field].lower()
+            if key in keys and outranks(coin, winners.get(key), ranks):
+                winners[key] = coin
+        updated = dict(current[index])
+        for key in keys:
+            if key in winners:
+                updated[key] = winners[key]
+            else:
+                updated.pop(key, None)
+        new_cache[index] = updated
+    
+    return new_cache, {'added': len(added), 'removed': len(removed), 'renamed': len(renamed)}
+
+def read_coin_list_file(path, ranks=None):
+    """Load the coin list file into CoinRecords and index it.
+
+    Accepts the current {'all_coins': [...]} file as well as older files that
+    also carried the three lookup indexes.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    coins = data['all_coins'] if isinstance(data, dict) else data
+    return build_coin_index([CoinRecord.from_dict(coin) for coin in coins], ranks)
+
+def parse_coin_list(text):
+    """Parse a /coins/list response body into CoinRecords."""
+    return [CoinRecord.from_dict(coin) for coin in json.loads(text)]
+
+def write_json_file(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'), default=to_json)
+
+def search_coin_list(coins, query):
+    """Substring search over the coin list, best matches first."""
+    results = [coin for coin in coins
+               if query in coin['id'].lower() or
+                  query in coin['symbol'].lower() or
+                  query in coin['name'].lower()]
+    results.sort(key=lambda x: (
+        not (x['symbol'].lower() == query),
+        not (x['id'].lower() == query),
+        not (x['name'].lower() == query)
+    ))
+    return results
+
+# ==================== FUZZY COIN INDEX ====================
+def normalize_coin_term(text):
+    """Lower-case and drop everything but letters and digits ('Bitcoin Cash' == 'bitcoin-cash')."""
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+def _deletes(word, max_distance):
+    """All strings reachable from word by deleting up to max_distance characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+def edit_distance(a, b, max_distance):
+    """Damerau-Levenshtein (optimal string alignment) distance, or max_distance + 1 if larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class FuzzyCoinIndex:
+    """Symmetric-delete spelling index over coin ids, symbols and names.
+
+    Every term is stored under all strings reachable by deleting up to
+    FUZZY_MAX_DISTANCE characters from its first FUZZY_PREFIX_LENGTH characters.
+    A query generates its own deletes, so candidates within the edit distance
+    are found with a handful of dict lookups and only those are verified.
+    Built once per coin list load; treat instances as immutable.
+    """
+
+    # Lower is a better match when distances tie
+    FIELD_RANK = {'symbol': 0, 'id': 1, 'name': 1}
+
+    def __init__(self, coins, max_distance=FUZZY_MAX_DISTANCE, prefix_length=FUZZY_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.terms = []
+        self.term_coins = []
+        self.deletes = {}
+        
+        term_index = {}
+        for coin in coins:
+            for field in ('symbol', 'id', 'name'):
+                term = normalize_coin_term(coin[field])
+                if not term:
+                    continue
+                index = term_index.get(term)
+                if index is None:
+                    index = term_index[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.term_coins.append([])
+                entries = self.term_coins[index]
+                # id and name often normalize to the same term; keep the coin once
+                if not entries or entries[-1][0] is not coin:
+                    entries.append((coin, self.FIELD_RANK[field]))
+        
+        for index, term in enumerate(self.terms):
+            for key in _deletes(term[:prefix_length], max_distance):
+                # Most keys belong to one term; store a bare int until a second one shows up
+                current = self.deletes.get(key)
+                if current is None:
+                    self.deletes[key] = index
+                elif isinstance(current, int):
+                    self.deletes[key] = [current, index]
+                else:
+                    current.append(index)
+
+    def allowed_distance(self, term):
+        """Short queries get less slack, otherwise 'eth' would match half the symbol list."""
+        if len(term) <= 2:
+            return 0
+        if len(term) <= 5:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def lookup(self, query, limit=5):
+        """Ranked [(coin, distance)] for coins within the allowed edit distance of query."""
+        term = normalize_coin_term(query)
+        if not term:
+            return []
+        max_distance = self.allowed_distance(term)
+        
+        candidates = set()
+        for key in _deletes(term[:self.prefix_length], max_distance):
+            found = self.deletes.get(key)
+            if found is None:
+                continue
+            if isinstance(found, int):
+                candidates.add(found)
+            else:
+                candidates.update(found)
+        
+        best = {}
+        for index in candidates:
+            distance = edit_distance(term, self.terms[index], max_distance)
+            if distance > max_distance:
+                continue
+            for coin, field_rank in self.term_coins[index]:
+                market = market_rank(coin['id']) or float('inf')
+                rank = (distance, field_rank, market, abs(len(self.terms[index]) - len(term)))
+                if coin['id'] not in best or rank < best[coin['id']][0]:
+                    best[coin['id']] = (rank, coin)
+        
+        ranked = sorted(best.values(), key=lambda item: item[0])
+        return [(coin, rank[0]) for rank, coin in ranked[:limit]]
+
+fuzzy_index = FuzzyCoinIndex([])
+
+def coin_suggestions(identifier, limit=3):
+    """Coins the user may have meant: fuzzy matches first, then prefix matches."""
+    suggestions = [coin for coin, _ in fuzzy_index.lookup(identifier, limit)]
+    for coin in suggest_coins(identifier, limit):
+        if len(suggestions) >= limit:
+            break
+        if coin not in suggestions:
+            suggestions.append(coin)
+    return suggestions
+
+def not_found_message(identifier):
+    """'Couldnt find' reply with did-you-mean suggestions when there are any."""
+    suggestions = coin_suggestions(identifier)
+    if not suggestions:
+        return f"Couldnt find '{identifier}'. Try `!search {identifier}`"
+    options = ", ".join(f"**{c['name']}** (`{c['id']}`)" for c in suggestions)
+    return f"Couldnt find '{identifier}'. Did you mean: {options}?"
+
+# ==================== HTTP CACHE ====================
+# Seconds each kind of upstream response may be served from disk without asking again
+HTTP_CACHE_TTLS = {
+    'coin_list': COIN_LIST_REFRESH_HOURS * 3600,
+    'markets': MARKET_REFRESH_MINUTES * 60,
+    'coin_details': DESCRIPTION_TTL_HOURS * 3600,
+    'simple_price': 20,
+    'mexc_tickers': MEXC_SNAPSHOT_TTL,
+    'mexc_ticker': 10,
+    'mexc_price': 10,
+    'rss': NEWS_CACHE_TTL,
+    'exchange_rates': FX_REFRESH_MINUTES * 60
+}
+# Seconds past expiry a response may still be served while the upstream is down.
+# Price endpoints are missing on purpose: alerts and the board never act on old prices.
+HTTP_CACHE_MAX_STALE = {
+    endpoint: 3 * HTTP_CACHE_TTLS[endpoint]
+    for endpoint in ('coin_list', 'markets', 'coin_details', 'rss', 'exchange_rates')
+}
+
+class CachedResponse:
+    """The parts of requests.Response the fetchers use, for live and cached responses alike."""
+
+    def __init__(self, status_code, content, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+class HttpCache:
+    """Single-file SQLite cache of GET responses shared across restarts.
+
+    Entries are keyed by normalized URL + params and expire per endpoint TTL.
+    Expired entries with an ETag/Last-Modified are revalidated with a conditional
+    request, stale entries are served for up to HTTP_CACHE_MAX_STALE if the
+    upstream is down, and the least recently used entries are evicted once the
+    file grows past HTTP_CACHE_MAX_MB. Access times of fresh hits are kept in
+    memory and written with the next store, so hits never wait on a disk write.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.db = None
+        self.lock = threading.Lock()
+        self.accessed = {}
+        self.writes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, "
+                "expires_at REAL, accessed_at REAL, size INTEGER)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        return self.db
+
+    @staticmethod
+    def cache_key(url, params=None):
+        """Normalized URL: params merged into the query string and sorted."""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        query += [(k, str(v)) for k, v in (params or {}).items()]
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(sorted(query)), ''))
+
+    def _lookup(self, key):
+        with self.lock:
+            return self._connect().execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _touch(self, key):
+        """Note a hit for LRU eviction; flushed in batches with the next write."""
+        with self.lock:
+            self.accessed[key] = time.time()
+            if len(self.accessed) >= 500:
+                self._flush_accessed(self._connect())
+                self.db.commit()
+
+    def _flush_accessed(self, db):
+        if self.accessed:
+            db.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                           [(at, key) for key, at in self.accessed.items()])
+            self.accessed.clear()
+
+    def _renew(self, key, expires_at):
+        with self.lock:
+            db = self._connect()
+            self.accessed.pop(key, None)
+            db.execute("UPDATE responses SET accessed_at = ?, expires_at = ? WHERE key = ?",
+                       (time.time(), expires_at, key))
+            self._flush_accessed(db)
+            db.commit()
+
+    def _store(self, key, response, ttl):
+        now = time.time()
+        with self.lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 now + ttl, now, len(response.content))
+            )
+            self.accessed.pop(key, None)
+            self._flush_accessed(db)
+            db.commit()
+            self.writes += 1
+            if self.writes % 50 == 0:
+                self._evict(db)
+
+    def _evict(self, db):
+        """Drop least recently used entries until the cache is under 90% of its budget."""
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if freed >= target:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            freed += size
+        db.commit()
+        logging.info(f"HTTP cache evicted {freed / 1e6:.1f}MB")
+
+    def get(self, url, params=None, headers=None, timeout=10, endpoint=None, refresh=False):
+        """GET through the cache. `endpoint` picks the TTL; refresh=True skips the fresh-hit shortcut."""
+        ttl = HTTP_CACHE_TTLS.get(endpoint, 0)
+        if not ttl:
+            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            return CachedResponse(response.status_code, response.content)
+        
+        key = self.cache_key(url, params)
+        try:
+            row = self._lookup(key)
+        except sqlite3.Error as e:
+            logging.error(f"HTTP cache read failed: {e}")
+            row = None
+        
+        if row and not refresh and row[3] > time.time():
+            self.hits += 1
+            self._touch(key)
+            return CachedResponse(200, row[0], from_cache=True)
+        
+        request_headers = dict(headers or {})
+        if row and row[1]:
+            request_headers['If-None-Match'] = row[1]
+        if row and row[2]:
+            request_headers['If-Modified-Since'] = row[2]
+        
+        try:
+            response = requests.get(url, params=params, headers=request_headers, timeout=timeout)
+        except requests.RequestException:
+            if row and time.time() - row[3] <= HTTP_CACHE_MAX_STALE.get(endpoint, 0):
+                logging.warning(f"Upstream failed for {key}; serving stale cached response")
+                return CachedResponse(200, row[0], from_cache=True)
+            raise
+        
+        if response.status_code == 304 and row:
+            self.revalidated += 1
+            self._renew(key, time.time() + ttl)
+            return CachedResponse(200, row[0], from_cache=True)
+        
+        self.misses += 1
+        if response.status_code == 200:
+            try:
+                self._store(key, response, ttl)
+            except sqlite3.Error as e:
+                logging.error(f"HTTP cache write failed: {e}")
+        return CachedResponse(response.status_code, response.content)
+
+    def summary(self):
+        total = self.hits + self.revalidated + self.misses
+        rate = (self.hits + self.revalidated) / total if total else 0.0
+        return f"{rate:.0%} served from disk • {self.hits} hits, {self.revalidated} revalidated, {self.misses} fetched"
+
+http_cache = HttpCache(HTTP_CACHE_FILE, HTTP_CACHE_MAX_MB * 1024 * 1024)
+
+def http_get(url, params=None, headers=None, timeout=10, endpoint=None, refresh=False):
+    """Cached GET used by all upstream fetchers (see HttpCache.get)."""
+    if current_span.get() is None:
+        return http_cache.get(url, params=params, headers=headers, timeout=timeout, endpoint=endpoint, refresh=refresh)
+    parts = urlsplit(url)
+    with span('http', endpoint=endpoint, host=parts.netloc, path=parts.path) as s:
+        response = http_cache.get(url, params=params, headers=headers, timeout=timeout, endpoint=endpoint, refresh=refresh)
+        s.set(status=response.status_code, bytes=len(response.content), cached=response.from_cache)
+        return response
+
 # ==================== DATA FUNCTIONS ====================
-def get_top_coins(n=TOP_N):
-    """Fetch top N coins by 24h quote volume from MEXC."""
+@traced
+def get_mexc_tickers(max_age=None):
+    """Fetch the full MEXC 24h ticker list, reusing the snapshot while it is fresh.
+
+    Commands reuse it for MEXC_SNAPSHOT_TTL seconds; the price board passes
+    snapshot_ttl(), which stretches with the adaptive board interval.
+    """
+    global mexc_snapshot
+    
+    if max_age is None:
+        max_age = MEXC_SNAPSHOT_TTL
+    if mexc_snapshot['updated'] and time.time() - mexc_snapshot['updated'] < max_age:
+        return mexc_snapshot['tickers']
+    
+    # The snapshot does its own freshness check, so refresh=True skips the disk cache's
+    # fresh-hit shortcut (it would hand back a body up to another TTL old); the disk
+    # copy is only used when the upstream fails within its TTL
+    url = "https://api.mexc.com/api/v3/ticker/24hr"
+    data = http_get(url, timeout=10, endpoint='mexc_tickers', refresh=True).json()
+    if isinstance(data, list):
+        mexc_snapshot = {'tickers': data, 'updated': time.time()}
+    return data
+
+@traced
+def get_top_coins(n=TOP_N, max_age=None):
+    """Fetch top N coins by 24h quote volume from MEXC (see get_mexc_tickers for max_age)."""
     try:
-        url = "https://api.mexc.com/api/v3/ticker/24hr"
-        data = requests.get(url, timeout=10).json()
+        data = get_mexc_tickers(max_age)
         if not isinstance(data, list):
             return {}
-        sorted_data = sorted(data, key=lambda x: float(x.get("quoteVolume", 0)), reverse=True)[:n]
-        top_coins = {item["symbol"].replace("USDT", ""): item["symbol"] 
-                    for item in sorted_data if "USDT" in item["symbol"]}
-        return top_coins
+        return run_cpu_job('select top pairs', select_top_pairs, data, n)
     except Exception as e:
         logging.error(f"Error fetching top coins from MEXC: {e}")
         return {}
 
+def new_alert_id():
+    """Short random id that stays with an alert for its whole life."""
+    return secrets.token_hex(6)
+
 def load_alerts():
-    """Load existing alerts from file."""
-    try:
-        with open(ALERTS_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    """Load existing alerts from file as {user_id: [AlertRecord]}.
+
+    Alerts written before ids existed get one here; it sticks once the alerts
+    are next saved.
+    """
+    with span('alerts.load') as s:
+        try:
+            with open(ALERTS_FILE, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        alerts = {user_id: [AlertRecord.from_dict(a) for a in user_alerts] for user_id, user_alerts in data.items()}
+        s.set(users=len(alerts))
+    for user_alerts in alerts.values():
+        for alert in user_alerts:
+            if alert.unique_id is None:
+                alert.unique_id = new_alert_id()
+    return alerts
 
 def save_alerts(alerts):
-    """Save alerts to file."""
-    with open(ALERTS_FILE, 'w') as f:
-        json.dump(alerts, f, indent=4)
+    """Save alerts to file.
+
+    Written compact in one json.dumps call: json.dump and indent both force the
+    pure-Python encoder, which dominated a sweep over a large file.
+    """
+    global alerts_generation
+    with span('alerts.save', users=len(alerts)):
+        content = json.dumps(alerts, separators=(',', ':'), default=to_json)
+        # Replaced atomically, so a load running in another thread never reads a half-written file
+        tmp_path = f"{ALERTS_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, ALERTS_FILE)
+        alerts_generation += 1
 
+@traced
 def get_all_coingecko_coins(force_refresh=False):
-    """Fetch and cache all coins from CoinGecko."""
-    global coin_cache, coin_list_last_updated
+    """Fetch and cache all coins from CoinGecko.
+
+    Refreshes are incremental: the new list is diffed against the current one,
+    the indexes are rebuilt copy-on-write and published with a single reference
+    swap, and the cache file is only rewritten when the content hash changed.
+    """
+    global coin_cache, coin_list_last_updated, coin_list_hash, fuzzy_index
     
     if not force_refresh and os.path.exists(COIN_LIST_FILE):
         file_age = datetime.now().timestamp() - os.path.getmtime(COIN_LIST_FILE)
         if file_age < COIN_LIST_REFRESH_HOURS * 3600:
-            with open(COIN_LIST_FILE, 'r') as f:
-                coin_cache = json.load(f)
+            loaded = run_cpu_job('load coin list', read_coin_list_file, COIN_LIST_FILE, market_ranks())
+            coin_list_hash = run_cpu_job('hash coin list', coin_list_digest, loaded['all_coins'])
+            fuzzy_index = run_cpu_job('build fuzzy index', FuzzyCoinIndex, loaded['all_coins'])
+            with coin_cache_lock:
+                coin_cache = loaded
             coin_list_last_updated = datetime.fromtimestamp(os.path.getmtime(COIN_LIST_FILE))
             return coin_cache
     
@@ -228,31 +1285,32 @@ def get_all_coingecko_coins(force_refresh=False):
         if api_key:
             headers['x-cg-demo-api-key'] = api_key
         
-        response = requests.get(url, params=params, headers=headers, timeout=30)
+        # Revalidate instead of trusting the disk copy: the caller asked for a fresh list
+        response = http_get(url, params=params, headers=headers, timeout=30, endpoint='coin_list', refresh=True)
         
         if response.status_code == 200:
-            coins = response.json()
-            coin_cache = {
-                'by_id': {},
-                'by_symbol': {},
-                'by_name': {},
-                'all_coins': coins
-            }
-            
-            for coin in coins:
-                coin_id = coin['id'].lower()
-                symbol = coin['symbol'].lower()
-                name = coin['name'].lower()
-                
-                coin_cache['by_id'][coin_id] = coin
-                coin_cache['by_symbol'][symbol] = coin
-                coin_cache['by_name'][name] = coin
+            coins = run_cpu_job('parse coin list', parse_coin_list, response.text)
+            digest = run_cpu_job('hash coin list', coin_list_digest, coins)
             
-            with open(COIN_LIST_FILE, 'w') as f:
-                json.dump(coin_cache, f, indent=4)
+            if digest == coin_list_hash and coin_cache['all_coins']:
+                # Nothing changed: keep the current indexes and just mark the file fresh
+                if os.path.exists(COIN_LIST_FILE):
+                    os.utime(COIN_LIST_FILE)
+                logging.info(f"Coin list unchanged ({len(coins)} coins); skipped rebuild and rewrite")
+            else:
+                new_cache, diff = run_cpu_job('diff coin list', rebuild_coin_cache, coin_cache, coins, market_ranks())
+                new_fuzzy_index = run_cpu_job('build fuzzy index', FuzzyCoinIndex, new_cache['all_coins'])
+                with coin_cache_lock:
+                    coin_cache = new_cache  # single atomic reference swap
+                fuzzy_index = new_fuzzy_index
+                coin_list_hash = digest
+                run_cpu_job('write coin list', write_json_file, COIN_LIST_FILE, {'all_coins': coin_cache['all_coins']})
+                logging.info(
+                    f"Loaded {len(coins)} coins from CoinGecko "
+                    f"(+{diff['added']} added, -{diff['removed']} removed, ~{diff['renamed']} renamed)"
+                )
             
             coin_list_last_updated = datetime.now()
-            logging.info(f"Loaded {len(coins)} coins from CoinGecko")
             return coin_cache
         else:
             logging.error(f"Error fetching coin list: {response.status_code}")
@@ -266,14 +1324,13 @@ def load_cached_coins():
     """Load coins from cache file if API fails."""
     if os.path.exists(COIN_LIST_FILE):
         try:
-            with open(COIN_LIST_FILE, 'r') as f:
-                return json.load(f)
+            return read_coin_list_file(COIN_LIST_FILE, market_ranks())
         except:
             pass
     return {'by_id': {}, 'by_symbol': {}, 'by_name': {}, 'all_coins': []}
 
 def find_coin(identifier):
-    """Find coin by symbol, name, or CoinGecko ID."""
+    """Find coin by symbol, name, or CoinGecko ID, tolerating small typos."""
     identifier = identifier.lower().strip()
     
     if identifier in coin_cache['by_id']:
@@ -283,58 +1340,175 @@ def find_coin(identifier):
     elif identifier in coin_cache['by_name']:
         return coin_cache['by_name'][identifier]
     
-    for coin in coin_cache['all_coins']:
-        if identifier in coin['id'].lower() or \
-           identifier in coin['symbol'].lower() or \
-           identifier in coin['name'].lower():
-            return coin
+    # Typo tolerance: only resolve when one candidate is strictly closest
+    candidates = fuzzy_index.lookup(identifier, limit=2)
+    if len(candidates) == 1 or (len(candidates) == 2 and candidates[0][1] < candidates[1][1]):
+        return candidates[0][0]
     
     return None
 
+def suggest_coins(query, limit=25):
+    """Suggest coins whose symbol, id or name starts with the query (for autocomplete)."""
+    query = query.lower().strip()
+    if not query:
+        return []
+
+    suggestions = []
+    seen = set()
+    for index in ('by_symbol', 'by_id', 'by_name'):
+        coin = coin_cache[index].get(query)
+        if coin and coin['id'] not in seen:
+            suggestions.append(coin)
+            seen.add(coin['id'])
+
+    for coin in coin_cache['all_coins']:
+        if len(suggestions) >= limit:
+            break
+        if coin['id'] in seen:
+            continue
+        if coin['symbol'].lower().startswith(query) or \
+           coin['id'].lower().startswith(query) or \
+           coin['name'].lower().startswith(query):
+            suggestions.append(coin)
+            seen.add(coin['id'])
+
+    return suggestions[:limit]
+
+@traced
 def get_crypto_price(coin_id, vs_currency='usd'):
-    """Get current price for any coin from CoinGecko."""
+    """Get current price for any coin from the fastest healthy price source."""
     try:
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': coin_id,
-            'vs_currencies': vs_currency,
-            'include_market_cap': 'false',
-            'include_24hr_vol': 'false',
-            'include_24hr_change': 'false',
-            'include_last_updated_at': 'false'
-        }
-        
-        headers = {}
-        api_key = os.getenv('COINGECKO_API_KEY')
-        if api_key:
-            headers['x-cg-demo-api-key'] = api_key
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        data = response.json()
-        
-        if coin_id in data and vs_currency in data[coin_id]:
-            return data[coin_id][vs_currency]
-        return None
+        return price_router.get_price(coin_id, vs_currency)
     except Exception as e:
         logging.error(f"Error fetching price for {coin_id}: {e}")
         return None
 
+@traced
+def get_crypto_prices(coin_ids, vs_currency='usd'):
+    """Get current prices for many coins at once.
+
+    Uses batched CoinGecko /simple/price calls; coins a batch answered without
+    a price for are looked up individually through the price router. A failed
+    batch (rate limit, timeout) stops the remaining batches and its coins are
+    left out, rather than retried one by one while the upstream is struggling.
+    Returns {coin_id: price}.
+    """
+    coin_ids = list(dict.fromkeys(coin_ids))
+    prices = {}
+    answered = []
+    url = "https://api.coingecko.com/api/v3/simple/price"
+    for start in range(0, len(coin_ids), PRICE_BATCH_SIZE):
+        batch = coin_ids[start:start + PRICE_BATCH_SIZE]
+        try:
+            params = {'ids': ','.join(batch), 'vs_currencies': vs_currency}
+            response = http_get(url, params=params, headers=coingecko_headers(), timeout=10, endpoint='simple_price')
+            if response.status_code != 200:
+                raise requests.HTTPError(f"HTTP {response.status_code}")
+            data = response.json()
+            for coin_id in batch:
+                price = data.get(coin_id, {}).get(vs_currency)
+                if price is not None:
+                    prices[coin_id] = price
+            answered.extend(batch)
+        except Exception as e:
+            skipped = len(coin_ids) - start
+            logging.error(f"Error fetching batched prices ({len(batch)} coins): {e}; skipping {skipped} coins this round")
+            break
+    
+    remaining = [coin_id for coin_id in answered if coin_id not in prices]
+    if remaining:
+        results, _ = fan_out(lambda coin_id: get_crypto_price(coin_id, vs_currency), remaining)
+        prices.update(results)
+    return prices
+
+@traced
 def get_mexc_price(symbol):
     """Get price from MEXC exchange."""
     try:
         url = f"https://api.mexc.com/api/v3/ticker/24hr?symbol={symbol}"
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10, endpoint='mexc_ticker')
         data = response.json()
         return data
     except Exception as e:
         logging.error(f"Error fetching MEXC price for {symbol}: {e}")
         return None
 
+def get_mexc_klines(symbol, start_ms, end_ms):
+    """1-minute MEXC candles [open_ms, open, high, low, close, ...] between two epoch-ms times."""
+    url = "https://api.mexc.com/api/v3/klines"
+    params = {'symbol': symbol, 'interval': '1m', 'startTime': start_ms, 'endTime': end_ms, 'limit': KLINE_MAX_MINUTES}
+    data = http_get(url, params=params, timeout=10, endpoint='klines').json()
+    if not isinstance(data, list):
+        raise ValueError(f"unexpected /klines response for {symbol}: {str(data)[:100]}")
+    return data
+
+class KlineCache:
+    """Recent 1-minute candles per MEXC symbol as {open_ms: (high, low)}.
+
+    A window only asks MEXC for candles from the newest one already held
+    (re-reading it, since it may still have been open), so each check costs
+    one small request per symbol; a window reaching further back than the
+    held candles is fetched whole. Candles before the window are dropped.
+    """
+
+    def __init__(self):
+        self.candles = {}
+        self.lock = threading.Lock()
+
+    def window(self, symbol, since_ms, until_ms):
+        """[(open_ms, high, low)] of the candles overlapping since_ms..until_ms."""
+        first = since_ms - since_ms % 60000
+        with self.lock:
+            known = dict(self.candles.get(symbol, {}))
+        start = max(known) if known and min(known) <= first <= max(known) else first
+        start = max(start, until_ms - KLINE_MAX_MINUTES * 60000)
+        for row in get_mexc_klines(symbol, start, until_ms):
+            known[int(row[0])] = (float(row[2]), float(row[3]))
+        known = {open_ms: high_low for open_ms, high_low in known.items() if open_ms >= first}
+        with self.lock:
+            self.candles[symbol] = known
+        return sorted((open_ms, high, low) for open_ms, (high, low) in known.items() if open_ms <= until_ms)
+
+kline_cache = KlineCache()
+
+@traced
+def get_recent_candles(coin_ids, since, until):
+    """{coin_id: [(open_ms, high, low)]} in USD from MEXC 1-minute candles between two epoch times.
+
+    Only coins MEXC lists unambiguously (mexc_symbol_for) are covered; the
+    rest, and any coin whose candles fail to load, fall back to point samples.
+    """
+    if not HIGH_LOW_ALERTS:
+        return {}
+    symbols = {coin_id: mexc_symbol_for(coin_id) for coin_id in coin_ids}
+    symbols = {coin_id: symbol for coin_id, symbol in symbols.items() if symbol}
+    
+    def coin_candles(coin_id):
+        return kline_cache.window(f"{symbols[coin_id]}USDT", int(since * 1000), int(until * 1000))
+    
+    results, _ = fan_out(coin_candles, list(symbols))
+    return results
+
+def candle_range(candles, start_ms):
+    """(high, low) of the candles that opened at or after start_ms, or None.
+
+    A candle that opened before start_ms is left out even if it runs past it:
+    it cannot be split and part of its range predates the window. The partial
+    minute after start_ms is only covered by the point prices at either end.
+    """
+    highs, lows = [], []
+    for open_ms, high, low in candles:
+        if open_ms >= start_ms:
+            highs.append(high)
+            lows.append(low)
+    return (max(highs), min(lows)) if highs else None
+
+@traced
 def get_mexc_volume(symbol):
     """Get volume data from MEXC exchange."""
     try:
         url = f"https://api.mexc.com/api/v3/ticker/24hr?symbol={symbol}"
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10, endpoint='mexc_ticker')
         data = response.json()
         if data and 'quoteVolume' in data:
             return float(data['quoteVolume'])
@@ -344,22 +1518,31 @@ def get_mexc_volume(symbol):
         return None
 
 def parse_alert_input(input_str):
-    """Parse various input formats for alerts."""
+    """Parse various input formats for alerts.
+
+    Returns (coin_identifier, price, vs_currency); a currency code is only
+    recognised as the last word, after both the coin and the price, e.g.
+    `eth 0.05 btc` or `bitcoin 50000 eur`. Price-first input such as
+    `3000 eth` still reads the code as the coin.
+    """
     parts = re.split(r'[\s\-]+', input_str.lower())
     price = None
+    vs_currency = 'usd'
     coin_parts = []
     
-    for part in parts:
+    for index, part in enumerate(parts):
         clean_part = part.replace(',', '').replace('$', '')
         if clean_part.replace('.', '').isdigit() and '.' in clean_part:
             price = float(clean_part)
         elif clean_part.isdigit() and len(clean_part) > 3:
             price = float(clean_part)
+        elif price is not None and coin_parts and index == len(parts) - 1 and supported_currency(part):
+            vs_currency = part
         else:
             coin_parts.append(part)
     
     coin_identifier = ' '.join(coin_parts).strip()
-    return coin_identifier, price
+    return coin_identifier, price, vs_currency
 
 def fmt(p):
     """Format price with 4 decimal places."""
@@ -417,42 +1600,810 @@ def get_support_resistance_levels(coin_symbol):
         logging.error(f"Error calculating support/resistance: {e}")
         return None, None
 
-# ==================== FUN FUNCTIONS ====================
-def get_funny_price_reaction(change):
-    """Get funny reaction based on price change."""
-    if change > 10:
-        return random.choice(PRICE_REACTIONS['big_pump'])
-    elif change < -10:
-        return random.choice(PRICE_REACTIONS['big_dump'])
-    elif abs(change) < 2:
-        return random.choice(PRICE_REACTIONS['stable'])
-    else:
-        emoji = "🚀" if change > 0 else "📉"
-        return f"{emoji} Normal crypto things! Price is doing its dance!"
+# ==================== ALERT LIFECYCLE ====================
+class AlertArchive:
+    """SQLite store for alerts that are no longer live (triggered, expired, deleted).
 
-def get_random_emoji_combo():
-    """Get random emoji combination."""
-    combos = [
-        "🚀🔥💎", "⚡🎯💪", "🌙✨🪐", "💰📈🎉", "🤖🌐💻",
-        "🎮🔥⚡", "💎🤲🛡️", "📊🎯⚡", "🚀🌙🪐", "🔥💪🎯"
-    ]
-    return random.choice(combos)
+    The alerts file only holds active alerts; everything else is archived here
+    with the reason and time it left, kept for ALERT_HISTORY_DAYS and queried
+    per user by !alert_history.
+    """
 
-# ==================== NEWS FUNCTIONS ====================
-RSS_FEEDS = [
-    "https://www.coindesk.com/arc/outboundfeeds/rss/",
-    "https://cointelegraph.com/rss",
-    "https://cryptopotato.com/feed/",
-    "https://beincrypto.com/feed/"
-]
+    def __init__(self, path):
+        self.path = path
+        self.db = None
+        self.lock = threading.Lock()
 
-def get_crypto_news():
-    """Fetch latest news from RSS feeds."""
-    news_items = []
-    for feed_url in RSS_FEEDS:
-        try:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries[:5]:
+    def _connect(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "unique_id TEXT PRIMARY KEY, user_id TEXT, reason TEXT, archived_at INTEGER, data TEXT)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS alerts_user ON alerts (user_id, archived_at)")
+        return self.db
+
+    def add(self, alerts, reason, now=None):
+        """Archive AlertRecords with a reason ('triggered', 'expired', 'deleted', 'cleared')."""
+        if not alerts:
+            return
+        now = int(time.time()) if now is None else now
+        rows = [(a.unique_id or new_alert_id(), str(a.user_id), reason, now, json.dumps(a.to_dict()))
+                for a in alerts]
+        with self.lock, span('archive.add', reason=reason, alerts=len(rows)):
+            db = self._connect()
+            db.executemany("INSERT OR REPLACE INTO alerts VALUES (?, ?, ?, ?, ?)", rows)
+            db.commit()
+
+    def history(self, user_id, limit=10, reason=None):
+        """Most recently archived alerts of a user as [(reason, archived_at, AlertRecord)]."""
+        query = "SELECT reason, archived_at, data FROM alerts WHERE user_id = ?"
+        params = [str(user_id)]
+        if reason:
+            query += " AND reason = ?"
+            params.append(reason)
+        query += " ORDER BY archived_at DESC LIMIT ?"
+        params.append(limit)
+        with self.lock, span('archive.history'):
+            rows = self._connect().execute(query, params).fetchall()
+        return [(r, at, AlertRecord.from_dict(json.loads(data))) for r, at, data in rows]
+
+    def counts(self, user_id=None):
+        """{reason: count}, for one user or everyone."""
+        query = "SELECT reason, COUNT(*) FROM alerts"
+        params = []
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params.append(str(user_id))
+        with self.lock, span('archive.counts'):
+            return dict(self._connect().execute(query + " GROUP BY reason", params).fetchall())
+
+    def prune(self, older_than):
+        """Drop alerts archived before `older_than` (epoch seconds); returns {reason: count} dropped."""
+        with self.lock, span('archive.prune'):
+            db = self._connect()
+            removed = dict(db.execute(
+                "SELECT reason, COUNT(*) FROM alerts WHERE archived_at < ? GROUP BY reason", (older_than,)
+            ).fetchall())
+            if removed:
+                db.execute("DELETE FROM alerts WHERE archived_at < ?", (older_than,))
+                db.commit()
+        return removed
+
+alert_archive = AlertArchive(ALERT_ARCHIVE_FILE)
+
+def split_inactive(alerts, now=None):
+    """Remove triggered and expired alerts from `alerts` in place.
+
+    Returns (triggered, expired) lists of AlertRecords; users left without
+    alerts are dropped.
+    """
+    now = int(time.time()) if now is None else now
+    expire_before = now - ALERT_EXPIRY_DAYS * 86400 if ALERT_EXPIRY_DAYS else None
+    triggered, expired = [], []
+    for user_id in list(alerts):
+        live = []
+        for alert in alerts[user_id]:
+            if alert.triggered:
+                triggered.append(alert)
+            elif expire_before and alert.created_at and alert.created_at < expire_before:
+                expired.append(alert)
+            else:
+                live.append(alert)
+        if live:
+            alerts[user_id] = live
+        else:
+            del alerts[user_id]
+    return triggered, expired
+
+def sweep_alerts():
+    """Archive triggered/expired alerts, save the live set and apply history retention."""
+    alerts = load_alerts()
+    triggered, expired = split_inactive(alerts)
+    alert_archive.add(triggered, 'triggered')
+    alert_archive.add(expired, 'expired')
+    save_alerts(alerts)
+    # Triggered alerts found here were kept by older files; seed_stats never counted them as live
+    stats_registry.alerts_archived(triggered, 'triggered')
+    stats_registry.alerts_removed(expired, 'expired')
+    pruned = alert_archive.prune(int(time.time()) - ALERT_HISTORY_DAYS * 86400) if ALERT_HISTORY_DAYS else {}
+    stats_registry.archive_pruned(pruned)
+    if triggered or expired or pruned:
+        logging.info(f"Alert sweep: archived {len(triggered)} triggered, {len(expired)} expired; "
+                     f"pruned {sum(pruned.values())} old")
+
+# ==================== STATS REGISTRY ====================
+class RollingCounter:
+    """Event counts over a sliding window, kept in fixed-size time buckets.
+
+    Each bucket holds a Counter; a running total is kept alongside so reads
+    only have to drop the buckets that aged out.
+    """
+
+    def __init__(self, window, bucket=60):
+        self.window = window
+        self.bucket = bucket
+        self.buckets = deque()
+        self.total = Counter()
+
+    def _expire(self, now):
+        while self.buckets and self.buckets[0][0] <= now - self.window:
+            _, counts = self.buckets.popleft()
+            self.total.subtract(counts)
+
+    def add(self, key, count=1, now=None):
+        now = time.time() if now is None else now
+        self._expire(now)
+        start = now - now % self.bucket
+        if not self.buckets or self.buckets[-1][0] != start:
+            self.buckets.append((start, Counter()))
+        self.buckets[-1][1][key] += count
+        self.total[key] += count
+
+    def get(self, key, now=None):
+        self._expire(time.time() if now is None else now)
+        return self.total[key]
+
+class StatsRegistry:
+    """Counters behind !stats, updated as things happen instead of recomputed.
+
+    Live alert gauges are seeded once from the alerts file at startup and then
+    moved by alert_created/alerts_removed; events (alert created/triggered,
+    news posted, commands) also feed last-hour and last-day windows.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.alert_users = Counter()
+        self.alert_coins = Counter()
+        self.archived = Counter()
+        self.events = Counter()
+        self.command_usage = Counter()
+        self.hour = RollingCounter(3600)
+        self.day = RollingCounter(86400, bucket=900)
+        self.started = time.time()
+
+    def seed(self, alerts, archived):
+        """Initialise the live gauges from the untriggered alerts in the file and the archive counts."""
+        live = {user_id: [a for a in user_alerts if not a.triggered] for user_id, user_alerts in alerts.items()}
+        with self.lock:
+            self.alert_users = Counter({user_id: len(user_alerts) for user_id, user_alerts in live.items() if user_alerts})
+            self.alert_coins = Counter(a.coin_id for user_alerts in live.values() for a in user_alerts)
+            self.archived = Counter(archived)
+
+    def record(self, event, count=1):
+        with self.lock:
+            self.events[event] += count
+            self.hour.add(event, count)
+            self.day.add(event, count)
+
+    def alert_created(self, alert):
+        with self.lock:
+            self.alert_users[str(alert.user_id)] += 1
+            self.alert_coins[alert.coin_id] += 1
+        self.record('alerts_created')
+
+    def alerts_removed(self, alerts, reason):
+        """Live alerts that left the working set ('triggered', 'expired', 'deleted', 'cleared')."""
+        if not alerts:
+            return
+        with self.lock:
+            for alert in alerts:
+                for counter, key in ((self.alert_users, str(alert.user_id)), (self.alert_coins, alert.coin_id)):
+                    counter[key] -= 1
+                    if counter[key] <= 0:
+                        del counter[key]
+            self.archived[reason] += len(alerts)
+        self.record(f"alerts_{reason}", len(alerts))
+
+    def alerts_archived(self, alerts, reason):
+        """Records archived without ever being counted as live; only the archive counts move."""
+        if alerts:
+            with self.lock:
+                self.archived[reason] += len(alerts)
+
+    def archive_pruned(self, removed):
+        """{reason: count} dropped from the archive by retention."""
+        with self.lock:
+            self.archived.subtract(removed)
+            self.archived = +self.archived
+
+    def command_used(self, name):
+        with self.lock:
+            self.command_usage[name] += 1
+        self.record('commands')
+
+    def active_alerts(self):
+        return sum(self.alert_users.values())
+
+    def window(self, event):
+        """'hour / day' counts of an event."""
+        with self.lock:
+            return f"{self.hour.get(event):,} / {self.day.get(event):,}"
+
+    def top_commands(self, n=3):
+        with self.lock:
+            top = self.command_usage.most_common(n)
+        return ', '.join(f"{name} {count:,}" for name, count in top) or "None yet"
+
+stats_registry = StatsRegistry()
+
+# ==================== PROFILER ====================
+# Functions a thread sits in while it has nothing to do; those samples are counted, not stacked
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('queue.py', 'get'), ('selectors.py', 'select'),
+    ('threading.py', '_wait_for_tstate_lock'), ('thread.py', '_worker')
+}
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for the event loop and worker threads.
+
+    A daemon thread reads sys._current_frames() every PROFILE_INTERVAL_MS and
+    folds each busy thread's stack into a Counter keyed by the collapsed
+    stack. Event loop samples are rooted at the running task's label (the
+    command name set by tag(), otherwise the task name). Nothing runs while
+    the profiler is stopped.
+    """
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.idle = Counter()
+        self.labels = weakref.WeakKeyDictionary()
+        self.frame_names = {}
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.loop = None
+        self.loop_thread = None
+        self.started = None
+        self.elapsed = 0.0
+        self.samples = 0
+        self.sampler_cpu = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def tag(self, task, label):
+        """Label a task so its samples are attributed to it (e.g. a command name)."""
+        if task is not None:
+            self.labels[task] = label
+
+    def start(self, loop):
+        """Start sampling; call from the event loop thread."""
+        self.stacks.clear()
+        self.idle.clear()
+        self.frame_names.clear()
+        self.samples = 0
+        self.sampler_cpu = 0.0
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        self.started = time.time()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.thread = None
+        self.elapsed = time.time() - self.started if self.started else 0.0
+        self.labels = weakref.WeakKeyDictionary()
+
+    def _frame_name(self, code):
+        name = self.frame_names.get(code)
+        if name is None:
+            name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self.frame_names[code] = name
+        return name
+
+    def _task_label(self):
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            return 'event loop'
+        if task is None:
+            return 'event loop'
+        try:
+            return self.labels.get(task) or task.get_name()
+        except RuntimeError:  # weak dict resized by the loop thread mid-lookup
+            return task.get_name()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            cpu = time.thread_time()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                root = self._task_label() if ident == self.loop_thread else names.get(ident, str(ident))
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    self.idle[root] += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack.append(root)
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            self.sampler_cpu += time.thread_time() - cpu
+
+    def write_collapsed(self, path):
+        """Write 'root;outer;...;inner count' lines (flamegraph.pl / speedscope input)."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, n=10):
+        """(function, self samples, inclusive samples) for the busiest functions."""
+        own, inclusive = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        return [(name, count, inclusive[name]) for name, count in own.most_common(n)]
+
+    def top_labels(self, n=8):
+        labels = Counter()
+        for stack, count in self.stacks.items():
+            labels[stack.split(';', 1)[0]] += count
+        return labels.most_common(n)
+
+profiler = SamplingProfiler()
+
+# ==================== MARKET METADATA ====================
+# Compact per-coin market row, filled by paginated bulk /coins/markets pulls.
+# `fetched` is epoch seconds; rows restored from older snapshots default to 0 (stale).
+MarketRow = namedtuple('MarketRow', 'rank market_cap volume change_24h price fetched', defaults=(0,))
+
+def coingecko_headers():
+    """Auth headers for CoinGecko requests."""
+    headers = {}
+    api_key = os.getenv('COINGECKO_API_KEY')
+    if api_key:
+        headers['x-cg-demo-api-key'] = api_key
+    return headers
+
+def parse_market_row(item, fetched):
+    """Turn one /coins/markets entry into a MarketRow."""
+    return MarketRow(
+        item.get('market_cap_rank'),
+        item.get('market_cap'),
+        item.get('total_volume'),
+        item.get('price_change_percentage_24h'),
+        item.get('current_price'),
+        fetched
+    )
+
+def fetch_market_page(page, ids=None):
+    """Fetch one page of /coins/markets (or the given ids) as {coin_id: MarketRow}."""
+    url = "https://api.coingecko.com/api/v3/coins/markets"
+    params = {
+        'vs_currency': 'usd',
+        'order': 'market_cap_desc',
+        'per_page': MARKET_PAGE_SIZE,
+        'page': page,
+        'sparkline': 'false'
+    }
+    if ids:
+        params['ids'] = ','.join(ids)
+    data = http_get(url, params=params, headers=coingecko_headers(), timeout=15, endpoint='markets').json()
+    if not isinstance(data, list):
+        raise ValueError(f"unexpected /coins/markets response: {str(data)[:100]}")
+    fetched = time.time()
+    return {item['id']: parse_market_row(item, fetched) for item in data if 'id' in item}
+
+@traced
+def refresh_market_data():
+    """Pull the top MARKET_PAGES pages of market data and re-rank symbol collisions."""
+    global market_data, coin_cache
+    
+    started = time.perf_counter()
+    rows = {}
+    for page in range(1, MARKET_PAGES + 1):
+        try:
+            rows.update(fetch_market_page(page))
+        except Exception as e:
+            logging.error(f"Error fetching market page {page}: {e}")
+            break
+    if not rows:
+        return market_data
+    
+    # Keep rows fetched on demand for coins outside the bulk pages; get_market_row refetches them by age
+    with market_data_lock:
+        market_data = {'rows': {**market_data['rows'], **rows}, 'updated': time.time()}
+    
+    while coin_cache['all_coins']:
+        ranks = market_ranks()
+        cache = coin_cache
+        by_symbol = run_cpu_job('rank symbols', build_ranked_index, cache['all_coins'], 'symbol', ranks)
+        by_name = run_cpu_job('rank names', build_ranked_index, cache['all_coins'], 'name', ranks)
+        with coin_cache_lock:
+            # A coin list refresh may have swapped in new coins meanwhile; rank those instead
+            if coin_cache['all_coins'] is cache['all_coins']:
+                coin_cache = {**coin_cache, 'by_symbol': by_symbol, 'by_name': by_name}  # single reference swap
+                break
+    
+    logging.info(f"Market data refreshed: {len(rows)} coins in {time.perf_counter() - started:.2f}s")
+    return market_data
+
+def market_ranks():
+    """{coin_id: market cap rank} for every ranked coin in the market table."""
+    return {coin_id: row.rank for coin_id, row in market_data['rows'].items() if row.rank}
+
+def market_rank(coin_id):
+    """Market cap rank of a coin, or None if unranked/unknown."""
+    row = market_data['rows'].get(coin_id)
+    return row.rank if row else None
+
+@traced
+def get_market_row(coin_id):
+    """Market row for a coin, fetching just that coin if it is outside the bulk pages
+    or its row is older than MARKET_REFRESH_MINUTES (the last row is kept on errors)."""
+    global market_data
+    
+    row = market_data['rows'].get(coin_id)
+    if row is not None and time.time() - row.fetched < MARKET_REFRESH_MINUTES * 60:
+        return row
+    try:
+        rows = fetch_market_page(1, ids=[coin_id])
+    except Exception as e:
+        logging.error(f"Error fetching market row for {coin_id}: {e}")
+        return row
+    with market_data_lock:
+        # Copy-then-swap: other threads may be iterating the current rows dict
+        market_data = {**market_data, 'rows': {**market_data['rows'], **rows}}
+    return rows.get(coin_id, row)
+
+@traced
+def get_coin_description(coin_id):
+    """English description of a coin, lazily fetched and cached for DESCRIPTION_TTL_HOURS."""
+    cached = description_cache.get(coin_id)
+    if cached and time.time() - cached[0] < DESCRIPTION_TTL_HOURS * 3600:
+        description_cache.move_to_end(coin_id)
+        return cached[1]
+    
+    try:
+        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
+        # Skip the heavy parts of the document; only the description is needed
+        params = {
+            'localization': 'false',
+            'tickers': 'false',
+            'market_data': 'false',
+            'community_data': 'false',
+            'developer_data': 'false',
+            'sparkline': 'false'
+        }
+        response = http_get(url, params=params, headers=coingecko_headers(), timeout=10, endpoint='coin_details')
+        if response.status_code != 200:
+            return cached[1] if cached else None
+        description = response.json().get('description', {}).get('en', '')
+    except Exception as e:
+        logging.error(f"Error fetching description for {coin_id}: {e}")
+        return cached[1] if cached else None
+    
+    if len(description) > 300:
+        description = description[:300] + "..."
+    description_cache[coin_id] = (time.time(), description)
+    description_cache.move_to_end(coin_id)
+    while len(description_cache) > DESCRIPTION_CACHE_SIZE:
+        description_cache.popitem(last=False)
+    return description
+
+# ==================== FX RATES ====================
+# USD -> currency multipliers; every price is fetched in USD and converted locally
+@traced
+def refresh_fx_rates():
+    """Rebuild the conversion vector from CoinGecko /exchange_rates (BTC-based rates)."""
+    global fx_rates
+    
+    try:
+        url = "https://api.coingecko.com/api/v3/exchange_rates"
+        data = http_get(url, headers=coingecko_headers(), timeout=10, endpoint='exchange_rates').json()['rates']
+        usd = data['usd']['value']
+    except Exception as e:
+        logging.error(f"Error fetching exchange rates: {e}")
+        return fx_rates
+    
+    rates = {code: info['value'] / usd for code, info in data.items() if info.get('value')}
+    units = {code: (info.get('unit') or code.upper(), info.get('type')) for code, info in data.items()}
+    fx_rates = {'rates': rates, 'units': units, 'updated': time.time()}  # single reference swap
+    logging.info(f"Exchange rates refreshed: {len(rates)} currencies")
+    return fx_rates
+
+def supported_currency(code):
+    """True if prices can be converted to this currency code."""
+    return code.lower() in fx_rates['rates']
+
+def convert_price(usd_price, vs_currency='usd'):
+    """Convert a USD price to vs_currency, or None if either is unknown."""
+    rate = fx_rates['rates'].get(vs_currency.lower())
+    if usd_price is None or rate is None:
+        return None
+    return usd_price * rate
+
+def fmt_money(value, vs_currency='usd', decimals=2):
+    """Format an amount in its currency, e.g. $1,234.50, €1,100.00 or 0.0512 BTC."""
+    vs_currency = vs_currency.lower()
+    if vs_currency == 'usd':
+        return f"${value:,.{decimals}f}"
+    unit, kind = fx_rates['units'].get(vs_currency, (vs_currency.upper(), None))
+    if kind == 'fiat' and len(unit) == 1:
+        return f"{unit}{value:,.{decimals}f}"
+    if kind == 'fiat':
+        return f"{value:,.{decimals}f} {vs_currency.upper()}"
+    return f"{value:,.8f}".rstrip('0').rstrip('.') + f" {unit}"
+
+# ==================== FAN-OUT ====================
+# One shared pool bounds how many upstream requests all multi-symbol paths make at once
+fan_out_executor = ThreadPoolExecutor(max_workers=FAN_OUT_CONCURRENCY, thread_name_prefix='fan-out')
+
+def fan_out(func, items, deadline=FAN_OUT_DEADLINE):
+    """Call func(item) for every item in parallel, waiting at most `deadline` seconds.
+
+    Returns (results, missing): results maps item -> value in the original item
+    order for calls that returned a truthy value in time; missing lists the items
+    that timed out, failed or returned nothing.
+    """
+    futures = {item: fan_out_executor.submit(in_context(func), item) for item in items}
+    done, _ = wait(futures.values(), timeout=deadline)
+    
+    results = {}
+    missing = []
+    for item, future in futures.items():
+        if future in done and future.exception() is None and future.result():
+            results[item] = future.result()
+        else:
+            future.cancel()
+            missing.append(item)
+    
+    if missing:
+        logging.warning(f"Fan-out of {func.__name__} missing {len(missing)}/{len(futures)}: {', '.join(map(str, missing))}")
+    return results, missing
+
+def note_missing(embed, missing):
+    """Tell readers which symbols are missing from a partial fan-out result."""
+    if missing:
+        note = f"⚠️ No data for: {', '.join(missing)}"
+        embed.description = f"{embed.description}\n{note}" if embed.description else note
+
+# ==================== PRICE SOURCES ====================
+class PriceProvider(abc.ABC):
+    """A pluggable price source. Subclasses implement fetch() and may raise on failure."""
+    name = 'provider'
+
+    def supports(self, coin_id, vs_currency='usd'):
+        """False if this source can never price coin_id in vs_currency; it is then not asked."""
+        return True
+
+    @abc.abstractmethod
+    def fetch(self, coin_id, vs_currency='usd'):
+        """Return (price, from_cache): the current price of coin_id in vs_currency
+        (None if unknown) and whether it came from the HTTP cache."""
+
+class CoinGeckoProvider(PriceProvider):
+    """CoinGecko /simple/price; covers every coin in the coin list."""
+    name = 'coingecko'
+
+    def fetch(self, coin_id, vs_currency='usd'):
+        url = "https://api.coingecko.com/api/v3/simple/price"
+        params = {
+            'ids': coin_id,
+            'vs_currencies': vs_currency,
+            'include_market_cap': 'false',
+            'include_24hr_vol': 'false',
+            'include_24hr_change': 'false',
+            'include_last_updated_at': 'false'
+        }
+        
+        headers = {}
+        api_key = os.getenv('COINGECKO_API_KEY')
+        if api_key:
+            headers['x-cg-demo-api-key'] = api_key
+        
+        response = http_get(url, params=params, headers=headers, timeout=10, endpoint='simple_price')
+        data = response.json()
+        if coin_id in data and vs_currency in data[coin_id]:
+            return data[coin_id][vs_currency], response.from_cache
+        return None, response.from_cache
+
+class MexcProvider(PriceProvider):
+    """MEXC last trade price of the coin's USDT pair (USDT treated as USD).
+
+    Only answers for coins whose symbol unambiguously belongs to them, so a
+    same-ticker token on MEXC is never mistaken for the requested coin.
+    """
+    name = 'mexc'
+
+    def supports(self, coin_id, vs_currency='usd'):
+        return vs_currency == 'usd' and mexc_symbol_for(coin_id) is not None
+
+    def fetch(self, coin_id, vs_currency='usd'):
+        symbol = mexc_symbol_for(coin_id)
+        if vs_currency != 'usd' or not symbol:
+            return None, False
+        
+        url = "https://api.mexc.com/api/v3/ticker/price"
+        response = http_get(url, params={'symbol': f"{symbol}USDT"}, timeout=10, endpoint='mexc_price')
+        data = response.json()
+        if isinstance(data, dict) and 'price' in data:
+            return float(data['price']), response.from_cache
+        return None, response.from_cache
+
+def mexc_symbol_for(coin_id):
+    """Return the upper-case ticker MEXC lists coin_id under, or None if ambiguous."""
+    for symbol, watched_id in COINS.items():
+        if watched_id == coin_id:
+            return symbol.upper()
+    coin = coin_cache['by_id'].get(coin_id)
+    if coin and coin_cache['by_symbol'].get(coin['symbol'].lower(), {}).get('id') == coin_id:
+        return coin['symbol'].upper()
+    return None
+
+class ProviderStats:
+    """Rolling latency and error scoreboard for one price provider."""
+
+    def __init__(self, window=PRICE_STATS_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.successes = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self.lock:
+            self.latencies.append(latency)
+            if ok:
+                self.successes += 1
+            else:
+                self.errors += 1
+
+    def p95(self):
+        """95th percentile latency, or the default hedge delay until enough samples exist."""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < 5:
+            return HEDGE_DEFAULT_DELAY
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def error_rate(self):
+        total = self.successes + self.errors
+        return self.errors / total if total else 0.0
+
+    def score(self):
+        """Lower is better: tail latency, penalised by how often the provider fails."""
+        return self.p95() * (1 + 4 * self.error_rate())
+
+class PriceRouter:
+    """Query price providers best-first, hedging to the next one when the first is slow.
+
+    The primary request gets the provider's learned p95 latency to answer; after
+    that a second provider is asked in parallel and the first valid price wins.
+    """
+
+    def __init__(self, providers=()):
+        self.providers = []
+        self.stats = {}
+        self.executor = ThreadPoolExecutor(max_workers=PRICE_SOURCE_WORKERS, thread_name_prefix='price')
+        for provider in providers:
+            self.register(provider)
+
+    def register(self, provider):
+        """Add a provider (e.g. a local stand-in in tests) to the rotation."""
+        self.providers.append(provider)
+        self.stats[provider.name] = ProviderStats()
+
+    def ranked(self):
+        return sorted(self.providers, key=lambda p: self.stats[p.name].score())
+
+    def _timed_fetch(self, provider, coin_id, vs_currency):
+        started = time.perf_counter()
+        try:
+            price, from_cache = provider.fetch(coin_id, vs_currency)
+        except Exception as e:
+            self.stats[provider.name].record(time.perf_counter() - started, False)
+            logging.warning(f"Price source {provider.name} failed for {coin_id}: {e}")
+            return None
+        # Empty answers and disk-cache hits say nothing about the upstream's latency
+        if price is not None and not from_cache:
+            self.stats[provider.name].record(time.perf_counter() - started, True)
+        return price
+
+    def get_price(self, coin_id, vs_currency='usd', timeout=PRICE_LOOKUP_TIMEOUT):
+        """Return the first valid price from the ranked providers that can serve it, or None."""
+        waiting = [p for p in self.ranked() if p.supports(coin_id, vs_currency)]
+        pending = {}
+        deadline = time.monotonic() + timeout
+        hedge_due = False
+        
+        while waiting or pending:
+            if waiting and (not pending or hedge_due):
+                provider = waiting.pop(0)
+                pending[self.executor.submit(in_context(self._timed_fetch), provider, coin_id, vs_currency)] = provider
+                hedge_delay = self.stats[provider.name].p95()
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=min(hedge_delay, remaining) if waiting else remaining,
+                           return_when=FIRST_COMPLETED)
+            hedge_due = not done
+            
+            for future in done:
+                provider = pending.pop(future)
+                price = future.result()
+                if isinstance(price, (int, float)) and price > 0:
+                    return price
+        return None
+
+    def scoreboard(self):
+        """One line per provider, best first."""
+        return "\n".join(
+            f"{p.name}: p95 {self.stats[p.name].p95() * 1000:.0f}ms, "
+            f"errors {self.stats[p.name].error_rate():.0%}"
+            for p in self.ranked()
+        )
+
+PRICE_PROVIDERS = {
+    'coingecko': CoinGeckoProvider,
+    'mexc': MexcProvider
+}
+
+price_router = PriceRouter(
+    PRICE_PROVIDERS[name.strip()]() for name in PRICE_SOURCES.split(',') if name.strip() in PRICE_PROVIDERS
+)
+
+# ==================== FUN FUNCTIONS ====================
+def get_funny_price_reaction(change):
+    """Get funny reaction based on price change."""
+    if change > 10:
+        return random.choice(PRICE_REACTIONS['big_pump'])
+    elif change < -10:
+        return random.choice(PRICE_REACTIONS['big_dump'])
+    elif abs(change) < 2:
+        return random.choice(PRICE_REACTIONS['stable'])
+    else:
+        emoji = "🚀" if change > 0 else "📉"
+        return f"{emoji} Normal crypto things! Price is doing its dance!"
+
+def get_random_emoji_combo():
+    """Get random emoji combination."""
+    combos = [
+        "🚀🔥💎", "⚡🎯💪", "🌙✨🪐", "💰📈🎉", "🤖🌐💻",
+        "🎮🔥⚡", "💎🤲🛡️", "📊🎯⚡", "🚀🌙🪐", "🔥💪🎯"
+    ]
+    return random.choice(combos)
+
+# ==================== NEWS FUNCTIONS ====================
+RSS_FEEDS = [
+    "https://www.coindesk.com/arc/outboundfeeds/rss/",
+    "https://cointelegraph.com/rss",
+    "https://cryptopotato.com/feed/",
+    "https://beincrypto.com/feed/"
+]
+
+@traced
+def get_crypto_news(force_refresh=False):
+    """Fetch latest news from RSS feeds, reusing the news cache while it is fresh."""
+    global news_cache
+    
+    if not force_refresh and news_cache['updated'] and time.time() - news_cache['updated'] < NEWS_CACHE_TTL:
+        return news_cache['items']
+    
+    news_items = []
+    for feed_url in RSS_FEEDS:
+        try:
+            response = http_get(feed_url, timeout=10, endpoint='rss', refresh=force_refresh)
+            feed = run_cpu_job('parse feed', feedparser.parse, response.content)
+            for entry in feed.entries[:5]:
                 source = "CoinDesk" if "coindesk" in feed_url else \
                          "CoinTelegraph" if "cointelegraph" in feed_url else \
                          "CryptoPotato" if "cryptopotato" in feed_url else "BeInCrypto"
@@ -468,6 +2419,8 @@ def get_crypto_news():
     
     # Sort by publication date if available
     news_items.sort(key=lambda x: x.get('published', ''), reverse=True)
+    if news_items:
+        news_cache = {'items': news_items, 'updated': time.time()}
     return news_items
 
 # ==================== ENHANCED HELPER FUNCTIONS ====================
@@ -508,95 +2461,739 @@ async def send_to_chat_channel(content):
         except Exception as e:
             logging.error(f"Error sending to chat channel: {e}")
 
-# ==================== ENHANCED TASKS ====================
-@tasks.loop(minutes=5)
-async def check_alerts():
-    """Background task to check alerts every 5 minutes."""
-    alerts = load_alerts()
-    if not alerts:
+# ==================== ALERT NOTIFICATIONS ====================
+class AlertNotifier:
+    """Delivers triggered alerts from a queue with bounded parallelism.
+
+    Triggers for the same user and channel are grouped into one digest embed,
+    each destination is a separate delivery job, and failed sends are retried
+    with exponential backoff up to ALERT_SEND_RETRIES times.
+    """
+
+    def __init__(self, concurrency=ALERT_SEND_CONCURRENCY):
+        self.concurrency = concurrency
+        self.queue = asyncio.Queue()
+        self.workers = []
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=200)
+
+    def start(self):
+        """Start the delivery workers (idempotent)."""
+        if not self.workers:
+            # Fresh contexts: workers outlive whatever trace was current when they started
+            self.workers = [asyncio.create_task(self.worker(), context=contextvars.Context())
+                            for _ in range(self.concurrency)]
+
+    def submit(self, triggered):
+        """Group (user_id, alert) triggers into digests and queue their delivery."""
+        digests = {}
+        for user_id, alert in triggered:
+            digests.setdefault((user_id, alert['channel_id']), []).append(alert)
+        
+        now = time.monotonic()
+        for (user_id, channel_id), user_alerts in digests.items():
+            # Discord caps embeds at 25 fields
+            for start in range(0, len(user_alerts), 25):
+                embed = self.build_digest(user_alerts[start:start + 25])
+                content = f"<@{user_id}>"
+                self.queue.put_nowait({'channel_id': channel_id, 'content': content, 'embed': embed,
+                                       'reactions': True, 'attempts': 0, 'queued': now})
+                if ALERTS_CHANNEL_ID and ALERTS_CHANNEL_ID != channel_id:
+                    self.queue.put_nowait({'channel_id': ALERTS_CHANNEL_ID, 'content': content, 'embed': embed,
+                                           'reactions': False, 'attempts': 0, 'queued': now})
+
+    @staticmethod
+    def build_digest(alerts):
+        """One embed covering every alert a user hit in this check."""
+        all_up = all(a['direction'] == 'above' for a in alerts)
+        all_down = all(a['direction'] == 'below' for a in alerts)
+        embed = discord.Embed(
+            title="PRICE ALERT TRIGGERED!" if len(alerts) == 1 else f"{len(alerts)} PRICE ALERTS TRIGGERED!",
+            color=discord.Color.green() if all_up else discord.Color.red() if all_down else discord.Color.gold(),
+            timestamp=datetime.now()
+        )
+        
+        for alert in alerts:
+            crossed_up = alert['direction'] == 'above'
+            target_price = alert['target_price']
+            current_price = alert['triggered_price']
+            vs_currency = alert.get('vs_currency', 'usd')
+            price_change = ((current_price - target_price) / target_price * 100)
+            reaction = "🚀📈🎉" if crossed_up else "📉🛡️💎"
+            
+            embed.add_field(
+                name=f"{reaction} {alert['name']} ({alert['symbol']}) {reaction}",
+                value=(
+                    f"Target: {fmt_money(target_price, vs_currency, 4)}\n"
+                    f"Current: {fmt_money(current_price, vs_currency, 4)}\n"
+                    f"Change: {price_change:+.2f}%\n"
+                    f"Direction: {'ABOVE' if crossed_up else 'BELOW'}"
+                    + ("\nTouched between checks" if alert.get('touched') else "")
+                ),
+                inline=False
+            )
+        
+        embed.set_footer(text=f"Congrats {alerts[0]['user_name']}! Time to make moves!")
+        return embed
+
+    async def worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self.deliver(job)
+            except Exception as e:
+                logging.error(f"Alert notifier worker error: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def deliver(self, job):
+        channel = bot.get_channel(job['channel_id'])
+        if not channel:
+            logging.warning(f"Alert channel {job['channel_id']} not found; dropping notification")
+            self.failed += 1
+            return
+        
+        try:
+            message = await channel.send(job['content'], embed=job['embed'])
+        except (discord.Forbidden, discord.NotFound) as e:
+            logging.error(f"Cannot deliver alert to channel {job['channel_id']}: {e}")
+            self.failed += 1
+            return
+        except (discord.HTTPException, asyncio.TimeoutError, OSError) as e:
+            self.retry(job, e)
+            return
+        
+        self.sent += 1
+        self.latencies.append(time.monotonic() - job['queued'])
+        if job['reactions']:
+            for reaction in ("🚨", "💰", "🎯"):
+                try:
+                    await message.add_reaction(reaction)
+                except discord.HTTPException:
+                    break
+
+    def retry(self, job, error):
+        job['attempts'] += 1
+        if job['attempts'] > ALERT_SEND_RETRIES:
+            logging.error(f"Giving up on alert for channel {job['channel_id']} after {ALERT_SEND_RETRIES} retries: {error}")
+            self.failed += 1
+            return
+        
+        self.retried += 1
+        delay = ALERT_RETRY_DELAY * 2 ** (job['attempts'] - 1)
+        logging.warning(f"Alert send to channel {job['channel_id']} failed ({error}); retry {job['attempts']} in {delay:.0f}s")
+        asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, job)
+
+    def summary(self):
+        """One-line delivery report for !stats."""
+        text = f"{self.sent} sent • {self.retried} retried • {self.failed} failed • {self.queue.qsize()} queued"
+        if self.latencies:
+            text += f" • avg {sum(self.latencies) / len(self.latencies):.1f}s to deliver"
+        return text
+
+alert_notifier = AlertNotifier()
+
+# ==================== RESPONSE CACHE & COOLDOWNS ====================
+class ResponseCache:
+    """Short-lived cache of built command responses, keyed by (command, normalized args).
+
+    Concurrent identical requests share one in-flight build, so a burst of `!btc`
+    costs one upstream round trip instead of one per user. Builders are plain
+    (blocking) functions returning a response dict and run in a worker thread.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.entries = {}
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_build(self, key, builder, *args):
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        
+        task = self.in_flight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Shared by every caller and may outlive the first one's trace, so it gets none
+            task = asyncio.create_task(self._build(key, builder, args), context=contextvars.Context())
+            self.in_flight[key] = task
+        # Shield so one impatient caller being cancelled does not cancel the shared build
+        return await asyncio.shield(task)
+
+    async def _build(self, key, builder, args):
+        try:
+            response = await asyncio.to_thread(builder, *args)
+            # Only complete embeds are cached; errors and partial results are retried next time
+            if response.get('embed') is not None and not response.get('partial'):
+                self._purge_expired()
+                self.entries[key] = (time.monotonic() + self.ttl, response)
+            return response
+        finally:
+            del self.in_flight[key]
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self.entries.items() if expires <= now]:
+            del self.entries[key]
+
+    def hit_rate(self):
+        """Fraction of requests answered without a new build (cache hits + coalesced)."""
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    def summary(self):
+        return (f"{self.hit_rate():.0%} hit rate • {self.hits} hits, "
+                f"{self.coalesced} coalesced, {self.misses} builds")
+
+response_cache = ResponseCache(RESPONSE_CACHE_TTL)
+
+# Shared across all hot commands, so hopping between !btc, !eth, !sol is still rate limited
+hot_user_cooldowns = commands.CooldownMapping.from_cooldown(
+    HOT_USER_RATE, HOT_COOLDOWN_PER, commands.BucketType.user)
+hot_channel_cooldowns = commands.CooldownMapping.from_cooldown(
+    HOT_CHANNEL_RATE, HOT_COOLDOWN_PER, commands.BucketType.channel)
+
+def check_hot_cooldown(message):
+    """Raise CommandOnCooldown if the user or channel is spamming hot commands."""
+    for mapping in (hot_user_cooldowns, hot_channel_cooldowns):
+        bucket = mapping.get_bucket(message)
+        retry_after = bucket.update_rate_limit()
+        if retry_after:
+            raise commands.CommandOnCooldown(bucket, retry_after, mapping.type)
+
+def hot_command():
+    """Command check applying the shared per-user and per-channel hot command cooldowns."""
+    async def predicate(ctx):
+        check_hot_cooldown(ctx.message)
+        return True
+    return commands.check(predicate)
+
+async def send_response(ctx, response):
+    """Send a built response (content and/or embed, plus reactions) to the invoking channel."""
+    message = await ctx.send(content=response.get('content'), embed=response.get('embed'))
+    for reaction in response.get('reactions', []):
+        try:
+            await message.add_reaction(reaction)
+        except:
+            pass
+    return message
+
+# ==================== ADAPTIVE POLLING ====================
+class VolatilityTracker:
+    """Realized volatility of the board symbols from their recent ticks.
+
+    Keeps the last VOLATILITY_WINDOW (time, price) ticks per symbol and reports
+    the average per-minute realized volatility (RMS of log returns, each scaled
+    by the square root of its tick spacing) across symbols.
+    """
+
+    def __init__(self, window=VOLATILITY_WINDOW):
+        self.window = window
+        self.ticks = {}
+        self.lock = threading.Lock()
+
+    def record(self, prices, now=None):
+        """Add one tick of {symbol: price}."""
+        now = time.time() if now is None else now
+        with self.lock:
+            for symbol, price in prices.items():
+                if price > 0:
+                    self.ticks.setdefault(symbol, deque(maxlen=self.window)).append((now, price))
+            # Drop symbols that fell out of the top-N
+            for symbol in [s for s in self.ticks if s not in prices]:
+                del self.ticks[symbol]
+
+    def realized(self):
+        """Average per-minute realized volatility, or None until there are two ticks."""
+        with self.lock:
+            series = [list(ticks) for ticks in self.ticks.values() if len(ticks) > 1]
+        vols = []
+        for ticks in series:
+            squares = []
+            for (t0, p0), (t1, p1) in zip(ticks, ticks[1:]):
+                minutes = max(t1 - t0, 1) / 60
+                squares.append(math.log(p1 / p0) ** 2 / minutes)
+            vols.append(math.sqrt(sum(squares) / len(squares)))
+        return sum(vols) / len(vols) if vols else None
+
+volatility_tracker = VolatilityTracker()
+
+def next_board_interval(current, volatility):
+    """Halve the interval in volatile markets, stretch it by half in quiet ones, within bounds."""
+    if volatility is None:
+        return current
+    if volatility > VOLATILITY_HIGH:
+        current = current / 2
+    elif volatility < VOLATILITY_LOW:
+        current = current * 1.5
+    return int(min(MAX_UPDATE_INTERVAL, max(MIN_UPDATE_INTERVAL, current)))
+
+def snapshot_ttl():
+    """How long the price board may reuse the MEXC snapshot, scaled with its current interval."""
+    return MEXC_SNAPSHOT_TTL * board_interval['seconds'] / UPDATE_INTERVAL
+
+def describe_interval():
+    """Board description fragment for the effective interval."""
+    seconds = board_interval['seconds']
+    if not ADAPTIVE_INTERVAL:
+        return f"Auto-update every {seconds}s"
+    mode = "⚡ volatile" if seconds < UPDATE_INTERVAL else "😴 quiet" if seconds > UPDATE_INTERVAL else "normal"
+    return f"Auto-update every {seconds}s ({mode})"
+
+def retune_board_interval():
+    """Pick the next board interval from the latest volatility reading."""
+    if not ADAPTIVE_INTERVAL:
         return
-    
-    total_alerts = sum(len(v) for v in alerts.values())
-    logging.info(f"Checking {total_alerts} alerts...")
-    
-    triggered_count = 0
+    volatility = volatility_tracker.realized()
+    seconds = next_board_interval(board_interval['seconds'], volatility)
+    if seconds != board_interval['seconds']:
+        logging.info(f"Price board interval -> {seconds}s (volatility {volatility:.5f}/min)")
+    board_interval.update(seconds=seconds, volatility=volatility)
+
+# ==================== JOB SUPERVISOR ====================
+# Blocking calls made by supervised jobs (see SupervisedJob.to_thread)
+job_executor = ThreadPoolExecutor(max_workers=JOB_THREAD_WORKERS, thread_name_prefix='job')
+
+class SupervisedJob:
+    """A periodic background job run under supervision.
+
+    Exposes the parts of the tasks.Loop API the rest of the bot uses (coro,
+    seconds/minutes/hours, next_iteration, change_interval, start, is_running),
+    so the state snapshot and the adaptive board interval work unchanged.
+
+    Ticks follow a fixed-rate schedule with a random delay of up to JOB_JITTER
+    of the interval, so jobs sharing an interval don't all fire at once. A tick
+    that arrives while the previous run is still going is dropped
+    (overrun='skip') or folded into a single follow-up run (overrun='merge'),
+    so slow runs never pile up. Each run is cancelled at its deadline
+    (JOB_DEADLINE_FACTOR x interval). Cancelling cannot stop threads the run
+    started through to_thread(), so the job counts as busy until they finish
+    and no follow-up run adds to the load on a slow upstream. Failed or timed
+    out runs are retried with exponential backoff from JOB_BACKOFF_BASE,
+    capped at the interval.
+    """
+
+    def __init__(self, coro, seconds=0, minutes=0, hours=0, overrun='skip'):
+        self.coro = coro
+        self.name = coro.__name__
+        self.overrun = overrun
+        self.seconds, self.minutes, self.hours = seconds, minutes, hours
+        self.runner = None
+        self.current = None
+        self.threads = set()
+        self.wake = asyncio.Event()
+        self.next_due = None
+        self.offset = 0.0
+        self.pending = False
+        self.retry_at = None
+        self.failures_in_row = 0
+        self.durations = deque(maxlen=50)
+        self.counts = Counter()
+        self.last_error = None
+        self.last_finished = None
+        self.started = None
+        self.state = 'stopped'
+        supervised_jobs.append(self)
+
+    @property
+    def interval(self):
+        return self.hours * 3600 + self.minutes * 60 + self.seconds
+
+    @property
+    def deadline(self):
+        return self.interval * JOB_DEADLINE_FACTOR
+
+    @property
+    def busy(self):
+        return (self.current is not None and not self.current.done()) or bool(self.threads)
+
+    @property
+    def next_iteration(self):
+        if not self.is_running() or self.next_due is None:
+            return None
+        return datetime.fromtimestamp(self.next_due + self.offset)
+
+    def is_running(self):
+        return self.runner is not None and not self.runner.done()
+
+    def start(self):
+        if self.is_running():
+            return
+        self.state = 'idle'
+        self.runner = asyncio.create_task(self._supervise(), name=f"supervisor: {self.name}",
+                                          context=contextvars.Context())
+        self.runner.add_done_callback(self._supervisor_done)
+
+    def cancel(self):
+        for task in (self.runner, self.current):
+            if task is not None and not task.done():
+                task.cancel()
+        self.state = 'stopped'
+
+    def change_interval(self, *, seconds=0, minutes=0, hours=0):
+        """Takes effect from the next tick."""
+        self.seconds, self.minutes, self.hours = seconds, minutes, hours
+
+    async def to_thread(self, func, *args):
+        """asyncio.to_thread for the job's blocking calls, tracked so the next run waits for them."""
+        future = job_executor.submit(in_context(func), *args)
+        self.threads.add(future)
+        loop = asyncio.get_running_loop()
+        
+        def finished(f):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._thread_done, f)
+        
+        future.add_done_callback(finished)
+        return await asyncio.wrap_future(future)
+
+    def _thread_done(self, future):
+        self.threads.discard(future)
+        if not self.threads:
+            self.wake.set()
+
+    def _supervisor_done(self, task):
+        if task.cancelled() or task.exception() is None:
+            return
+        # A bug in the supervisor itself must not leave the job dead
+        self.counts['restarts'] += 1
+        logging.error(f"Supervisor for {self.name} crashed: {task.exception()}; restarting in {JOB_BACKOFF_BASE:.0f}s")
+        asyncio.get_running_loop().call_later(JOB_BACKOFF_BASE, self.start)
+
+    def _start_at(self):
+        if not self.busy:
+            if self.pending:
+                return time.time()
+            if self.retry_at is not None:
+                return min(self.retry_at, self.next_due + self.offset)
+        return self.next_due + self.offset
+
+    async def _supervise(self):
+        self.next_due = time.time()
+        self.offset = 0.0  # the first run is immediate, like tasks.loop
+        while True:
+            self.wake.clear()
+            try:
+                # A finished run wakes the supervisor early to re-plan (merged run, retry)
+                await asyncio.wait_for(self.wake.wait(), max(0.0, self._start_at() - time.time()))
+                continue
+            except asyncio.TimeoutError:
+                pass
+            
+            now = time.time()
+            if not self.busy and (self.pending or (self.retry_at is not None and now < self.next_due + self.offset)):
+                self.pending = False
+                self._launch()
+                continue
+            
+            # A regular tick; ticks lost while the event loop was too busy to wake us count as skipped
+            missed = 0
+            while self.next_due + self.interval <= now:
+                self.next_due += self.interval
+                missed += 1
+            self.next_due += self.interval
+            self.offset = random.uniform(0, min(self.interval * JOB_JITTER, JOB_JITTER_MAX_SECONDS))
+            self.counts['skipped'] += missed
+            
+            if not self.busy:
+                self._launch()
+            elif self.overrun == 'merge' and not self.pending:
+                self.pending = True
+                self.counts['merged'] += 1
+            else:
+                self.counts['skipped'] += 1
+                logging.warning(f"Job {self.name} is still running after "
+                                f"{now - self.started:.0f}s; skipped a tick")
+
+    def _launch(self):
+        self.retry_at = None
+        self.started = time.time()
+        self.current = asyncio.create_task(self._run(), name=f"job: {self.name}")
+
+    async def _run(self):
+        self.state = 'running'
+        self.counts['runs'] += 1
+        started = time.perf_counter()
+        error = None
+        work = asyncio.create_task(self.coro(), name=f"job: {self.name}")
+        try:
+            await asyncio.wait_for(work, self.deadline)
+            self.counts['ok'] += 1
+        except asyncio.TimeoutError:
+            self.counts['timeouts'] += 1
+            error = f"cancelled at its {self.deadline:.0f}s deadline"
+            if self.threads:
+                error += f"; waiting for {len(self.threads)} thread(s) before the next run"
+        except Exception as e:
+            self.counts['failures'] += 1
+            error = f"{type(e).__name__}: {e}"
+        
+        duration = time.perf_counter() - started
+        self.durations.append(duration)
+        if duration > self.interval:
+            self.counts['overruns'] += 1
+            logging.warning(f"Job {self.name} overran its {self.interval}s interval ({duration:.1f}s)")
+        
+        if error:
+            self.failures_in_row += 1
+            backoff = min(self.interval, JOB_BACKOFF_BASE * 2 ** (self.failures_in_row - 1))
+            self.retry_at = time.time() + backoff
+            self.last_error = (time.time(), error[:200])
+            self.state = 'backoff'
+            logging.error(f"Job {self.name} failed ({error}); retrying in {backoff:.1f}s")
+        else:
+            self.failures_in_row = 0
+            self.state = 'idle'
+        self.last_finished = time.time()
+        self.wake.set()
+
+    def health(self):
+        """One-line health summary for !jobs."""
+        durations = sorted(self.durations)
+        last = f"{self.durations[-1]:.1f}s" if durations else "never ran"
+        p95 = f"{durations[min(len(durations) - 1, int(len(durations) * 0.95))]:.1f}s" if durations else "-"
+        counts = self.counts
+        return (
+            f"{self.state} • every {self.interval}s • last {last} • p95 {p95}\n"
+            f"runs {counts['runs']} • failed {counts['failures']} • timed out {counts['timeouts']} • "
+            f"overran {counts['overruns']} • skipped {counts['skipped']} • merged {counts['merged']}"
+        )
+
+supervised_jobs = []
+
+def supervised(*, seconds=0, minutes=0, hours=0, overrun='skip'):
+    """Decorator turning a coroutine into a SupervisedJob (in place of @tasks.loop)."""
+    def decorator(coro):
+        return SupervisedJob(coro, seconds=seconds, minutes=minutes, hours=hours, overrun=overrun)
+    return decorator
+
+# ==================== ENHANCED TASKS ====================
+def alert_window_start(alert, fallback=None):
+    """Epoch time an alert's candle range starts at: its last check, or its creation if never checked.
+
+    Alerts last checked before check times were recorded use `fallback`.
+    """
+    if alert.last_checked_price is None:
+        return alert.created_at
+    return alert.checked_ts or fallback
+
+def evaluate_alerts(alerts, prices, candles=None, since=None, now=None):
+    """Mark alerts whose target was crossed or touched since the last check.
+
+    `prices` are USD; each alert is compared in its own vs_currency via the
+    cached FX vector. `candles` ({coin_id: [(open_ms, high, low)]} in USD, see
+    get_recent_candles) widen the comparison to the high and low since that
+    alert was last checked, so a target touched and reversed between two
+    checks still fires. Alerts not checked before are compared with the price
+    they were created at, over the candles opened after their creation; see
+    alert_window_start for `since`.
+    Updates the alerts in place and returns the triggered ones as
+    (user_id, alert) pairs; no Discord calls happen here.
+    """
+    candles = candles or {}
+    ranges = {}  # (coin_id, start) -> candle range; alerts checked together share one
+    now = time.time() if now is None else now
+    triggered = []
     for user_id, user_alerts in alerts.items():
         for alert in user_alerts:
-            if alert['triggered']:
+            if alert.triggered:
                 continue
             
-            current_price = get_crypto_price(alert['coin_id'])
+            vs_currency = alert.vs_currency or 'usd'
+            current_price = convert_price(prices.get(alert.coin_id), vs_currency)
             if current_price is None:
                 continue
             
-            alert['current_price'] = current_price
-            previous_price = alert.get('last_checked_price', current_price)
-            target_price = alert['target_price']
+            fresh = alert.last_checked_price is None
+            previous_price = alert.current_price if fresh else alert.last_checked_price
+            if previous_price is None:
+                previous_price = current_price
+            alert.current_price = current_price
+            target_price = alert.target_price
             
-            price_crossed_up = (previous_price < target_price <= current_price)
-            price_crossed_down = (previous_price > target_price >= current_price)
+            high = low = current_price
+            rows = candles.get(alert.coin_id)
+            start = alert_window_start(alert, since)
+            if rows and start:
+                key = (alert.coin_id, start)
+                if key not in ranges:
+                    ranges[key] = candle_range(rows, int(start * 1000))
+                price_range = ranges[key]
+                if price_range:
+                    high = max(high, convert_price(price_range[0], vs_currency))
+                    low = min(low, convert_price(price_range[1], vs_currency))
+            
+            price_crossed_up = (previous_price < target_price <= high)
+            price_crossed_down = (previous_price > target_price >= low)
             
             if price_crossed_up or price_crossed_down:
-                alert['triggered'] = True
-                alert['triggered_at'] = datetime.now().isoformat()
-                alert['triggered_price'] = current_price
-                alert['direction'] = 'above' if price_crossed_up else 'below'
-                triggered_count += 1
-                
-                # Send alert notification
-                try:
-                    channel = bot.get_channel(alert['channel_id'])
-                    if channel:
-                        embed = discord.Embed(
-                            title="PRICE ALERT TRIGGERED!",
-                            color=discord.Color.green() if price_crossed_up else discord.Color.red(),
-                            timestamp=datetime.now()
-                        )
-                        
-                        price_change = ((current_price - target_price) / target_price * 100)
-                        reaction = "🚀📈🎉" if price_crossed_up else "📉🛡️💎"
-                        
-                        embed.add_field(
-                            name=f"{reaction} {alert['name']} ({alert['symbol']}) {reaction}",
-                            value=(
-                                f"Target: ${target_price:,.4f}\n"
-                                f"Current: ${current_price:,.4f}\n"
-                                f"Change: {price_change:+.2f}%\n"
-                                f"Direction: {'ABOVE' if price_crossed_up else 'BELOW'}"
-                            ),
-                            inline=False
-                        )
-                        
-                        embed.set_footer(text=f"Congrats {alert['user_name']}! Time to make moves!")
-                        
-                        # Send to original channel and alerts channel
-                        message = await channel.send(f"<@{user_id}>", embed=embed)
-                        await message.add_reaction("🚨")
-                        await message.add_reaction("💰")
-                        await message.add_reaction("🎯")
-                        
-                        if ALERTS_CHANNEL_ID and ALERTS_CHANNEL_ID != alert['channel_id']:
-                            alerts_channel = bot.get_channel(ALERTS_CHANNEL_ID)
-                            if alerts_channel:
-                                await alerts_channel.send(f"<@{user_id}>", embed=embed)
-                                
-                except Exception as e:
-                    logging.error(f"Error sending alert notification: {e}")
+                alert.triggered = True
+                alert.triggered_ts = now
+                alert.triggered_price = current_price
+                alert.direction = 'above' if price_crossed_up else 'below'
+                if not (previous_price < target_price <= current_price or previous_price > target_price >= current_price):
+                    # Reached inside the window but already back on the other side
+                    alert['touched'] = True
+                triggered.append((user_id, alert))
             
-            alert['last_checked_price'] = current_price
+            alert.last_checked_price = current_price
+            alert.checked_ts = now
+    return triggered
+
+def store_checked_alerts(alerts, triggered):
+    """Archive what a check finished and save the rest (blocking; check_alerts runs it in a thread)."""
+    if triggered:
+        # Triggered alerts leave the live file straight away, along with any that expired meanwhile
+        finished, expired = split_inactive(alerts)
+        alert_archive.add(finished, 'triggered')
+        alert_archive.add(expired, 'expired')
+        fired = {id(alert) for _, alert in triggered}
+        stats_registry.alerts_removed([alert for alert in finished if id(alert) in fired], 'triggered')
+        stats_registry.alerts_archived([alert for alert in finished if id(alert) not in fired], 'triggered')
+        stats_registry.alerts_removed(expired, 'expired')
+    save_alerts(alerts)
+
+@supervised(minutes=5, overrun='merge')
+@traced_loop
+async def check_alerts():
+    """Background task to check alerts every 5 minutes.
+
+    Prices for every watched coin are fetched in one batch, alerts are evaluated
+    and saved, and notifications are handed to the alert notifier so delivery
+    never holds up the next check. The saved records are kept for the next
+    check, which only re-reads the file if something else saved it meanwhile.
+    """
+    global last_alert_check, alert_check_cache
     
-    if triggered_count > 0:
-        save_alerts(alerts)
-        logging.info(f"Triggered {triggered_count} alerts")
+    generation = alerts_generation
+    if alert_check_cache and alert_check_cache[0] == generation:
+        # Nothing saved the file since this task did; reuse those records instead of parsing it again
+        alerts = alert_check_cache[1]
+    else:
+        alerts = await check_alerts.to_thread(load_alerts)
+    alert_check_cache = None
+    watched = Counter(a.coin_id for user_alerts in alerts.values() for a in user_alerts if not a.triggered)
+    if not watched:
+        return
+    
+    total_alerts = sum(len(v) for v in alerts.values())
+    logging.info(f"Checking {total_alerts} alerts across {len(watched)} coins...")
+    
+    # Each alert's high/low window runs from its own last check to now, so candles are
+    # fetched from the oldest of those; they cover the most watched coins
+    now = time.time()
+    fallback = last_alert_check or now - check_alerts.interval
+    busiest = [coin_id for coin_id, _ in watched.most_common(HIGH_LOW_MAX_COINS)]
+    busy = set(busiest)
+    since = min((alert_window_start(a, fallback) or fallback
+                 for user_alerts in alerts.values() for a in user_alerts
+                 if not a.triggered and a.coin_id in busy), default=fallback)
+    prices, candles = await asyncio.gather(
+        check_alerts.to_thread(get_crypto_prices, list(watched)),
+        check_alerts.to_thread(get_recent_candles, busiest, since, now)
+    )
+    async with alerts_lock:
+        # Re-read after the fetch so alerts created or deleted meanwhile are not overwritten
+        if alerts_generation != generation:
+            alerts = await check_alerts.to_thread(load_alerts)
+        triggered = evaluate_alerts(alerts, prices, candles, fallback, now)
+        last_alert_check = now
+        await check_alerts.to_thread(store_checked_alerts, alerts, triggered)
+        alert_check_cache = (alerts_generation, alerts)
+    
+    if triggered:
+        logging.info(f"Triggered {len(triggered)} alerts")
+        alert_notifier.submit(triggered)
+
+@tasks.loop(minutes=ALERT_SWEEP_MINUTES)
+@traced_loop
+async def sweep_alert_store():
+    """Move finished alerts to the archive and prune old history.
 
-@tasks.loop(hours=24)
+    Runs in a thread under alerts_lock, so its load/save never interleaves
+    with the alert commands'.
+    """
+    async with alerts_lock:
+        await asyncio.to_thread(sweep_alerts)
+
+@tasks.loop(hours=1)
+@traced_loop
 async def refresh_coin_list():
-    """Refresh coin list every 24 hours."""
+    """Refresh coin list once it is older than COIN_LIST_REFRESH_HOURS."""
+    if coin_list_last_updated and \
+       (datetime.now() - coin_list_last_updated).total_seconds() < COIN_LIST_REFRESH_HOURS * 3600:
+        return
+    
     logging.info("Auto-refreshing coin list...")
-    get_all_coingecko_coins(force_refresh=True)
+    await asyncio.to_thread(get_all_coingecko_coins, True)
     logging.info(f"Coin list refreshed. Now tracking {len(coin_cache['all_coins'])} coins")
 
-@tasks.loop(seconds=UPDATE_INTERVAL)
+@traced
+def build_price_board_embed():
+    """Build the live price board embed, or None if MEXC has no data."""
+    PAIRS = get_top_coins(TOP_N, max_age=snapshot_ttl())
+    if not PAIRS:
+        return None
+    
+    pairs = list(PAIRS.items())[:TOP_N]
+    results, missing = fan_out(get_mexc_price, [symbol for _, symbol in pairs])
+    volatility_tracker.record({symbol: float(data.get("lastPrice", 0)) for symbol, data in results.items()})
+    retune_board_interval()
+    
+    embed = discord.Embed(
+        title=f"MEXC TOP 20 LIVE PRICES {get_random_emoji_combo()}",
+        description=f"{describe_interval()} • {datetime.utcnow().strftime('%H:%M:%S')} UTC",
+        color=0x00ff99
+    )
+    for name, symbol in pairs:
+        data = results.get(symbol)
+        if data:
+            last_price = float(data.get("lastPrice", 0))
+            change = float(data.get("priceChangePercent", 0))
+            high = float(data.get("highPrice", 0))
+            low = float(data.get("lowPrice", 0))
+            volume = float(data.get("quoteVolume", 0))
+            
+            arrow = "🟢 ▲" if change >= 0 else "🔴 ▼"
+            price_emoji = "🚀" if change > 10 else "📈" if change > 5 else "⚡" if change > 0 else "📉" if change < -10 else "🛡️" if change < -5 else "⚖️"
+            
+            embed.add_field(
+                name=f"{price_emoji} {name}USDT",
+                value=(
+                    f"Price: {fmt(last_price)}\n"
+                    f"Change: {change:+.2f}% {arrow}\n"
+                    f"H/L: {fmt(high)} / {fmt(low)}\n"
+                    f"Vol: ${volume:,.0f}"
+                ),
+                inline=True
+            )
+    
+    note_missing(embed, missing)
+    return embed
+
+@tasks.loop(minutes=MARKET_REFRESH_MINUTES)
+@traced_loop
+async def refresh_market_table():
+    """Refresh the bulk market metadata table."""
+    await asyncio.to_thread(refresh_market_data)
+
+@tasks.loop(minutes=FX_REFRESH_MINUTES)
+@traced_loop
+async def refresh_fx_table():
+    """Refresh the USD conversion vector used for non-USD alerts."""
+    await asyncio.to_thread(refresh_fx_rates)
+
+@supervised(seconds=UPDATE_INTERVAL)
+@traced_loop
 async def auto_price_update():
     """Auto-update MEXC prices in price channel."""
     global auto_price_message
@@ -610,53 +3207,29 @@ async def auto_price_update():
     if not channel:
         return
     
-    try:
-        PAIRS = get_top_coins(TOP_N)
-        if not PAIRS:
-            logging.warning("No MEXC data available")
-            return
-        
-        embed = discord.Embed(
-            title=f"MEXC TOP 20 LIVE PRICES {get_random_emoji_combo()}",
-            description=f"Auto-update every {UPDATE_INTERVAL}s • {datetime.utcnow().strftime('%H:%M:%S')} UTC",
-            color=0x00ff99
-        )
-
-        for name, symbol in list(PAIRS.items())[:TOP_N]:
-            data = get_mexc_price(symbol)
-            if data:
-                last_price = float(data.get("lastPrice", 0))
-                change = float(data.get("priceChangePercent", 0))
-                high = float(data.get("highPrice", 0))
-                low = float(data.get("lowPrice", 0))
-                volume = float(data.get("quoteVolume", 0))
-                
-                arrow = "🟢 ▲" if change >= 0 else "🔴 ▼"
-                price_emoji = "🚀" if change > 10 else "📈" if change > 5 else "⚡" if change > 0 else "📉" if change < -10 else "🛡️" if change < -5 else "⚖️"
-                
-                embed.add_field(
-                    name=f"{price_emoji} {name}USDT",
-                    value=(
-                        f"Price: {fmt(last_price)}\n"
-                        f"Change: {change:+.2f}% {arrow}\n"
-                        f"H/L: {fmt(high)} / {fmt(low)}\n"
-                        f"Vol: ${volume:,.0f}"
-                    ),
-                    inline=True
-                )
+    embed = await auto_price_update.to_thread(build_price_board_embed)
+    if embed is None:
+        logging.warning("No MEXC data available")
+        return
+    if board_interval['seconds'] != auto_price_update.seconds:
+        auto_price_update.change_interval(seconds=board_interval['seconds'])
 
-        if auto_price_message is None:
-            auto_price_message = await channel.send(embed=embed)
-            await auto_price_message.add_reaction("📈")
-            await auto_price_message.add_reaction("📊")
-            await auto_price_message.add_reaction("⚡")
-        else:
+    if auto_price_message is not None:
+        try:
             await auto_price_message.edit(embed=embed)
-            
-    except Exception as e:
-        logging.error(f"Error in auto_price_update: {e}")
+            return
+        except discord.NotFound:
+            logging.warning("Price board message was deleted; posting a new one")
+            auto_price_message = None
+    
+    if auto_price_message is None:
+        auto_price_message = await channel.send(embed=embed)
+        await auto_price_message.add_reaction("📈")
+        await auto_price_message.add_reaction("📊")
+        await auto_price_message.add_reaction("⚡")
 
-@tasks.loop(minutes=5)
+@supervised(minutes=5)
+@traced_loop
 async def auto_news_update():
     """Auto-post news updates in news channel."""
     global posted_news
@@ -670,46 +3243,71 @@ async def auto_news_update():
     if not channel:
         return
     
-    try:
-        news = get_crypto_news()
-        new_posts = 0
-
-        for item in news[:3]:
-            news_id = item["link"]
-            if news_id not in posted_news:
-                # Create a news embed
-                source_emoji = "📰" if "CoinDesk" in item['source'] else "📖" if "CoinTelegraph" in item['source'] else "🥔" if "CryptoPotato" in item['source'] else "🔐"
-                
-                embed = discord.Embed(
-                    title=f"{source_emoji} {item['source']} UPDATE {source_emoji}",
-                    description=f"{item['title']}",
-                    color=discord.Color.blue(),
-                    url=item["link"],
-                    timestamp=datetime.now()
-                )
-                
-                embed.set_footer(text=f"Stay informed! • Source: {item['source']}")
-                
-                # Add reactions for engagement
-                message = await channel.send(embed=embed)
-                await message.add_reaction("📰")
-                await message.add_reaction("🔥")
-                await message.add_reaction("💎")
-                await message.add_reaction("🚀")
-                
-                posted_news.add(news_id)
-                new_posts += 1
-                
-                # Small delay between news posts
-                await asyncio.sleep(1)
+    news = await auto_news_update.to_thread(get_crypto_news)
+    new_posts = 0
 
-        if new_posts > 0:
-            logging.info(f"Posted {new_posts} new news item(s) to channel {NEWS_CHANNEL_ID}")
+    for item in news[:3]:
+        news_id = item["link"]
+        if news_id not in posted_news:
+            # Create a news embed
+            source_emoji = "📰" if "CoinDesk" in item['source'] else "📖" if "CoinTelegraph" in item['source'] else "🥔" if "CryptoPotato" in item['source'] else "🔐"
+            
+            embed = discord.Embed(
+                title=f"{source_emoji} {item['source']} UPDATE {source_emoji}",
+                description=f"{item['title']}",
+                color=discord.Color.blue(),
+                url=item["link"],
+                timestamp=datetime.now()
+            )
+            
+            embed.set_footer(text=f"Stay informed! • Source: {item['source']}")
             
+            # Add reactions for engagement
+            message = await channel.send(embed=embed)
+            await message.add_reaction("📰")
+            await message.add_reaction("🔥")
+            await message.add_reaction("💎")
+            await message.add_reaction("🚀")
+            
+            posted_news.add(news_id)
+            stats_registry.record('news_posted')
+            new_posts += 1
+            
+            # Small delay between news posts
+            await asyncio.sleep(1)
+
+    if new_posts > 0:
+        logging.info(f"Posted {new_posts} new news item(s) to channel {NEWS_CHANNEL_ID}")
+
+@tasks.loop(seconds=STATS_DASHBOARD_SECONDS)
+@traced_loop
+async def stats_dashboard_update():
+    """Keep a live statistics message up to date in the stats channel."""
+    global stats_dashboard_message
+    
+    if not STATS_CHANNEL_ID:
+        return
+    
+    await bot.wait_until_ready()
+    channel = bot.get_channel(STATS_CHANNEL_ID)
+    if not channel:
+        return
+    
+    try:
+        embed = build_stats_embed()
+        embed.set_footer(text=f"Live dashboard • refreshes every {STATS_DASHBOARD_SECONDS}s")
+        if stats_dashboard_message is not None:
+            try:
+                await stats_dashboard_message.edit(embed=embed)
+                return
+            except discord.NotFound:
+                stats_dashboard_message = None
+        stats_dashboard_message = await channel.send(embed=embed)
     except Exception as e:
-        logging.error(f"Error in auto_news_update: {e}")
+        logging.error(f"Error in stats_dashboard_update: {e}")
 
 @tasks.loop(hours=1)
+@traced_loop
 async def cleanup_posted_news():
     """Clean up old news entries to prevent memory issues."""
     global posted_news
@@ -719,12 +3317,165 @@ async def cleanup_posted_news():
         posted_news = set(list(posted_news)[-500:])
         logging.info("Cleaned up old news entries")
 
-# ==================== ENHANCED EVENT HANDLERS ====================
-@bot.event
-async def on_ready():
-    """Bot startup event."""
-    global coin_cache
+# ==================== STATE SNAPSHOT ====================
+# Loops whose next due time survives a restart
+SCHEDULED_LOOPS = [check_alerts, sweep_alert_store, auto_price_update, auto_news_update, cleanup_posted_news,
+                   stats_dashboard_update, refresh_market_table, refresh_fx_table]
+
+def build_state_snapshot():
+    """Collect the runtime state worth keeping across a restart."""
+    def message_ref(message):
+        return {'channel_id': message.channel.id, 'message_id': message.id} if message is not None else None
+    
+    # Loops are already stopped when the final snapshot is taken after bot.run
+    # returns, so their last known due time is rolled forward by their interval
+    now = time.time()
+    for loop in SCHEDULED_LOOPS:
+        name = loop.coro.__name__
+        if loop.next_iteration:
+            loop_schedule[name] = loop.next_iteration.timestamp()
+        elif name in loop_schedule:
+            interval = loop.hours * 3600 + loop.minutes * 60 + loop.seconds
+            while loop_schedule[name] < now and interval:
+                loop_schedule[name] += interval
+    
+    return {
+        'version': 1,
+        'saved_at': time.time(),
+        'price_board': message_ref(auto_price_message),
+        'stats_dashboard': message_ref(stats_dashboard_message),
+        'posted_news': list(posted_news),
+        'news_cache': news_cache,
+        'mexc_snapshot': mexc_snapshot,
+        'market_data': {'rows': {coin_id: list(row) for coin_id, row in market_data['rows'].items()},
+                        'updated': market_data['updated']},
+        'fx_rates': fx_rates,
+        'descriptions': list(description_cache.items()),
+        'schedule': dict(loop_schedule),
+        'last_alert_check': last_alert_check
+    }
+
+def write_state_file(state, path=STATE_FILE):
+    """Write a snapshot as gzipped JSON, replacing the old file atomically."""
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def save_state():
+    """Snapshot runtime state to STATE_FILE."""
+    started = time.perf_counter()
+    try:
+        write_state_file(build_state_snapshot())
+        logging.info(f"State snapshot saved in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logging.error(f"Error saving state snapshot: {e}")
+
+def restore_state(path=STATE_FILE):
+    """Restore caches, news dedupe, the price board and loop schedule from a snapshot."""
+    global auto_price_message, stats_dashboard_message, posted_news, news_cache, mexc_snapshot, market_data, fx_rates, description_cache
+    global last_alert_check
+    
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logging.error(f"Ignoring unreadable state snapshot: {e}")
+        return False
+    
+    posted_news = set(state.get('posted_news', []))
+    news_cache = state.get('news_cache') or news_cache
+    mexc_snapshot = state.get('mexc_snapshot') or mexc_snapshot
+    if state.get('market_data'):
+        rows = {coin_id: MarketRow(*row) for coin_id, row in state['market_data']['rows'].items()}
+        market_data = {'rows': rows, 'updated': state['market_data']['updated']}
+    if state.get('fx_rates'):
+        fx_rates = {**state['fx_rates'], 'units': {code: tuple(unit) for code, unit in state['fx_rates']['units'].items()}}
+    description_cache = OrderedDict((coin_id, tuple(entry)) for coin_id, entry in state.get('descriptions', []))
+    resume_schedule.update(state.get('schedule', {}))
+    last_alert_check = state.get('last_alert_check')
+    
+    # A PartialMessage can be edited without fetching the message first
+    board = state.get('price_board')
+    if board and board['channel_id'] == PRICE_CHANNEL_ID:
+        channel = bot.get_partial_messageable(board['channel_id'])
+        auto_price_message = channel.get_partial_message(board['message_id'])
+    dashboard = state.get('stats_dashboard')
+    if dashboard and dashboard['channel_id'] == STATS_CHANNEL_ID:
+        channel = bot.get_partial_messageable(dashboard['channel_id'])
+        stats_dashboard_message = channel.get_partial_message(dashboard['message_id'])
+    
+    age = time.time() - state.get('saved_at', 0)
+    logging.info(f"Restored state snapshot from {age:.0f}s ago "
+                 f"({len(posted_news)} news ids, {len(market_data['rows'])} market rows)")
+    return True
+
+def resume_delay(loop):
+    """Seconds until a restored loop is next due (0 if unknown or overdue)."""
+    due = resume_schedule.pop(loop.coro.__name__, None)
+    return max(0.0, due - time.time()) if due else 0.0
+
+@tasks.loop(minutes=STATE_SNAPSHOT_MINUTES)
+@traced_loop
+async def snapshot_state():
+    """Periodically snapshot runtime state so a crash loses at most one interval."""
+    await asyncio.to_thread(write_state_file, build_state_snapshot())
+
+# ==================== STARTUP PIPELINE ====================
+class WarmingUp(commands.CheckFailure):
+    """Raised when a command needs a cache that is still warming up."""
+
+def ensure_warm(*caches):
+    """Raise WarmingUp if any of the given caches has not finished warming up."""
+    pending = [name for name in caches if not warmup_status[name]]
+    if pending:
+        raise WarmingUp(f"Warming up ({', '.join(pending)})... try again in a few seconds!")
+
+def requires_warm(*caches):
+    """Command check that reports 'warming up' until the given caches are ready."""
+    async def predicate(ctx):
+        ensure_warm(*caches)
+        return True
+    return commands.check(predicate)
+
+async def run_startup_phase(name, func, *args):
+    """Run one startup phase (sync or async) and log how long it took."""
+    started = time.perf_counter()
+    try:
+        result = func(*args)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+    except Exception as e:
+        logging.error(f"Startup phase '{name}' failed: {e}")
+    finally:
+        logging.info(f"Startup phase '{name}' took {time.perf_counter() - started:.2f}s")
+
+async def warm_cache(name, func):
+    """Fill one cache in a worker thread and mark it warm, even if the fetch failed."""
+    try:
+        await run_startup_phase(f"warm {name}", asyncio.to_thread, func)
+    finally:
+        warmup_status[name] = True
+
+async def warm_up_caches():
+    """Warm the coin list, MEXC snapshot and news cache in the background."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        warm_cache('coins', get_all_coingecko_coins),
+        warm_cache('mexc', get_mexc_tickers),
+        warm_cache('news', get_crypto_news)
+    )
+    logging.info(f"Cache warm-up finished in {time.perf_counter() - started:.2f}s")
     
+    if not refresh_coin_list.is_running():
+        refresh_coin_list.start()
+    await run_startup_phase("presence", update_presence)
+
+def print_startup_banner():
+    """Print the startup banner to the console."""
     print(f"\n{'='*60}")
     print(f"{'UNIFIED CRYPTO BOT ONLINE':^60}")
     print(f"{'='*60}")
@@ -732,38 +3483,92 @@ async def on_ready():
     print(f"Bot ID: {bot.user.id}")
     print(f"Servers: {len(bot.guilds)}")
     print(f"{'-'*60}")
-    print(f"Coin Database: {len(coin_cache.get('all_coins', [])):,} coins")
+    print(f"Coin Database: warming up in background")
     print(f"Alerts Channel: {'✅ Enabled' if ALERTS_CHANNEL_ID else '❌ Disabled'}")
     print(f"Price Channel: {'✅ Enabled' if PRICE_CHANNEL_ID else '❌ Disabled'}")
     print(f"News Channel: {'✅ Enabled' if NEWS_CHANNEL_ID else '❌ Disabled'}")
     print(f"Chat Channel: {'✅ Enabled' if CHAT_CHANNEL_ID else '❌ Disabled'}")
+    print(f"{'-'*60}")
+    print(cache_policy_report())
     print(f"{'='*60}\n")
-    
-    # Initialize coin list
-    get_all_coingecko_coins()
-    
-    # Start all background tasks
+
+def seed_stats():
+    """Load the live alert counts into the stats registry once per process."""
+    stats_registry.seed(load_alerts(), alert_archive.counts())
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def cache_policy_report():
+    """What the cache policy is subscribing to and what it avoided caching."""
+    cached_members = sum(len(guild.members) for guild in bot.guilds)
+    total_members = sum(guild.member_count or 0 for guild in bot.guilds)
+    # Compared with the old Intents.default() + members + reactions setup
+    previous = discord.Intents.default()
+    previous.members = True
+    skipped = [name for name, enabled in previous if enabled and not getattr(bot.intents, name)]
+    return (
+        f"Intents: {describe_intents(bot.intents)}\n"
+        f"Not subscribed: {', '.join(skipped) or 'none'}\n"
+        f"Members cached: {cached_members:,} of {total_members:,} "
+        f"({'chunked' if CHUNK_GUILDS else 'no startup chunking'})\n"
+        f"Message cache: {MESSAGE_CACHE_SIZE or 'off'} • RSS {current_rss_mb():.0f} MB"
+    )
+
+def gateway_summary():
+    """Gateway events received so far, busiest types first."""
+    total = sum(gateway_events.values())
+    if not total:
+        return "No events yet"
+    top = ', '.join(f"{name} {count:,}" for name, count in gateway_events.most_common(4))
+    return f"{total:,} events • {top}"
+
+def start_background_tasks():
+    """Start the background loops (the coin list refresher starts after warm-up)."""
+    alert_notifier.start()
     tasks_to_start = [
         (check_alerts, "Alert Checker"),
-        (refresh_coin_list, "Coin List Refresher"),
+        (sweep_alert_store, "Alert Archiver"),
         (auto_price_update, "Price Auto-Updater"),
         (auto_news_update, "News Auto-Poster"),
-        (cleanup_posted_news, "News Cleanup")
+        (cleanup_posted_news, "News Cleanup"),
+        (stats_dashboard_update, "Stats Dashboard"),
+        (refresh_market_table, "Market Data Refresher"),
+        (refresh_fx_table, "Exchange Rate Refresher"),
+        (snapshot_state, "State Snapshotter")
     ]
     
     for task, name in tasks_to_start:
         if not task.is_running():
-            task.start()
-            print(f"✅ Started: {name}")
-    
-    # Set bot status
+            delay = resume_delay(task)
+            if delay:
+                # Keep the cadence from before the restart instead of running everything at once
+                asyncio.get_running_loop().call_later(delay, task.start)
+                print(f"✅ Resuming: {name} in {delay:.0f}s")
+            else:
+                task.start()
+                print(f"✅ Started: {name}")
+
+async def update_presence():
+    """Show the tracked coin count in the bot's status."""
+    coin_count = len(coin_cache.get('all_coins', []))
     activity = discord.Activity(
         type=discord.ActivityType.playing,
-        name=f"with {len(coin_cache.get('all_coins', [])):,} coins | !commands"
+        name=f"with {coin_count:,} coins | !commands" if coin_count else "warming up... | !commands"
     )
     await bot.change_presence(activity=activity, status=discord.Status.online)
-    
-    # Send startup message to channels
+
+async def send_startup_messages():
+    """Send startup message to channels."""
     startup_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     if ALERTS_CHANNEL_ID:
@@ -800,57 +3605,117 @@ async def on_ready():
         except:
             pass
 
+# ==================== ENHANCED EVENT HANDLERS ====================
+@bot.event
+async def on_ready():
+    """Bot startup event. The startup pipeline runs once per process, not on every reconnect."""
+    global startup_complete
+    
+    if startup_complete:
+        logging.info("Reconnected to Discord; startup pipeline already ran")
+        return
+    startup_complete = True
+    
+    started = time.perf_counter()
+    await run_startup_phase("restore state", restore_state)
+    await run_startup_phase("seed stats", seed_stats)
+    await run_startup_phase("banner", print_startup_banner)
+    await run_startup_phase("background tasks", start_background_tasks)
+    await run_startup_phase("presence", update_presence)
+    logging.info(f"Bot responsive after {time.perf_counter() - started:.2f}s; warming caches in background")
+    
+    # Slow work never blocks the gateway: caches warm up and announcements go out in the background
+    asyncio.create_task(warm_up_caches())
+    asyncio.create_task(run_startup_phase("startup messages", send_startup_messages))
+
+@bot.event
+async def on_command_completion(ctx):
+    """Count prefix command usage."""
+    stats_registry.command_used(ctx.command.qualified_name)
+
+@bot.before_invoke
+async def before_command(ctx):
+    """Open the command's trace and attribute profiler samples to it."""
+    attrs = {'user': str(ctx.author.id), 'channel': str(ctx.channel.id)}
+    if TRACE_CONTENT:
+        # Raw user messages stay out of traces.jsonl unless explicitly asked for
+        attrs['content'] = ctx.message.content[:100]
+    ctx.trace = begin_trace(f"!{ctx.command.qualified_name}", **attrs)
+    if profiler.running:
+        profiler.tag(asyncio.current_task(), f"!{ctx.command.qualified_name}")
+
+@bot.after_invoke
+async def after_command(ctx):
+    """Close the command's trace (runs after the command, whether or not it failed)."""
+    root, token = getattr(ctx, 'trace', (NULL_SPAN, None))
+    if ctx.command_failed:
+        root.set(failed=True)
+    end_trace(root, token)
+
+@bot.event
+async def on_app_command_completion(interaction, command):
+    """Count slash command usage (their prefix twins run via ctx.invoke and are not double counted)."""
+    stats_registry.command_used(command.qualified_name)
+
+@bot.event
+async def on_socket_event_type(event_type):
+    """Count gateway dispatches by type for the cache policy report."""
+    gateway_events[event_type] += 1
+
 @bot.event
 async def on_message(message):
     """Handle all incoming messages with ENHANCED responses."""
     if message.author.bot:
         return
     
+    # Fast path: prefix commands skip chat handling entirely
+    if message.content.startswith(COMMAND_PREFIX):
+        await bot.process_commands(message)
+        return
+    
+    # Everything else only matters in the chat channel
+    if not CHAT_CHANNEL_ID or message.channel.id != CHAT_CHANNEL_ID:
+        return
+    
     content = message.content.lower()
     
-    # Enhanced chat responses in chat channel
-    if CHAT_CHANNEL_ID and message.channel.id == CHAT_CHANNEL_ID:
-        # Direct mention with high priority
-        if bot.user.mentioned_in(message):
-            if 'gm' in content:
-                reply = f"GM {message.author.mention}! Ready to make some money today?"
-                await type_and_send(message.channel, reply, delay=0.1)
-                await message.add_reaction("☕")
-                await message.add_reaction("💰")
-            elif 'gn' in content:
-                reply = f"GN {message.author.mention}! Sweet crypto dreams!"
-                await type_and_send(message.channel, reply, delay=0.1)
-                await message.add_reaction("😴")
-                await message.add_reaction("🌙")
-            else:
-                reply = random.choice(CHAT_REPLIES)
-                await type_and_send(message.channel, f"{message.author.mention} {reply}", delay=0.1)
-                # Add relevant reactions
-                for keyword, emojis in CRYPTO_KEYWORDS.items():
-                    if keyword in content:
-                        for emoji in emojis[:2]:
-                            try:
-                                await message.add_reaction(emoji)
-                            except:
-                                pass
-                        break
-        
-        # Crypto-related keywords that trigger responses (higher chance)
+    # Direct mention with high priority
+    if bot.user.mentioned_in(message):
+        greeting = GREETING_PATTERN.search(content)
+        if greeting and greeting.group(1) == 'gm':
+            reply = f"GM {message.author.mention}! Ready to make some money today?"
+            await type_and_send(message.channel, reply, delay=0.1)
+            await message.add_reaction("☕")
+            await message.add_reaction("💰")
+        elif greeting:
+            reply = f"GN {message.author.mention}! Sweet crypto dreams!"
+            await type_and_send(message.channel, reply, delay=0.1)
+            await message.add_reaction("😴")
+            await message.add_reaction("🌙")
         else:
-            for keyword, emojis in CRYPTO_KEYWORDS.items():
-                if keyword in content and random.random() < 0.4:
-                    reply = random.choice(CHAT_REPLIES)
-                    await type_and_send(message.channel, f"{message.author.mention} {reply}", delay=0.2)
-                    # Add relevant emojis
-                    for emoji in emojis[:2]:
-                        try:
-                            await message.add_reaction(emoji)
-                        except:
-                            pass
-                    break
+            reply = random.choice(CHAT_REPLIES)
+            await type_and_send(message.channel, f"{message.author.mention} {reply}", delay=0.1)
+            # Add relevant reactions
+            keyword = match_crypto_keyword(content)
+            if keyword:
+                for emoji in CRYPTO_KEYWORDS[keyword][:2]:
+                    try:
+                        await message.add_reaction(emoji)
+                    except:
+                        pass
+        return
     
-    # Process commands
-    await bot.process_commands(message)
+    # Crypto-related keywords that trigger responses (higher chance, throttled per channel)
+    keyword = match_crypto_keyword(content)
+    if keyword and random.random() < 0.4 and chat_reply_allowed(message.channel.id):
+        reply = random.choice(CHAT_REPLIES)
+        await type_and_send(message.channel, f"{message.author.mention} {reply}", delay=0.2)
+        # Add relevant emojis
+        for emoji in CRYPTO_KEYWORDS[keyword][:2]:
+            try:
+                await message.add_reaction(emoji)
+            except:
+                pass
 
 # ==================== ENHANCED COMMANDS ====================
 
@@ -921,7 +3786,7 @@ async def lfg_command(ctx):
 async def alerts_detailed(ctx):
     """Show detailed alerts list."""
     user_id = str(ctx.author.id)
-    alerts = load_alerts()
+    alerts = await asyncio.to_thread(load_alerts)
     
     if user_id not in alerts or not alerts[user_id]:
         await ctx.send("No alerts yet! Set one with `!set_alert SYMBOL PRICE`")
@@ -940,11 +3805,13 @@ async def alerts_detailed(ctx):
         timestamp=datetime.now()
     )
     
+    prices = await asyncio.to_thread(get_crypto_prices, [a['coin_id'] for a in active_alerts])
     for i, alert in enumerate(active_alerts, 1):
-        current_price = get_crypto_price(alert['coin_id']) or alert['current_price']
+        vs_currency = alert.get('vs_currency', 'usd')
+        current_price = convert_price(prices.get(alert['coin_id']), vs_currency) or alert['current_price']
         target_price = alert['target_price']
         price_diff = ((target_price - current_price) / current_price * 100)
-        days_ago = (datetime.now() - datetime.fromisoformat(alert['timestamp'])).days
+        days_ago = int(time.time() - alert.created_at) // 86400
         
         status = "WAITING" if not alert['triggered'] else "TRIGGERED"
         emoji = "⏳" if not alert['triggered'] else "✅"
@@ -953,8 +3820,8 @@ async def alerts_detailed(ctx):
             name=f"{emoji} Alert #{i}: {alert['name']}",
             value=(
                 f"**Symbol**: {alert['symbol']}\n"
-                f"**Target**: ${target_price:,.2f}\n"
-                f"**Current**: ${current_price:,.2f}\n"
+                f"**Target**: {fmt_money(target_price, vs_currency)}\n"
+                f"**Current**: {fmt_money(current_price, vs_currency)}\n"
                 f"**Difference**: {price_diff:+.2f}%\n"
                 f"**Status**: {status}\n"
                 f"**Set**: {days_ago} days ago\n"
@@ -970,54 +3837,95 @@ async def alerts_detailed(ctx):
 async def delete_alert(ctx, alert_number: int):
     """Delete a specific alert by number."""
     user_id = str(ctx.author.id)
-    alerts = load_alerts()
-    
-    if user_id not in alerts or not alerts[user_id]:
-        await ctx.send("You don't have any alerts to delete!")
-        return
-    
-    # Get only active alerts
-    active_alerts = [a for a in alerts[user_id] if not a['triggered']]
-    
-    if alert_number < 1 or alert_number > len(active_alerts):
-        await ctx.send(f"Invalid alert number! You have {len(active_alerts)} active alerts. Use `!my_alerts` to see them.")
-        return
-    
-    # Find and remove the alert
-    alert_to_delete = active_alerts[alert_number - 1]
-    
-    # Remove from original list (including triggered ones)
-    alerts[user_id] = [a for a in alerts[user_id] if a.get('unique_id') != alert_to_delete.get('unique_id') or a['triggered']]
-    
-    # If all alerts are removed, remove the user entry
-    if not alerts[user_id]:
-        del alerts[user_id]
-    
-    save_alerts(alerts)
+    async with alerts_lock:
+        alerts = await asyncio.to_thread(load_alerts)
+        
+        if user_id not in alerts or not alerts[user_id]:
+            await ctx.send("You don't have any alerts to delete!")
+            return
+        
+        # Get only active alerts
+        active_alerts = [a for a in alerts[user_id] if not a['triggered']]
+        
+        if alert_number < 1 or alert_number > len(active_alerts):
+            await ctx.send(f"Invalid alert number! You have {len(active_alerts)} active alerts. Use `!my_alerts` to see them.")
+            return
+        
+        # Find and remove the alert
+        alert_to_delete = active_alerts[alert_number - 1]
+        alerts[user_id] = [a for a in alerts[user_id] if a.unique_id != alert_to_delete.unique_id]
+        
+        # If all alerts are removed, remove the user entry
+        if not alerts[user_id]:
+            del alerts[user_id]
+        
+        await asyncio.to_thread(save_alerts, alerts)
+    await asyncio.to_thread(alert_archive.add, [alert_to_delete], 'deleted')
+    stats_registry.alerts_removed([alert_to_delete], 'deleted')
     
-    await ctx.send(f"✅ Alert #{alert_number} for **{alert_to_delete['name']}** at **${alert_to_delete['target_price']:,.2f}** has been deleted!")
+    await ctx.send(f"✅ Alert #{alert_number} for **{alert_to_delete['name']}** at **{fmt_money(alert_to_delete['target_price'], alert_to_delete.get('vs_currency', 'usd'))}** has been deleted!")
 
 @bot.command(name='clear_alerts', help='Clear all your alerts')
 async def clear_alerts(ctx):
     """Clear all alerts for the user."""
     user_id = str(ctx.author.id)
-    alerts = load_alerts()
+    async with alerts_lock:
+        alerts = await asyncio.to_thread(load_alerts)
+        
+        if user_id not in alerts or not alerts[user_id]:
+            await ctx.send("You don't have any alerts to clear!")
+            return
+        
+        alert_count = len(alerts[user_id])
+        cleared = alerts.pop(user_id)
+        await asyncio.to_thread(save_alerts, alerts)
+    await asyncio.to_thread(alert_archive.add, cleared, 'cleared')
+    # Triggered records left by older files were never counted as live; only the archive count moves
+    stats_registry.alerts_removed([a for a in cleared if not a.triggered], 'cleared')
+    stats_registry.alerts_archived([a for a in cleared if a.triggered], 'cleared')
     
-    if user_id not in alerts or not alerts[user_id]:
-        await ctx.send("You don't have any alerts to clear!")
+    await ctx.send(f"✅ Cleared {alert_count} alerts! All your alerts have been removed.")
+
+@bot.command(name='alert_history', help='Show your triggered, expired and deleted alerts')
+async def alert_history(ctx, limit: int = 10):
+    """Show the user's archived alerts, newest first."""
+    limit = max(1, min(limit, 25))
+    history = await asyncio.to_thread(alert_archive.history, ctx.author.id, limit=limit)
+    
+    if not history:
+        await ctx.send("No alert history yet! Triggered, expired and deleted alerts show up here.")
         return
     
-    alert_count = len(alerts[user_id])
-    del alerts[user_id]
-    save_alerts(alerts)
+    counts = await asyncio.to_thread(alert_archive.counts, ctx.author.id)
+    embed = discord.Embed(
+        title=f"{ctx.author.name}'s ALERT HISTORY",
+        description=" | ".join(f"{reason.title()}: {count}" for reason, count in sorted(counts.items())),
+        color=discord.Color.dark_teal(),
+        timestamp=datetime.now()
+    )
     
-    await ctx.send(f"✅ Cleared {alert_count} alerts! All your alerts have been removed.")
+    reason_emoji = {'triggered': "🎯", 'expired': "⌛", 'deleted': "🗑️", 'cleared': "🧹"}
+    for reason, archived_at, alert in history:
+        vs_currency = alert.vs_currency or 'usd'
+        value = f"Target: {fmt_money(alert.target_price, vs_currency)}\n"
+        if reason == 'triggered' and alert.triggered_price is not None:
+            value += f"Hit: {fmt_money(alert.triggered_price, vs_currency)} ({(alert.direction or '').upper()})\n"
+        value += f"{reason.title()} <t:{archived_at}:R>"
+        embed.add_field(
+            name=f"{reason_emoji.get(reason, '•')} {alert.name} ({alert.symbol})",
+            value=value,
+            inline=True
+        )
+    
+    embed.set_footer(text=f"History is kept for {ALERT_HISTORY_DAYS} days" if ALERT_HISTORY_DAYS else "History is kept forever")
+    await ctx.send(embed=embed)
 
 # ----- ALERT COMMANDS (Enhanced) -----
 @bot.command(name='set_alert', help='Set a crypto price alert')
+@requires_warm('coins')
 async def set_alert(ctx, *, input_str: str):
     """Set a price alert for any cryptocurrency."""
-    coin_identifier, target_price = parse_alert_input(input_str)
+    coin_identifier, target_price, vs_currency = parse_alert_input(input_str)
     
     if not coin_identifier:
         await ctx.send("Oops! Please specify a cryptocurrency (e.g., `!set_alert bitcoin 50000`)")
@@ -1027,45 +3935,59 @@ async def set_alert(ctx, *, input_str: str):
         await ctx.send("Missing price! Please specify a target price (e.g., `!set_alert bitcoin 50000`)")
         return
     
+    await create_alert(ctx, coin_identifier, target_price, vs_currency)
+
+async def create_alert(ctx, coin_identifier: str, target_price: float, vs_currency: str = 'usd'):
+    """Create and confirm a new alert (shared by !set_alert and /set_alert)."""
+    vs_currency = vs_currency.lower()
+    if not supported_currency(vs_currency):
+        await ctx.send(f"Unknown currency `{vs_currency}`! Try usd, eur, gbp, jpy or btc.")
+        return
+    
     coin = find_coin(coin_identifier)
     if not coin:
-        await ctx.send(f"Coin not found! Couldnt find '{coin_identifier}'. Try `!search {coin_identifier}`")
+        await ctx.send(f"Coin not found! {not_found_message(coin_identifier)}")
         return
     
-    user_id = str(ctx.author.id)
-    alerts = load_alerts()
-    
-    if user_id not in alerts:
-        alerts[user_id] = []
-    
-    # Check for duplicate alert
-    for alert in alerts[user_id]:
-        if alert['coin_id'] == coin['id'] and alert['target_price'] == target_price and not alert['triggered']:
-            await ctx.send(f"Already watching! You already have an active alert for **{coin['name']}** at **${target_price:,.2f}**")
-            return
-    
-    current_price = get_crypto_price(coin['id'])
+    current_price = convert_price(await asyncio.to_thread(get_crypto_price, coin['id']), vs_currency)
     if current_price is None:
         await ctx.send(f"Price fetch failed! Could not get current price for {coin['name']}. Try again later!")
         return
     
-    # Create new alert
-    new_alert = {
-        'coin_id': coin['id'],
-        'symbol': coin['symbol'].upper(),
-        'name': coin['name'],
-        'target_price': target_price,
-        'current_price': current_price,
-        'timestamp': datetime.now().isoformat(),
-        'channel_id': ctx.channel.id,
-        'user_id': user_id,
-        'user_name': ctx.author.name,
-        'triggered': False,
-        'vs_currency': 'usd'
-    }
-    
-    alerts[user_id].append(new_alert)
-    save_alerts(alerts)
+    # Loaded after the price fetch and saved under alerts_lock, so no other load/save can slip in between
+    user_id = str(ctx.author.id)
+    async with alerts_lock:
+        alerts = await asyncio.to_thread(load_alerts)
+        
+        if user_id not in alerts:
+            alerts[user_id] = []
+        
+        # Check for duplicate alert
+        for alert in alerts[user_id]:
+            if alert['coin_id'] == coin['id'] and alert['target_price'] == target_price and \
+               alert.get('vs_currency', 'usd') == vs_currency and not alert['triggered']:
+                await ctx.send(f"Already watching! You already have an active alert for **{coin['name']}** at **{fmt_money(target_price, vs_currency)}**")
+                return
+        
+        # Create new alert
+        new_alert = AlertRecord.from_dict({
+            'coin_id': coin['id'],
+            'symbol': coin['symbol'].upper(),
+            'name': coin['name'],
+            'target_price': target_price,
+            'current_price': current_price,
+            'channel_id': ctx.channel.id,
+            'user_id': user_id,
+            'user_name': ctx.author.name,
+            'triggered': False,
+            'vs_currency': vs_currency
+        })
+        new_alert.unique_id = new_alert_id()
+        new_alert.created_at = int(time.time())
+        
+        alerts[user_id].append(new_alert)
+        await asyncio.to_thread(save_alerts, alerts)
+    stats_registry.alert_created(new_alert)
     
     # Send ENHANCED confirmation
     price_diff = ((target_price - current_price) / current_price * 100)
@@ -1079,13 +4001,13 @@ async def set_alert(ctx, *, input_str: str):
     )
     
     embed.add_field(name="Cryptocurrency", value=f"**{coin['name']}** ({coin['symbol'].upper()})", inline=True)
-    embed.add_field(name="Target Price", value=f"**${target_price:,.2f}**", inline=True)
-    embed.add_field(name="Current Price", value=f"${current_price:,.2f}", inline=True)
+    embed.add_field(name="Target Price", value=f"**{fmt_money(target_price, vs_currency)}**", inline=True)
+    embed.add_field(name="Current Price", value=fmt_money(current_price, vs_currency), inline=True)
     embed.add_field(name="Difference", value=f"{price_diff:+.2f}%", inline=True)
     embed.add_field(name="Direction", value=f"Will trigger when price goes **{direction}** target", inline=True)
     embed.add_field(name="Status", value="ACTIVE & WATCHING!", inline=True)
     
-    embed.set_footer(text=f"Alert ID: {len(alerts[user_id])} • Good luck!")
+    embed.set_footer(text=f"Alert ID: {new_alert.unique_id} • Good luck!")
     
     message = await ctx.send(embed=embed)
     await message.add_reaction("🎯")
@@ -1094,41 +4016,45 @@ async def set_alert(ctx, *, input_str: str):
     
     # Also send to alerts channel if different
     if ALERTS_CHANNEL_ID and ALERTS_CHANNEL_ID != ctx.channel.id:
-        await send_to_alerts_channel(f"New alert set by {ctx.author.mention}: **{coin['name']}** at ${target_price:,.2f}")
+        await send_to_alerts_channel(f"New alert set by {ctx.author.mention}: **{coin['name']}** at {fmt_money(target_price, vs_currency)}")
 
 @bot.command(name='my_alerts', help='Show all your active alerts')
 async def my_alerts(ctx):
     """Display all alerts for the user."""
     user_id = str(ctx.author.id)
-    alerts = load_alerts()
+    alerts = await asyncio.to_thread(load_alerts)
     
-    if user_id not in alerts or not alerts[user_id]:
+    triggered_count = (await asyncio.to_thread(alert_archive.counts, user_id)).get('triggered', 0)
+    if not alerts.get(user_id) and not triggered_count:
         await ctx.send("No alerts yet! Set one with `!set_alert SYMBOL PRICE` and start tracking!")
         return
     
-    active_alerts = [a for a in alerts[user_id] if not a['triggered']]
-    triggered_alerts = [a for a in alerts[user_id] if a['triggered']]
+    active_alerts = [a for a in alerts.get(user_id, []) if not a['triggered']]
+    history = await asyncio.to_thread(alert_archive.history, user_id, limit=3, reason='triggered')
+    triggered_alerts = [alert for _, _, alert in history]
     
     embed = discord.Embed(
         title=f"{ctx.author.name}'s ALERT DASHBOARD",
-        description=f"Active: {len(active_alerts)} | Triggered: {len(triggered_alerts)}",
+        description=f"Active: {len(active_alerts)} | Triggered: {triggered_count}",
         color=discord.Color.blue(),
         timestamp=datetime.now()
     )
     
     if active_alerts:
+        prices = await asyncio.to_thread(get_crypto_prices, [a['coin_id'] for a in active_alerts[:6]])
         for i, alert in enumerate(active_alerts[:6], 1):
-            current_price = get_crypto_price(alert['coin_id']) or alert['current_price']
+            vs_currency = alert.get('vs_currency', 'usd')
+            current_price = convert_price(prices.get(alert['coin_id']), vs_currency) or alert['current_price']
             price_diff = ((alert['target_price'] - current_price) / current_price * 100)
-            days_ago = (datetime.now() - datetime.fromisoformat(alert['timestamp'])).days
+            days_ago = int(time.time() - alert.created_at) // 86400
             
             status_emoji = "🚀" if price_diff < -5 else "📈" if price_diff < 0 else "⚡" if price_diff < 5 else "🛡️"
             
             embed.add_field(
                 name=f"{status_emoji} {i}. {alert['name']} ({alert['symbol']})",
                 value=(
-                    f"Target: ${alert['target_price']:,.2f}\n"
-                    f"Current: ${current_price:,.2f}\n"
+                    f"Target: {fmt_money(alert['target_price'], vs_currency)}\n"
+                    f"Current: {fmt_money(current_price, vs_currency)}\n"
                     f"Diff: {price_diff:+.2f}%\n"
                     f"Set: {days_ago}d ago"
                 ),
@@ -1136,9 +4062,9 @@ async def my_alerts(ctx):
             )
     
     if triggered_alerts:
-        triggered_list = "\n".join([f"• {a['name']} at ${a['target_price']:,.2f}" for a in triggered_alerts[:3]])
-        if len(triggered_alerts) > 3:
-            triggered_list += f"\n• ...and {len(triggered_alerts) - 3} more"
+        triggered_list = "\n".join([f"• {a['name']} at {fmt_money(a['target_price'], a.get('vs_currency', 'usd'))}" for a in triggered_alerts[:3]])
+        if triggered_count > 3:
+            triggered_list += f"\n• ...and {triggered_count - 3} more (`!alert_history`)"
         
         embed.add_field(name="TRIGGERED ALERTS", value=triggered_list or "None yet!", inline=False)
     
@@ -1150,8 +4076,15 @@ async def my_alerts(ctx):
 
 # ----- ENHANCED PRICE COMMANDS -----
 @bot.command(name='price', help='Get all top coin prices')
+@hot_command()
 async def all_prices(ctx):
     """Get all top coin prices."""
+    response = await response_cache.get_or_build(('price',), build_all_prices_response)
+    await send_response(ctx, response)
+
+@traced
+def build_all_prices_response():
+    """Build the !price embed."""
     embed = discord.Embed(
         title="TOP CRYPTO PRICES",
         color=discord.Color.green(),
@@ -1159,10 +4092,10 @@ async def all_prices(ctx):
     )
     
     prices_data = []
+    results, missing = fan_out(get_price_with_change, list(COINS.values()))
     for symbol, coin_id in COINS.items():
-        price = get_crypto_price(coin_id)
-        if price:
-            change = get_price_change(coin_id) or 0
+        if coin_id in results:
+            price, change = results[coin_id]
             emoji = "🚀" if change > 5 else "📈" if change > 0 else "📉" if change < -5 else "⚡"
             prices_data.append((symbol.upper(), price, change, emoji))
     
@@ -1178,54 +4111,80 @@ async def all_prices(ctx):
         )
     
     embed.set_footer(text=f"Use !btc, !eth, !sol for detailed info • {get_random_emoji_combo()}")
+    note_missing(embed, [s.upper() for s, coin_id in COINS.items() if coin_id in missing])
     
-    message = await ctx.send(embed=embed)
-    await message.add_reaction("💰")
-    await message.add_reaction("📊")
+    return {'embed': embed, 'reactions': ["💰", "📊"], 'partial': bool(missing)}
+
+def get_price_with_change(coin_id):
+    """Get (price, 24h change) for a coin, or None if the price is unavailable."""
+    price = get_crypto_price(coin_id)
+    if not price:
+        return None
+    return price, get_price_change(coin_id) or 0
 
 @bot.command(name='btc', help='Get Bitcoin price and info')
+@requires_warm('mexc')
+@hot_command()
 async def btc_info(ctx, subcommand: str = None):
     """Get Bitcoin info."""
     await handle_coin_command(ctx, 'btc', subcommand)
 
 @bot.command(name='eth', help='Get Ethereum price and info')
+@requires_warm('mexc')
+@hot_command()
 async def eth_info(ctx, subcommand: str = None):
     """Get Ethereum info."""
     await handle_coin_command(ctx, 'eth', subcommand)
 
 @bot.command(name='sol', help='Get Solana price and info')
+@requires_warm('mexc')
+@hot_command()
 async def sol_info(ctx, subcommand: str = None):
     """Get Solana info."""
     await handle_coin_command(ctx, 'sol', subcommand)
 
 @bot.command(name='xrp', help='Get Ripple price and info')
+@requires_warm('mexc')
+@hot_command()
 async def xrp_info(ctx, subcommand: str = None):
     """Get Ripple info."""
     await handle_coin_command(ctx, 'xrp', subcommand)
 
 @bot.command(name='bnb', help='Get Binance Coin price and info')
+@requires_warm('mexc')
+@hot_command()
 async def bnb_info(ctx, subcommand: str = None):
     """Get Binance Coin info."""
     await handle_coin_command(ctx, 'bnb', subcommand)
 
 @bot.command(name='doge', help='Get Dogecoin price and info')
+@requires_warm('mexc')
+@hot_command()
 async def doge_info(ctx, subcommand: str = None):
     """Get Dogecoin info."""
     await handle_coin_command(ctx, 'doge', subcommand)
 
 @bot.command(name='ada', help='Get Cardano price and info')
+@requires_warm('mexc')
+@hot_command()
 async def ada_info(ctx, subcommand: str = None):
     """Get Cardano info."""
     await handle_coin_command(ctx, 'ada', subcommand)
 
 @bot.command(name='volume', help='Get volume for all top coins')
+@requires_warm('mexc')
+@hot_command()
 async def all_volumes(ctx):
     """Get volume for all top coins."""
+    response = await response_cache.get_or_build(('volume',), build_volume_response)
+    await send_response(ctx, response)
+
+def build_volume_response():
+    """Build the !volume embed."""
     PAIRS = get_top_coins(TOP_N)
     
     if not PAIRS:
-        await ctx.send("Could not fetch volume data.")
-        return
+        return {'content': "Could not fetch volume data."}
     
     embed = discord.Embed(
         title="TOP CRYPTO VOLUMES",
@@ -1233,8 +4192,10 @@ async def all_volumes(ctx):
         timestamp=datetime.now()
     )
     
-    for name, symbol in list(PAIRS.items())[:10]:
-        data = get_mexc_price(symbol)
+    pairs = list(PAIRS.items())[:10]
+    results, missing = fan_out(get_mexc_price, [symbol for _, symbol in pairs])
+    for name, symbol in pairs:
+        data = results.get(symbol)
         if data:
             volume = float(data.get("quoteVolume", 0))
             
@@ -1256,7 +4217,8 @@ async def all_volumes(ctx):
             )
     
     embed.set_footer(text="24h trading volume on MEXC")
-    await ctx.send(embed=embed)
+    note_missing(embed, missing)
+    return {'embed': embed, 'partial': bool(missing)}
 
 async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
     """Handle individual coin commands with ENHANCED responses."""
@@ -1266,26 +4228,35 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
         await ctx.send(f"Oops! {coin_symbol.upper()} is not in my watchlist!\nSupported coins: {', '.join(COINS.keys()).upper()}")
         return
     
-    coin_id = COINS[coin_symbol]
+    view = COIN_SUBCOMMANDS.get(subcommand.lower()) if subcommand else 'overview'
+    if view is None:
+        # Unknown subcommand
+        await ctx.send(f"Unknown subcommand for {COIN_NAMES[coin_symbol]}. Try: `!{coin_symbol} price`, `!{coin_symbol} volume`, `!{coin_symbol} h/l`, `!{coin_symbol} s/r`, `!{coin_symbol} support`, `!{coin_symbol} resistance`")
+        return
+    
+    response = await response_cache.get_or_build(('coin', coin_symbol, view), build_coin_response, coin_symbol, view)
+    await send_response(ctx, response)
+
+@traced
+def build_coin_response(coin_symbol: str, view: str):
+    """Build the response for one coin command view (see COIN_SUBCOMMANDS)."""
     coin_name = COIN_NAMES[coin_symbol]
     
     # Get MEXC data
     PAIRS = get_top_coins(TOP_N)
     if not PAIRS or coin_symbol.upper() not in PAIRS:
-        await ctx.send(f"Data fetch failed! Could not get data for {coin_name}. Try again!")
-        return
+        return {'content': f"Data fetch failed! Could not get data for {coin_name}. Try again!"}
     
     data = get_mexc_price(PAIRS[coin_symbol.upper()])
     if not data:
-        await ctx.send(f"Market data missing! Could not fetch data for {coin_name}.")
-        return
+        return {'content': f"Market data missing! Could not fetch data for {coin_name}."}
     
     # Handle subcommands
-    if subcommand is None:
+    if view == 'overview':
         # Default: Show price with FUN info
-        await show_enhanced_coin_price(ctx, coin_symbol, coin_name, data)
+        return build_enhanced_coin_price(coin_symbol, coin_name, data)
     
-    elif subcommand.lower() in ['price', 'p']:
+    elif view == 'price':
         # Show only price with FUN
         last_price = float(data.get("lastPrice", 0))
         change = float(data.get("priceChangePercent", 0))
@@ -1304,12 +4275,10 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
         
         embed.set_footer(text=f"MEXC Exchange • {get_random_emoji_combo()}")
         
-        message = await ctx.send(embed=embed)
         reactions = ["💰", "📈", "🎯"] if change >= 0 else ["💰", "📉", "🛡️"]
-        for reaction in reactions:
-            await message.add_reaction(reaction)
+        return {'embed': embed, 'reactions': reactions}
     
-    elif subcommand.lower() in ['volume', 'vol', 'v']:
+    elif view == 'volume':
         # Show volume with FUN
         volume = float(data.get("quoteVolume", 0))
         
@@ -1346,12 +4315,10 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
         
         embed.set_footer(text="24h trading volume • Money moves!")
         
-        message = await ctx.send(embed=embed)
         reactions = ["📊", "💎", "🔥"] if volume > 500000000 else ["📊", "💎", "⚡"]
-        for reaction in reactions:
-            await message.add_reaction(reaction)
+        return {'embed': embed, 'reactions': reactions}
     
-    elif subcommand.lower() in ['h/l', 'hl', 'highlow']:
+    elif view == 'h/l':
         # Show high/low
         high = float(data.get("highPrice", 0))
         low = float(data.get("lowPrice", 0))
@@ -1374,9 +4341,9 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
             embed.add_field(name="Current Position", value=f"{current_position:.1f}% of range", inline=False)
         
         embed.set_footer(text="24h price range on MEXC")
-        await ctx.send(embed=embed)
+        return {'embed': embed}
     
-    elif subcommand.lower() in ['s/r', 'sr', 'supportresistance']:
+    elif view == 's/r':
         # Show support and resistance
         support_levels, resistance_levels = get_support_resistance_levels(coin_symbol.upper())
         last_price = float(data.get("lastPrice", 0))
@@ -1402,9 +4369,9 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
             embed.add_field(name="Resistance Levels", value="Calculating...", inline=True)
         
         embed.set_footer(text="These are estimated levels for educational purposes")
-        await ctx.send(embed=embed)
+        return {'embed': embed}
     
-    elif subcommand.lower() in ['support']:
+    elif view == 'support':
         # Show only support levels
         support_levels, _ = get_support_resistance_levels(coin_symbol.upper())
         last_price = float(data.get("lastPrice", 0))
@@ -1434,9 +4401,9 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
             embed.add_field(name="Support Levels", value="Calculating support levels...", inline=False)
         
         embed.set_footer(text="Support = Price tends to bounce UP from these levels")
-        await ctx.send(embed=embed)
+        return {'embed': embed}
     
-    elif subcommand.lower() in ['resistance']:
+    else:
         # Show only resistance levels
         _, resistance_levels = get_support_resistance_levels(coin_symbol.upper())
         last_price = float(data.get("lastPrice", 0))
@@ -1463,13 +4430,9 @@ async def handle_coin_command(ctx, coin_symbol: str, subcommand: str = None):
             embed.add_field(name="Resistance Levels", value="Calculating resistance levels...", inline=False)
         
         embed.set_footer(text="Resistance = Price tends to bounce DOWN from these levels")
-        await ctx.send(embed=embed)
-    
-    else:
-        # Unknown subcommand
-        await ctx.send(f"Unknown subcommand for {coin_name}. Try: `!{coin_symbol} price`, `!{coin_symbol} volume`, `!{coin_symbol} h/l`, `!{coin_symbol} s/r`, `!{coin_symbol} support`, `!{coin_symbol} resistance`")
+        return {'embed': embed}
 
-async def show_enhanced_coin_price(ctx, coin_symbol: str, coin_name: str, data: dict):
+def build_enhanced_coin_price(coin_symbol: str, coin_name: str, data: dict):
     """Show comprehensive coin information with FUN."""
     last_price = float(data.get("lastPrice", 0))
     change = float(data.get("priceChangePercent", 0))
@@ -1522,8 +4485,6 @@ async def show_enhanced_coin_price(ctx, coin_symbol: str, coin_name: str, data:
     
     embed.set_footer(text=f"Use !commands for more options • Good luck trading!")
     
-    message = await ctx.send(embed=embed)
-    
     # Add relevant reactions
     reactions = []
     if change > 5:
@@ -1535,21 +4496,23 @@ async def show_enhanced_coin_price(ctx, coin_symbol: str, coin_name: str, data:
     else:
         reactions = ["📉", "🛡️", "💎", "🎯"]
     
-    for reaction in reactions[:3]:
-        await message.add_reaction(reaction)
+    return {'embed': embed, 'reactions': reactions[:3]}
 
 # ----- ADVANCED PRICE COMMANDS -----
 @bot.command(name='price_gecko', help='Get price from CoinGecko for any coin')
+@requires_warm('coins')
 async def price_gecko(ctx, *, coin_identifier: str):
     """Get price from CoinGecko for any coin."""
     coin = find_coin(coin_identifier)
     
     if not coin:
-        await ctx.send(f"Couldnt find '{coin_identifier}'. Try `!search {coin_identifier}`")
+        await ctx.send(not_found_message(coin_identifier))
         return
     
-    price = get_crypto_price(coin['id'])
-    change = get_price_change(coin['id'])
+    price, change = await asyncio.gather(
+        asyncio.to_thread(get_crypto_price, coin['id']),
+        asyncio.to_thread(get_price_change, coin['id'])
+    )
     
     if price:
         embed = discord.Embed(
@@ -1572,6 +4535,7 @@ async def price_gecko(ctx, *, coin_identifier: str):
     else:
         await ctx.send(f"Could not fetch price for {coin['name']}.")
 
+@traced
 def get_price_change(coin_id):
     """Get 24h price change for a coin."""
     try:
@@ -1587,7 +4551,7 @@ def get_price_change(coin_id):
         if api_key:
             headers['x-cg-demo-api-key'] = api_key
         
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = http_get(url, params=params, headers=headers, timeout=10, endpoint='simple_price')
         data = response.json()
         
         if coin_id in data and 'usd_24h_change' in data[coin_id]:
@@ -1598,10 +4562,11 @@ def get_price_change(coin_id):
 
 # ----- MEXC COMMANDS -----
 @bot.command(name='mexc', help='Get MEXC exchange price')
+@requires_warm('mexc')
 async def mexc_price(ctx, coin: str = None):
     """Get MEXC exchange price."""
     if coin is None:
-        PAIRS = get_top_coins(10)
+        PAIRS = await asyncio.to_thread(get_top_coins, 10)
         
         embed = discord.Embed(
             title="MEXC PRICE CHECK",
@@ -1624,13 +4589,13 @@ async def mexc_price(ctx, coin: str = None):
         return
     
     coin = coin.upper()
-    PAIRS = get_top_coins(TOP_N)
+    PAIRS = await asyncio.to_thread(get_top_coins, TOP_N)
     
     if coin not in PAIRS:
         await ctx.send(f"{coin} not in top {TOP_N} coins on MEXC.")
         return
     
-    data = get_mexc_price(PAIRS[coin])
+    data = await asyncio.to_thread(get_mexc_price, PAIRS[coin])
     
     if not data:
         await ctx.send(f"Could not fetch data for {coin}.")
@@ -1666,13 +4631,19 @@ async def mexc_price(ctx, coin: str = None):
     await ctx.send(embed=embed)
 
 @bot.command(name='mexc_all', help='Show all MEXC top 20 prices')
+@requires_warm('mexc')
+@hot_command()
 async def mexc_all(ctx):
     """Show all MEXC top 20 prices."""
+    response = await response_cache.get_or_build(('mexc_all',), build_mexc_all_response)
+    await send_response(ctx, response)
+
+def build_mexc_all_response():
+    """Build the !mexc_all embed."""
     PAIRS = get_top_coins(TOP_N)
     
     if not PAIRS:
-        await ctx.send("Could not fetch MEXC data.")
-        return
+        return {'content': "Could not fetch MEXC data."}
     
     embed = discord.Embed(
         title="MEXC TOP 20 LIVE PRICES",
@@ -1680,8 +4651,10 @@ async def mexc_all(ctx):
         timestamp=datetime.now()
     )
     
-    for name, symbol in list(PAIRS.items())[:20]:
-        data = get_mexc_price(symbol)
+    pairs = list(PAIRS.items())[:20]
+    results, missing = fan_out(get_mexc_price, [symbol for _, symbol in pairs])
+    for name, symbol in pairs:
+        data = results.get(symbol)
         if data:
             price = fmt(data.get("lastPrice", 0))
             change = float(data.get("priceChangePercent", 0))
@@ -1694,13 +4667,15 @@ async def mexc_all(ctx):
             )
     
     embed.set_footer(text="Real-time data • Updates every 60s in price channel")
-    await ctx.send(embed=embed)
+    note_missing(embed, missing)
+    return {'embed': embed, 'partial': bool(missing)}
 
 # ----- NEWS COMMANDS -----
 @bot.command(name='news', help='Get latest crypto news')
+@requires_warm('news')
 async def news_command(ctx, count: int = 5):
     """Get latest crypto news."""
-    news = get_crypto_news()
+    news = await asyncio.to_thread(get_crypto_news)
     
     if not news:
         await ctx.send("Could not fetch news at the moment.")
@@ -1728,6 +4703,7 @@ async def news_command(ctx, count: int = 5):
 
 # ----- SEARCH & INFO COMMANDS -----
 @bot.command(name='search', help='Search for cryptocurrencies')
+@requires_warm('coins')
 async def search_coin(ctx, *, query: str):
     """Search for cryptocurrencies."""
     query = query.lower().strip()
@@ -1736,23 +4712,12 @@ async def search_coin(ctx, *, query: str):
         await ctx.send("Please enter at least 2 characters to search.")
         return
     
-    results = []
-    for coin in coin_cache['all_coins']:
-        if (query in coin['id'].lower() or 
-            query in coin['symbol'].lower() or 
-            query in coin['name'].lower()):
-            results.append(coin)
+    results = await offload('search', search_coin_list, coin_cache['all_coins'], query)
     
     if not results:
         await ctx.send(f"No cryptocurrencies found for '{query}'")
         return
     
-    results.sort(key=lambda x: (
-        not (x['symbol'].lower() == query),
-        not (x['id'].lower() == query),
-        not (x['name'].lower() == query)
-    ))
-    
     embed = discord.Embed(
         title=f"SEARCH RESULTS: '{query}'",
         description=f"Found {len(results)} cryptocurrencies",
@@ -1772,15 +4737,21 @@ async def search_coin(ctx, *, query: str):
     await ctx.send(embed=embed)
 
 @bot.command(name='coin_info', help='Get detailed info about a cryptocurrency')
+@requires_warm('coins')
 async def coin_info(ctx, *, coin_identifier: str):
     """Get detailed information about a coin."""
     coin = find_coin(coin_identifier)
     
     if not coin:
-        await ctx.send(f"Couldnt find '{coin_identifier}'.")
+        await ctx.send(not_found_message(coin_identifier))
         return
     
-    price = get_crypto_price(coin['id'])
+    # Market numbers come from the bulk market table; the description is lazy-loaded and cached
+    row, description = await asyncio.gather(
+        asyncio.to_thread(get_market_row, coin['id']),
+        asyncio.to_thread(get_coin_description, coin['id'])
+    )
+    price = row.price if row and row.price else await asyncio.to_thread(get_crypto_price, coin['id'])
     
     embed = discord.Embed(
         title=f"{coin['name']} ({coin['symbol'].upper()})",
@@ -1794,61 +4765,31 @@ async def coin_info(ctx, *, coin_identifier: str):
     
     embed.add_field(name="Symbol", value=coin['symbol'].upper(), inline=True)
     
-    # Try to get market data
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin['id']}"
-        headers = {}
-        api_key = os.getenv('COINGECKO_API_KEY')
-        if api_key:
-            headers['x-cg-demo-api-key'] = api_key
+    if row:
+        if row.rank:
+            embed.add_field(name="Market Cap Rank", value=f"#{row.rank}", inline=True)
         
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            market_data = data.get('market_data', {})
-            
-            if 'market_cap' in market_data and 'usd' in market_data['market_cap']:
-                market_cap = market_data['market_cap']['usd']
-                embed.add_field(name="Market Cap", value=f"${market_cap:,.0f}", inline=True)
-            
-            if 'total_volume' in market_data and 'usd' in market_data['total_volume']:
-                volume = market_data['total_volume']['usd']
-                embed.add_field(name="24h Volume", value=f"${volume:,.0f}", inline=True)
-            
-            if 'price_change_percentage_24h' in market_data:
-                change_24h = market_data['price_change_percentage_24h']
-                change_emoji = "📈" if change_24h > 0 else "📉"
-                embed.add_field(name="24h Change", value=f"{change_emoji} {change_24h:+.2f}%", inline=True)
-            
-            if 'description' in data and 'en' in data['description']:
-                description = data['description']['en']
-                if len(description) > 300:
-                    description = description[:300] + "..."
-                embed.add_field(name="Description", value=description, inline=False)
-    except:
-        pass
+        if row.market_cap is not None:
+            embed.add_field(name="Market Cap", value=f"${row.market_cap:,.0f}", inline=True)
+        
+        if row.volume is not None:
+            embed.add_field(name="24h Volume", value=f"${row.volume:,.0f}", inline=True)
+        
+        if row.change_24h is not None:
+            change_emoji = "📈" if row.change_24h > 0 else "📉"
+            embed.add_field(name="24h Change", value=f"{change_emoji} {row.change_24h:+.2f}%", inline=True)
+    
+    if description:
+        embed.add_field(name="Description", value=description, inline=False)
     
     embed.set_footer(text="Use !set_alert to create price alerts")
     await ctx.send(embed=embed)
 
 # ----- UTILITY COMMANDS -----
-@bot.command(name='stats', help='Show bot statistics')
-async def bot_stats(ctx):
-    """Show bot statistics."""
-    alerts = load_alerts()
-    
-    total_alerts = 0
-    active_alerts = 0
-    triggered_alerts = 0
-    unique_users = 0
-    unique_coins = set()
-    
-    for user_id, user_alerts in alerts.items():
-        unique_users += 1
-        total_alerts += len(user_alerts)
-        active_alerts += len([a for a in user_alerts if not a['triggered']])
-        triggered_alerts += len([a for a in user_alerts if a['triggered']])
-        unique_coins.update([a['coin_id'] for a in user_alerts])
+def build_stats_embed():
+    """The !stats embed, built from running counters only."""
+    archived_total = sum(stats_registry.archived.values())
+    active_alerts = stats_registry.active_alerts()
     
     embed = discord.Embed(
         title="BOT STATISTICS",
@@ -1857,14 +4798,25 @@ async def bot_stats(ctx):
     )
     
     embed.add_field(name="Bot Status", value="Online", inline=True)
-    embed.add_field(name="Total Users", value=str(unique_users), inline=True)
-    embed.add_field(name="Total Alerts", value=str(total_alerts), inline=True)
+    embed.add_field(name="Total Users", value=str(len(stats_registry.alert_users)), inline=True)
+    embed.add_field(name="Total Alerts", value=str(active_alerts + archived_total), inline=True)
     embed.add_field(name="Active Alerts", value=str(active_alerts), inline=True)
-    embed.add_field(name="Triggered Alerts", value=str(triggered_alerts), inline=True)
-    embed.add_field(name="Tracked Coins", value=str(len(unique_coins)), inline=True)
+    embed.add_field(name="Triggered Alerts", value=str(stats_registry.archived['triggered']), inline=True)
+    embed.add_field(name="Tracked Coins", value=str(len(stats_registry.alert_coins)), inline=True)
     embed.add_field(name="Coin Database", value=f"{len(coin_cache.get('all_coins', [])):,}", inline=True)
     embed.add_field(name="Posted News", value=str(len(posted_news)), inline=True)
-    embed.add_field(name="Update Interval", value=f"{UPDATE_INTERVAL}s", inline=True)
+    embed.add_field(name="Update Interval", value=f"{board_interval['seconds']}s", inline=True)
+    embed.add_field(name="Alerts Set (1h / 24h)", value=stats_registry.window('alerts_created'), inline=True)
+    embed.add_field(name="Alerts Hit (1h / 24h)", value=stats_registry.window('alerts_triggered'), inline=True)
+    embed.add_field(name="News Posted (1h / 24h)", value=stats_registry.window('news_posted'), inline=True)
+    embed.add_field(name="Commands (1h / 24h)", value=stats_registry.window('commands'), inline=True)
+    embed.add_field(name="Top Commands", value=stats_registry.top_commands(), inline=False)
+    embed.add_field(name="Response Cache", value=response_cache.summary(), inline=False)
+    embed.add_field(name="Price Sources", value=price_router.scoreboard() or "None", inline=False)
+    embed.add_field(name="HTTP Cache", value=http_cache.summary(), inline=False)
+    embed.add_field(name="Alert Delivery", value=alert_notifier.summary(), inline=False)
+    embed.add_field(name="Gateway", value=gateway_summary(), inline=False)
+    embed.add_field(name="Cache Policy", value=cache_policy_report(), inline=False)
     
     if coin_list_last_updated:
         hours_ago = (datetime.now() - coin_list_last_updated).seconds // 3600
@@ -1873,7 +4825,12 @@ async def bot_stats(ctx):
             value=f"{hours_ago}h ago",
             inline=True
         )
-    
+    return embed
+
+@bot.command(name='stats', help='Show bot statistics')
+async def bot_stats(ctx):
+    """Show bot statistics."""
+    embed = build_stats_embed()
     embed.set_footer(text=f"Server: {ctx.guild.name if ctx.guild else 'DM'}")
     await ctx.send(embed=embed)
 
@@ -1882,9 +4839,99 @@ async def bot_stats(ctx):
 async def refresh_coins(ctx):
     """Force refresh coin list."""
     await ctx.send("Refreshing coin list from CoinGecko...")
-    get_all_coingecko_coins(force_refresh=True)
+    await asyncio.to_thread(get_all_coingecko_coins, True)
     await ctx.send(f"Coin list refreshed! Now tracking {len(coin_cache['all_coins'])} cryptocurrencies.")
 
+@bot.command(name='profile', help='Sample where the bot spends its time (Admin only)')
+@commands.has_permissions(administrator=True)
+async def profile(ctx, action: str = 'status', seconds: int = 60):
+    """`!profile start [seconds]`, `!profile stop` or `!profile status`."""
+    global profile_report_task
+    action = action.lower()
+    
+    if action == 'start':
+        if profiler.running:
+            await ctx.send("A profile is already running. Use `!profile stop` to finish it early.")
+            return
+        seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+        profiler.start(asyncio.get_running_loop())
+        profile_report_task = asyncio.create_task(finish_profile(ctx.channel, seconds), context=contextvars.Context())
+        await ctx.send(f"Profiling for {seconds}s (sampling every {PROFILE_INTERVAL_MS:g}ms)...")
+    elif action == 'stop':
+        if not profiler.running:
+            await ctx.send("No profile is running.")
+            return
+        if profile_report_task:
+            profile_report_task.cancel()
+        await report_profile(ctx.channel)
+    elif profiler.running:
+        await ctx.send(f"Profiling: {time.time() - profiler.started:.0f}s in, {profiler.samples:,} samples so far.")
+    else:
+        await ctx.send("No profile is running. Start one with `!profile start 60`.")
+
+async def finish_profile(channel, seconds):
+    await asyncio.sleep(seconds)
+    await report_profile(channel)
+
+async def report_profile(channel):
+    """Stop the profiler, write the collapsed stacks file and post the summary."""
+    profiler.stop()
+    path = os.path.join(PROFILE_DIR, f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded")
+    await asyncio.to_thread(profiler.write_collapsed, path)
+    logging.info(f"Profile written to {path} ({profiler.samples} samples)")
+    
+    embed = build_profile_embed(path)
+    if os.path.getsize(path) < 8 * 1024 * 1024:
+        await channel.send(embed=embed, file=discord.File(path))
+    else:
+        await channel.send(embed=embed)
+
+def build_profile_embed(path, n=10):
+    """Top-N summary of the last profile."""
+    busy = sum(profiler.stacks.values()) or 1
+    embed = discord.Embed(
+        title="PROFILE",
+        description=f"{profiler.elapsed:.0f}s • {profiler.samples:,} samples • {busy:,} busy thread samples",
+        color=discord.Color.purple(),
+        timestamp=datetime.now()
+    )
+    
+    def short(name, width=55):
+        return name if len(name) <= width else '…' + name[-width + 1:]
+    
+    functions = "\n".join(
+        f"`{own / busy:5.1%} {total / busy:5.1%}` {short(name)}" for name, own, total in profiler.top_functions(n)
+    )
+    embed.add_field(name="Top functions (self / total)", value=functions[:1024] or "No busy samples", inline=False)
+    labels = "\n".join(f"`{count / busy:5.1%}` {short(label)}" for label, count in profiler.top_labels())
+    embed.add_field(name="By command / task / thread", value=labels[:1024] or "None", inline=False)
+    idle = ", ".join(f"{short(label, 30)} {count:,}" for label, count in profiler.idle.most_common(5))
+    embed.add_field(name="Idle samples", value=idle[:1024] or "None", inline=False)
+    
+    overhead = profiler.sampler_cpu / profiler.elapsed if profiler.elapsed else 0
+    embed.set_footer(text=f"{path} • sampler overhead {overhead:.2%} of one core")
+    return embed
+
+@bot.command(name='jobs', help='Show background job health (Admin only)')
+@commands.has_permissions(administrator=True)
+async def jobs(ctx):
+    """Show the supervised background jobs."""
+    embed = discord.Embed(
+        title="BACKGROUND JOBS",
+        color=discord.Color.red() if any(job.failures_in_row for job in supervised_jobs) else discord.Color.green(),
+        timestamp=datetime.now()
+    )
+    for job in supervised_jobs:
+        value = job.health()
+        if job.next_iteration:
+            value += f"\nnext run <t:{int(job.next_iteration.timestamp())}:R>"
+        if job.last_error:
+            at, error = job.last_error
+            value += f"\nlast error <t:{int(at)}:R>: `{error[:150]}`"
+        embed.add_field(name=f"{job.name} ({job.overrun} on overrun)", value=value[:1024], inline=False)
+    embed.set_footer(text=f"Deadline {JOB_DEADLINE_FACTOR:g}x interval • jitter up to {JOB_JITTER:.0%}")
+    await ctx.send(embed=embed)
+
 @bot.command(name='commands', aliases=['cmds', 'help'], help='Show all available commands')
 async def show_commands(ctx):
     """Show help menu with FUN."""
@@ -1903,11 +4950,12 @@ async def show_commands(ctx):
             ("!moon", "Moon mission!")
         ]),
         ("ALERT COMMANDS", [
-            ("!set_alert [coin] [price]", "Set price alert"),
+            ("!set_alert [coin] [price] [currency]", "Set price alert (usd, eur, btc...)"),
             ("!my_alerts", "View your alerts"),
             ("!alerts_detailed", "Detailed alerts list"),
             ("!delete_alert [number]", "Delete specific alert"),
-            ("!clear_alerts", "Clear all your alerts")
+            ("!clear_alerts", "Clear all your alerts"),
+            ("!alert_history [limit]", "Triggered, expired and deleted alerts")
         ]),
         ("PRICE COMMANDS", [
             ("!price", "All top coin prices"),
@@ -1929,10 +4977,16 @@ async def show_commands(ctx):
             ("!search [query]", "Search cryptocurrencies"),
             ("!coin_info [coin]", "Detailed coin info")
         ]),
+        ("SLASH COMMANDS", [
+            ("/coin, /price, /set_alert, /news", "Same features as slash commands"),
+            ("/search, /coin_info, /my_alerts", "Coin names autocomplete as you type")
+        ]),
         ("BOT COMMANDS", [
             ("!stats", "Bot statistics"),
             ("!commands / !help", "This help menu"),
-            ("!refresh_coins", "Refresh coin list (Admin)")
+            ("!refresh_coins", "Refresh coin list (Admin)"),
+            ("!profile start 60", "Profile where the bot spends time (Admin)"),
+            ("!jobs", "Background job health (Admin)")
         ])
     ]
     
@@ -1979,11 +5033,176 @@ async def show_commands(ctx):
     await message.add_reaction("🚀")
     await message.add_reaction("💰")
 
+# ==================== SLASH COMMANDS ====================
+# Application-command frontend for the prefix handlers above. Every interaction
+# is deferred first so slow upstream lookups never hit Discord's 3 second
+# acknowledgement limit, then wrapped in a Context and handed to the same code
+# the `!` commands use.
+COIN_VIEW_CHOICES = [
+    app_commands.Choice(name="Overview", value="overview"),
+    app_commands.Choice(name="Price", value="price"),
+    app_commands.Choice(name="Volume", value="volume"),
+    app_commands.Choice(name="High/Low", value="h/l"),
+    app_commands.Choice(name="Support/Resistance", value="s/r"),
+    app_commands.Choice(name="Support", value="support"),
+    app_commands.Choice(name="Resistance", value="resistance")
+]
+
+async def interaction_context(interaction: discord.Interaction, *caches):
+    """Defer the interaction and build a Context the prefix handlers can use."""
+    if not interaction.response.is_done():
+        await interaction.response.defer(thinking=True)
+    ensure_warm(*caches)
+    return await commands.Context.from_interaction(interaction)
+
+async def coin_autocomplete(interaction: discord.Interaction, current: str):
+    """Autocomplete coin names from the in-memory coin index."""
+    return [
+        app_commands.Choice(name=f"{coin['name']} ({coin['symbol'].upper()})"[:100], value=coin['id'])
+        for coin in suggest_coins(current)
+    ]
+
+@bot.tree.command(name='price', description='Get all top coin prices')
+async def slash_price(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction)
+    check_hot_cooldown(ctx.message)
+    await ctx.invoke(all_prices)
+
+@bot.tree.command(name='coin', description='Get price and info for a watchlist coin')
+@app_commands.describe(symbol='Coin from the watchlist', view='What to show')
+@app_commands.choices(
+    symbol=[app_commands.Choice(name=COIN_NAMES[s], value=s) for s in COINS],
+    view=COIN_VIEW_CHOICES
+)
+async def slash_coin(interaction: discord.Interaction, symbol: str, view: str = "overview"):
+    ctx = await interaction_context(interaction, 'mexc')
+    check_hot_cooldown(ctx.message)
+    await handle_coin_command(ctx, symbol, None if view == "overview" else view)
+
+@bot.tree.command(name='volume', description='Get volume for all top coins')
+async def slash_volume(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction, 'mexc')
+    check_hot_cooldown(ctx.message)
+    await ctx.invoke(all_volumes)
+
+@bot.tree.command(name='mexc', description='Get MEXC exchange price')
+@app_commands.describe(coin='Coin symbol, e.g. BTC (leave empty for usage)')
+async def slash_mexc(interaction: discord.Interaction, coin: str = None):
+    ctx = await interaction_context(interaction, 'mexc')
+    await ctx.invoke(mexc_price, coin)
+
+@bot.tree.command(name='mexc_all', description='Show all MEXC top 20 prices')
+async def slash_mexc_all(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction, 'mexc')
+    check_hot_cooldown(ctx.message)
+    await ctx.invoke(mexc_all)
+
+@bot.tree.command(name='price_gecko', description='Get price from CoinGecko for any coin')
+@app_commands.autocomplete(coin=coin_autocomplete)
+async def slash_price_gecko(interaction: discord.Interaction, coin: str):
+    ctx = await interaction_context(interaction, 'coins')
+    await ctx.invoke(price_gecko, coin_identifier=coin)
+
+@bot.tree.command(name='set_alert', description='Set a crypto price alert')
+@app_commands.describe(coin='Coin to watch', price='Target price', currency='Currency of the target price (default usd)')
+@app_commands.autocomplete(coin=coin_autocomplete)
+async def slash_set_alert(interaction: discord.Interaction, coin: str, price: float, currency: str = 'usd'):
+    ctx = await interaction_context(interaction, 'coins')
+    await create_alert(ctx, coin, price, currency)
+
+@bot.tree.command(name='alert_history', description='Show your triggered, expired and deleted alerts')
+@app_commands.describe(limit='How many alerts to show (max 25)')
+async def slash_alert_history(interaction: discord.Interaction, limit: int = 10):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(alert_history, limit=limit)
+
+@bot.tree.command(name='my_alerts', description='Show all your active alerts')
+async def slash_my_alerts(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(my_alerts)
+
+@bot.tree.command(name='alerts_detailed', description='View detailed alerts list')
+async def slash_alerts_detailed(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(alerts_detailed)
+
+@bot.tree.command(name='delete_alert', description='Delete a specific alert')
+@app_commands.describe(number='Alert number from /my_alerts')
+async def slash_delete_alert(interaction: discord.Interaction, number: int):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(delete_alert, number)
+
+@bot.tree.command(name='clear_alerts', description='Clear all your alerts')
+async def slash_clear_alerts(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(clear_alerts)
+
+@bot.tree.command(name='news', description='Get latest crypto news')
+@app_commands.describe(count='Number of news items (1-10)')
+async def slash_news(interaction: discord.Interaction, count: app_commands.Range[int, 1, 10] = 5):
+    ctx = await interaction_context(interaction, 'news')
+    await ctx.invoke(news_command, count)
+
+@bot.tree.command(name='search', description='Search for cryptocurrencies')
+async def slash_search(interaction: discord.Interaction, query: str):
+    ctx = await interaction_context(interaction, 'coins')
+    await ctx.invoke(search_coin, query=query)
+
+@bot.tree.command(name='coin_info', description='Get detailed info about a cryptocurrency')
+@app_commands.autocomplete(coin=coin_autocomplete)
+async def slash_coin_info(interaction: discord.Interaction, coin: str):
+    ctx = await interaction_context(interaction, 'coins')
+    await ctx.invoke(coin_info, coin_identifier=coin)
+
+@bot.tree.command(name='stats', description='Show bot statistics')
+async def slash_stats(interaction: discord.Interaction):
+    ctx = await interaction_context(interaction)
+    await ctx.invoke(bot_stats)
+
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error):
+    """Handle slash command errors."""
+    original = getattr(error, 'original', error)
+    if isinstance(original, WarmingUp):
+        message = str(original)
+    elif isinstance(original, commands.CommandOnCooldown):
+        message = f"Slow down! Try again in {original.retry_after:.1f}s."
+    else:
+        logging.error(f"Slash command error: {error}")
+        message = f"An error occurred: `{str(error)[:100]}`"
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(message, ephemeral=True)
+        else:
+            await interaction.response.send_message(message, ephemeral=True)
+    except Exception as e:
+        logging.error(f"Error reporting slash command error: {e}")
+
+@bot.event
+async def setup_hook():
+    """Register slash commands with Discord before connecting to the gateway."""
+    if not SYNC_SLASH_COMMANDS:
+        return
+    try:
+        if SLASH_GUILD_ID:
+            guild = discord.Object(id=SLASH_GUILD_ID)
+            bot.tree.copy_global_to(guild=guild)
+            synced = await bot.tree.sync(guild=guild)
+        else:
+            synced = await bot.tree.sync()
+        logging.info(f"Synced {len(synced)} slash commands")
+    except Exception as e:
+        logging.error(f"Error syncing slash commands: {e}")
+
 # ==================== ERROR HANDLING ====================
 @bot.event
 async def on_command_error(ctx, error):
     """Handle command errors."""
-    if isinstance(error, commands.CommandNotFound):
+    if isinstance(error, WarmingUp):
+        await ctx.send(str(error))
+    elif isinstance(error, commands.CommandOnCooldown):
+        await ctx.send(f"Slow down! Try again in {error.retry_after:.1f}s.")
+    elif isinstance(error, commands.CommandNotFound):
         await ctx.send(f"Command not found. Use `!commands` to see all commands.")
     elif isinstance(error, commands.MissingRequiredArgument):
         await ctx.send(f"Missing argument. Check usage with `!commands`")
@@ -2011,3 +5230,9 @@ if __name__ == "__main__":
         print("❌ Failed to login. Check your DISCORD_TOKEN environment variable")
     except Exception as e:
         print(f"❌ Error starting bot: {e}")
+    finally:
+        # bot.run returns after a graceful shutdown (Ctrl+C / SIGTERM close)
+        if startup_complete:
+            save_state()
+        if trace_listener:
+            trace_listener.stop()
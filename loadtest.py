@@ -0,0 +1,490 @@
+"""Gateway-level load test of the bot's command layer.
+
+Usage: python loadtest.py [--rates 5,20,50,100] [--duration 30] [--users 2000]
+                          [--channels 50] [--mix price=15,coin=30,...]
+
+Feeds synthetic MESSAGE_CREATE events for many users and channels into the
+bot's gateway dispatch (ConnectionState.parse_message_create -> on_message ->
+process_commands -> command handlers). Discord's REST API is replaced by an
+in-process stand-in with configurable latency and failure rate. CoinGecko,
+MEXC and the RSS feeds are served by a local HTTP server, so the real HTTP
+cache, response cache, price router and worker threads stay in the path.
+
+Arrivals are Poisson at each offered rate in turn. Every step reports
+throughput, end-to-end latency percentiles, queueing (dispatch delay, event
+loop lag, in-flight handlers, thread pool backlog) and error rates. The first
+step that falls behind or misses the latency SLO is the saturation point.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+os.environ.setdefault("DISCORD_TOKEN", "loadtest")
+
+import discord  # noqa: E402
+from discord.ext import commands  # noqa: E402
+
+import bot  # noqa: E402
+
+BOT_USER_ID = 900_000_000_000_000_001
+GUILD_ID = 800_000_000_000_000_001
+CHANNEL_BASE = 700_000_000_000_000_000
+USER_BASE = 600_000_000_000_000_000
+SYNTHETIC_COINS = 2_000
+
+DEFAULT_MIX = "price=15,coin=30,set_alert=10,my_alerts=10,mexc=10,search=5,coin_info=5,news=5,stats=5,chat=5"
+
+
+# ---------- command mix ----------
+def message_templates(rng):
+    """Message content generators for each command in the mix."""
+    symbols = [symbol for symbol in bot.COINS if bot.bot.get_command(symbol)]
+    subcommands = [None, 'price', 'volume', 'h/l', 's/r']
+
+    def coin():
+        symbol = rng.choice(symbols)
+        sub = rng.choice(subcommands)
+        return f"!{symbol} {sub}" if sub else f"!{symbol}"
+
+    return {
+        'price': lambda: "!price",
+        'coin': coin,
+        'set_alert': lambda: f"!set_alert {rng.choice(symbols)} {rng.uniform(0.1, 100000):.2f}",
+        'my_alerts': lambda: "!my_alerts",
+        'mexc': lambda: f"!mexc {rng.choice(symbols)}",
+        'search': lambda: f"!search {rng.choice(['bit', 'eth', 'doge', 'coin 1', 'sol'])}",
+        'coin_info': lambda: f"!coin_info {rng.choice(list(bot.COINS.values()))}",
+        'news': lambda: "!news",
+        'stats': lambda: "!stats",
+        'chat': lambda: rng.choice(["gm frens", "btc to the moon", "hodl eth", "wen lambo", "gn"]),
+    }
+
+
+def parse_mix(text, templates):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in templates:
+            raise SystemExit(f"Unknown command '{name}' in --mix (choose from {', '.join(templates)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+# ---------- upstream stand-ins ----------
+class Upstream:
+    """CoinGecko, MEXC and RSS answers generated from a seeded price table."""
+
+    def __init__(self, seed, latency, jitter, error_rate):
+        self.rng = random.Random(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.lock = threading.Lock()
+        self.coins = [{'id': coin_id, 'symbol': symbol, 'name': bot.COIN_NAMES.get(symbol, coin_id.title())}
+                      for symbol, coin_id in bot.COINS.items()]
+        self.coins += [{'id': f"coin-{i}", 'symbol': f"c{i}", 'name': f"Coin {i}"} for i in range(SYNTHETIC_COINS)]
+        self.prices = {coin['id']: 10 ** self.rng.uniform(-3, 4.8) for coin in self.coins}
+        self.changes = {coin['id']: self.rng.uniform(-12, 12) for coin in self.coins}
+        self.by_symbol = {coin['symbol'].upper(): coin['id'] for coin in self.coins}
+
+    def delay(self):
+        with self.lock:
+            return max(0.0, self.rng.gauss(self.latency, self.jitter)), self.rng.random() < self.error_rate
+
+    def ticker(self, symbol):
+        coin_id = self.by_symbol.get(symbol[:-4])
+        price = self.prices.get(coin_id, 1.0)
+        change = self.changes.get(coin_id, 0.0)
+        return {
+            'symbol': symbol, 'lastPrice': f"{price:.6f}", 'priceChangePercent': f"{change / 100:.4f}",
+            'highPrice': f"{price * 1.03:.6f}", 'lowPrice': f"{price * 0.97:.6f}",
+            'volume': "1000000", 'quoteVolume': f"{1e10 / (list(self.by_symbol).index(symbol[:-4]) + 1):.2f}"
+        }
+
+    def answer(self, host, path, query):
+        """Return (status, content type, body) for one upstream request."""
+        self.requests[host] += 1
+        if host == 'api.coingecko.com':
+            if path == '/api/v3/coins/list':
+                return 200, 'application/json', self.coins
+            if path == '/api/v3/simple/price':
+                ids = query.get('ids', [''])[0].split(',')
+                currency = query.get('vs_currencies', ['usd'])[0]
+                data = {}
+                for coin_id in ids:
+                    if coin_id in self.prices:
+                        data[coin_id] = {currency: self.prices[coin_id]}
+                        if query.get('include_24hr_change', ['false'])[0] == 'true':
+                            data[coin_id][f"{currency}_24h_change"] = self.changes[coin_id]
+                return 200, 'application/json', data
+            if path == '/api/v3/coins/markets':
+                page = int(query.get('page', ['1'])[0])
+                per_page = int(query.get('per_page', ['250'])[0])
+                ids = query.get('ids', [''])[0]
+                coins = [c for c in self.coins if c['id'] in ids.split(',')] if ids else \
+                    self.coins[(page - 1) * per_page:page * per_page]
+                return 200, 'application/json', [{
+                    **coin, 'current_price': self.prices[coin['id']],
+                    'market_cap': self.prices[coin['id']] * 1e7, 'total_volume': self.prices[coin['id']] * 1e5,
+                    'price_change_percentage_24h': self.changes[coin['id']],
+                    'market_cap_rank': self.coins.index(coin) + 1
+                } for coin in coins]
+            if path == '/api/v3/exchange_rates':
+                return 200, 'application/json', {'rates': {
+                    'btc': {'name': 'Bitcoin', 'unit': 'BTC', 'value': 1, 'type': 'crypto'},
+                    'usd': {'name': 'US Dollar', 'unit': '$', 'value': 60000, 'type': 'fiat'},
+                    'eur': {'name': 'Euro', 'unit': '€', 'value': 55000, 'type': 'fiat'},
+                    'gbp': {'name': 'British Pound', 'unit': '£', 'value': 47000, 'type': 'fiat'},
+                }}
+            if path.startswith('/api/v3/coins/'):
+                coin_id = path.rsplit('/', 1)[-1]
+                if coin_id not in self.prices:
+                    return 404, 'application/json', {'error': 'coin not found'}
+                return 200, 'application/json', {'id': coin_id, 'description': {'en': f"{coin_id} is a coin. " * 20}}
+        elif host == 'api.mexc.com':
+            if path == '/api/v3/ticker/24hr':
+                symbol = query.get('symbol', [None])[0]
+                if symbol:
+                    return 200, 'application/json', self.ticker(symbol)
+                return 200, 'application/json', [self.ticker(f"{s}USDT") for s in list(self.by_symbol)[:200]]
+            if path == '/api/v3/ticker/price':
+                symbol = query.get('symbol', ['BTCUSDT'])[0]
+                return 200, 'application/json', {'symbol': symbol, 'price': self.ticker(symbol)['lastPrice']}
+        else:
+            items = ''.join(
+                f"<item><title>{host} headline {i}</title><link>https://{host}/story/{i}</link>"
+                f"<pubDate>Mon, 0{i + 1} Jan 2024 12:00:00 GMT</pubDate></item>" for i in range(5)
+            )
+            return 200, 'application/rss+xml', f"<rss version='2.0'><channel><title>{host}</title>{items}</channel></rss>"
+        return 404, 'application/json', {'error': 'not found'}
+
+
+def start_upstream_server(upstream):
+    """Serve the upstream stand-in on 127.0.0.1; requests arrive as /<host>/<path>."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            host, _, path = parts.path.lstrip('/').partition('/')
+            delay, fail = upstream.delay()
+            time.sleep(delay)
+            if fail:
+                status, content_type, body = 503, 'application/json', {'error': 'injected failure'}
+            else:
+                status, content_type, body = upstream.answer(host, '/' + path, parse_qs(parts.query))
+            payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------- Discord stand-in ----------
+class FakeDiscordHTTP:
+    """Replaces HTTPClient.request: answers REST routes after a simulated round trip."""
+
+    def __init__(self, rng, latency, jitter, error_rate):
+        self.rng = rng
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self.failures = Counter()
+        self.next_id = 500_000_000_000_000_000
+
+    async def request(self, route, **kwargs):
+        key = f"{route.method} {route.path}"
+        self.calls[key] += 1
+        await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+        if self.rng.random() < self.error_rate:
+            self.failures[key] += 1
+            raise discord.HTTPException(SimpleNamespace(status=500, reason='Injected failure'), 'injected failure')
+        if route.method in ('POST', 'PATCH') and route.path.startswith('/channels/{channel_id}/messages'):
+            payload = kwargs.get('json') or {}
+            self.next_id += 1
+            return message_payload(self.next_id, route.channel_id, bot_author(), payload.get('content') or '',
+                                   embeds=payload.get('embeds') or [])
+        return None
+
+
+def bot_author():
+    return {'id': str(BOT_USER_ID), 'username': 'CryptoBot', 'discriminator': '0', 'avatar': None, 'bot': True}
+
+
+def message_payload(message_id, channel_id, author, content, embeds=()):
+    return {
+        'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(GUILD_ID),
+        'author': author, 'content': content, 'timestamp': datetime.now(timezone.utc).isoformat(),
+        'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+        'mention_roles': [], 'attachments': [], 'embeds': list(embeds), 'pinned': False, 'type': 0,
+    }
+
+
+# ---------- measurements ----------
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Step:
+    """Measurements for one offered arrival rate."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.sent = 0
+        self.completed = 0
+        self.latency = defaultdict(list)    # command -> end-to-end seconds
+        self.dispatch_delay = []            # arrival -> on_message starts running
+        self.outcomes = Counter()           # ok / cooldown / warming / error / crashed
+        self.errors = Counter()             # exception type -> count
+        self.in_flight = []
+        self.loop_lag = []
+        self.pool_backlog = []
+        self.started = self.finished = 0.0
+
+
+async def sample_queues(step, state, interval=0.1):
+    """Record in-flight handlers, event loop lag and default thread pool backlog."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        step.loop_lag.append(max(0.0, loop.time() - expected))
+        step.in_flight.append(len(state['pending']))
+        executor = getattr(loop, '_default_executor', None)
+        step.pool_backlog.append(executor._work_queue.qsize() if executor else 0)
+
+
+# ---------- load generator ----------
+async def load_test(args):
+    workdir = tempfile.mkdtemp(prefix='bot-load-')
+    rng = random.Random(args.seed)
+    templates = message_templates(rng)
+    mix = parse_mix(args.mix, templates)
+    names, weights = list(mix), list(mix.values())
+
+    # Upstreams: a local server behind the real http_get and its disk cache
+    upstream = Upstream(args.seed, args.upstream_latency / 1000, args.upstream_latency / 4000, args.upstream_errors)
+    server = start_upstream_server(upstream)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    real_http_get = bot.http_get
+
+    def local_http_get(url, *a, **kw):
+        parts = urlsplit(url)
+        return real_http_get(f"{base}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else ''), *a, **kw)
+
+    bot.http_get = local_http_get
+    bot.http_cache = bot.HttpCache(os.path.join(workdir, 'http_cache.sqlite3'), 64 * 1024 * 1024)
+    bot.COIN_LIST_FILE = os.path.join(workdir, 'coins.json')
+    bot.ALERTS_FILE = os.path.join(workdir, 'alerts.json')
+    bot.alert_archive = bot.AlertArchive(os.path.join(workdir, 'archive.sqlite3'))
+
+    # Discord: gateway events in, REST calls out to the stand-in
+    client = bot.bot
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=bot_author())
+    fake_http = FakeDiscordHTTP(random.Random(args.seed + 1), args.discord_latency / 1000,
+                                args.discord_latency / 4000, args.discord_errors)
+    bot.discord_request = fake_http.request  # behind the tracing wrapper
+    channels = [CHANNEL_BASE + i for i in range(args.channels)]
+    bot.CHAT_CHANNEL_ID = channels[0]
+    for name in ('ALERTS_CHANNEL_ID', 'PRICE_CHANNEL_ID', 'NEWS_CHANNEL_ID'):
+        setattr(bot, name, 0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bot.warm_cache(name, func) for name, func in (
+        ('coins', bot.get_all_coingecko_coins), ('mexc', bot.get_mexc_tickers), ('news', bot.get_crypto_news))))
+    await asyncio.to_thread(bot.refresh_fx_rates)
+    await asyncio.to_thread(bot.refresh_market_data)
+    bot.seed_stats()
+    print(f"Warmed caches against the local upstream in {time.perf_counter() - started:.1f}s "
+          f"({len(bot.coin_cache['all_coins']):,} coins)")
+
+    # Every message is timed from its arrival to the end of its on_message handler
+    run_state = {'pending': {}, 'step': None}
+    failures = {}
+    on_message = client.on_message
+
+    async def timed_on_message(message):
+        arrived, command = run_state['pending'][message.id]
+        step = run_state['step']
+        step.dispatch_delay.append(time.perf_counter() - arrived)
+        try:
+            await on_message(message)
+        except Exception as e:
+            step.outcomes['crashed'] += 1
+            step.errors[type(e).__name__] += 1
+        else:
+            error = failures.pop(message.id, None)
+            step.outcomes[error or 'ok'] += 1
+        finally:
+            del run_state['pending'][message.id]
+            step.latency[command].append(time.perf_counter() - arrived)
+            step.completed += 1
+
+    client.on_message = timed_on_message
+
+    # Command errors are dispatched as separate events; classify them as they are raised
+    dispatch = client.dispatch
+
+    def tracking_dispatch(event, *event_args, **kwargs):
+        if event == 'command_error':
+            ctx, error = event_args
+            original = getattr(error, 'original', error)
+            if isinstance(error, commands.CommandOnCooldown):
+                failures[ctx.message.id] = 'cooldown'
+            elif isinstance(error, bot.WarmingUp):
+                failures[ctx.message.id] = 'warming'
+            else:
+                failures[ctx.message.id] = 'error'
+                run_state['step'].errors[type(original).__name__] += 1
+        return dispatch(event, *event_args, **kwargs)
+
+    client.dispatch = tracking_dispatch
+
+    message_id = 100_000_000_000_000_000
+    steps = []
+    for rate in args.rates:
+        step = Step(rate)
+        run_state['step'] = step
+        sampler = asyncio.create_task(sample_queues(step, run_state))
+        step.started = time.perf_counter()
+        end = step.started + args.duration
+        next_arrival = step.started
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival >= end:
+                break
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            command = rng.choices(names, weights)[0]
+            user = rng.randrange(args.users)
+            channel = bot.CHAT_CHANNEL_ID if command == 'chat' else rng.choice(channels)
+            message_id += 1
+            author = {'id': str(USER_BASE + user), 'username': f"user{user}", 'discriminator': '0', 'avatar': None}
+            run_state['pending'][message_id] = (next_arrival, command)
+            step.sent += 1
+            state.parse_message_create(message_payload(message_id, channel, author, templates[command]()))
+        await asyncio.sleep(max(0.0, end - time.perf_counter()))
+
+        # Let the backlog drain so the next step starts clean
+        drain_end = time.perf_counter() + args.drain
+        while run_state['pending'] and time.perf_counter() < drain_end:
+            await asyncio.sleep(0.05)
+        step.finished = time.perf_counter()
+        sampler.cancel()
+        if run_state['pending']:
+            step.outcomes['unfinished'] += len(run_state['pending'])
+        steps.append(step)
+        report_step(step, args)
+        if run_state['pending']:
+            print("  backlog did not drain; stopping here")
+            break
+
+    report_summary(steps, args, fake_http, upstream)
+    server.shutdown()
+    return 0
+
+
+async def run(args):
+    # Entering the client binds it to the running loop without logging in
+    async with bot.bot:
+        return await load_test(args)
+
+
+def report_step(step, args):
+    latencies = [value for values in step.latency.values() for value in values]
+    elapsed = step.finished - step.started
+    throughput = step.completed / elapsed if elapsed else 0
+    failed = sum(count for outcome, count in step.outcomes.items() if outcome not in ('ok',))
+    print(f"\n== offered {step.rate:g} msg/s for {args.duration:g}s: sent {step.sent:,}, "
+          f"completed {step.completed:,} ({throughput:.1f}/s)")
+    print(f"  latency ms: p50 {percentile(latencies, 50) * 1000:.0f} • p95 {percentile(latencies, 95) * 1000:.0f} "
+          f"• p99 {percentile(latencies, 99) * 1000:.0f} • max {max(latencies, default=0) * 1000:.0f}")
+    print(f"  queueing: dispatch p95 {percentile(step.dispatch_delay, 95) * 1000:.1f} ms • "
+          f"loop lag p95 {percentile(step.loop_lag, 95) * 1000:.1f} ms • "
+          f"in flight p95 {percentile(step.in_flight, 95):.0f} / max {max(step.in_flight, default=0)} • "
+          f"thread pool backlog max {max(step.pool_backlog, default=0)}")
+    print(f"  outcomes: {', '.join(f'{name} {count:,}' for name, count in step.outcomes.most_common())} "
+          f"• failure rate {failed / step.sent if step.sent else 0:.1%}")
+    if step.errors:
+        print(f"  errors: {', '.join(f'{name} {count:,}' for name, count in step.errors.most_common(5))}")
+    if args.per_command:
+        for command, values in sorted(step.latency.items()):
+            print(f"    {command:<10} n={len(values):>5}  p50 {percentile(values, 50) * 1000:7.0f} ms  "
+                  f"p95 {percentile(values, 95) * 1000:7.0f} ms")
+
+
+def step_saturated(step, args):
+    """A step is saturated when it falls behind the offered rate or misses the p95 SLO."""
+    latencies = [value for values in step.latency.values() for value in values]
+    return (step.completed < step.sent * 0.99
+            or percentile(latencies, 95) * 1000 > args.slo)
+
+
+def report_summary(steps, args, fake_http, upstream):
+    print("\n" + "=" * 60)
+    saturated = next((step for step in steps if step_saturated(step, args)), None)
+    sustained = [step.rate for step in steps if not step_saturated(step, args)]
+    if saturated:
+        print(f"Saturation: {saturated.rate:g} msg/s misses the {args.slo:g} ms p95 SLO or falls behind"
+              + (f"; last good rate {max(sustained):g} msg/s" if sustained else ""))
+    else:
+        print(f"No saturation up to {max(args.rates):g} msg/s (p95 SLO {args.slo:g} ms)")
+    print(f"Discord REST calls: {sum(fake_http.calls.values()):,} "
+          f"({', '.join(f'{key} {count:,}' for key, count in fake_http.calls.most_common(4))}) "
+          f"• injected failures {sum(fake_http.failures.values()):,}")
+    print(f"Upstream requests: {', '.join(f'{host} {count:,}' for host, count in upstream.requests.most_common())}")
+    print(f"HTTP cache: {bot.http_cache.summary()} • response cache: {bot.response_cache.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rates', type=lambda text: [float(r) for r in text.split(',')], default=[5, 20, 50, 100],
+                        help='comma separated offered rates in messages per second, run in order')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per rate step')
+    parser.add_argument('--drain', type=float, default=30, help='seconds to wait for the backlog after each step')
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='command=weight pairs, e.g. price=1,coin=3,chat=1')
+    parser.add_argument('--discord-latency', type=float, default=80, help='mean Discord REST round trip in ms')
+    parser.add_argument('--discord-errors', type=float, default=0.0, help='fraction of Discord calls that fail')
+    parser.add_argument('--upstream-latency', type=float, default=150, help='mean upstream API latency in ms')
+    parser.add_argument('--upstream-errors', type=float, default=0.0, help='fraction of upstream calls answering 503')
+    parser.add_argument('--slo', type=float, default=2000, help='p95 end-to-end latency target in ms')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--per-command', action='store_true', help='print latency percentiles per command')
+    parser.add_argument('--verbose', action='store_true', help='keep the bot logs (errors are counted in the report)')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.CRITICAL)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,447 @@
+"""Deterministic offline simulation of the bot's background tasks.
+
+Usage: python simulate.py [--alerts 10000] [--days 1] [--coins 200] [--seed 1]
+                          [--prices path.csv] [--outage 0.05] [--board] [--news] [--csv sweeps.csv]
+
+Runs check_alerts, the alert sweep, the price board, the news poster and the
+news cleanup on a virtual clock, as fast as the CPU allows, against fake
+Discord channels and a replayable price path (seeded one-minute random walk
+with intra-minute wicks, or a CSV of `seconds,coin_id,price` rows). The path
+also stands in for the 1-minute candles check_alerts reads between sweeps,
+and a few coins go unpriced in each sweep (--outage). Every alert sweep is
+checked against an independent crossing oracle, and per-sweep CPU time and
+RSS are recorded.
+
+The largest run made so far is 20,000 alerts over 2 simulated days (about
+4 minutes wall). Bigger stores and longer spans are untested. Sweep cost grows
+linearly with the alert count.
+"""
+import argparse
+import asyncio
+import bisect
+import csv
+import heapq
+import logging
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import types
+from array import array
+
+os.environ.setdefault("DISCORD_TOKEN", "simulation")
+# Tracing is off unless asked for, so a run never writes traces.jsonl into the cwd
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+os.environ.setdefault("TRACE_SLOW_MS", "0")
+
+import bot  # noqa: E402
+
+EPOCH = 1_700_000_000
+CHANNEL_ID = 1000
+FX = {'usd': 1.0, 'eur': 0.9}
+
+
+# ---------- virtual time ----------
+class VirtualClock:
+    """Simulated wall clock; only moves when the scheduler advances it."""
+
+    def __init__(self, start):
+        self.now = float(start)
+
+    def time(self):
+        return self.now
+
+    def advance_to(self, when):
+        self.now = max(self.now, when)
+
+
+def virtual_time_module(clock):
+    """A stand-in for the `time` module whose wall clock is the virtual one."""
+    module = types.ModuleType('virtual_time')
+    module.__dict__.update({name: getattr(time, name) for name in dir(time) if not name.startswith('__')})
+    module.time = clock.time
+    module.monotonic = clock.time
+    return module
+
+
+def virtual_asyncio_module(clock):
+    """asyncio with sleep() advancing the virtual clock instead of waiting."""
+    module = types.ModuleType('virtual_asyncio')
+    module.__dict__.update({name: getattr(asyncio, name) for name in dir(asyncio) if not name.startswith('__')})
+
+    async def sleep(delay, result=None):
+        clock.advance_to(clock.now + delay)
+        return await asyncio.sleep(0, result)
+
+    module.sleep = sleep
+    return module
+
+
+# ---------- price path ----------
+class PricePath:
+    """Replayable prices: a seeded geometric random walk or a recorded CSV.
+
+    Each point holds from its time until the next one. Random-walk points also
+    carry the high and low reached in between (a wick around the point price),
+    which only the candles see; CSV points have none.
+    """
+
+    def __init__(self, coins, start, days, step, seed, volatility, csv_path=None):
+        self.coins = coins
+        self.start = start
+        self.step = step
+        self.series = {}
+        if csv_path:
+            self._load_csv(csv_path)
+        else:
+            rng = random.Random(seed)
+            steps = int(days * 86400 / step) + 2
+            sigma = volatility * math.sqrt(step / (365 * 86400))
+            # Minute-aligned, like exchange candles
+            first = start - start % 60
+            times = [first + i * step for i in range(steps)]
+            for coin in coins:
+                price = 10 ** rng.uniform(-2, 4)
+                prices, highs, lows = array('d'), array('d'), array('d')
+                for _ in range(steps):
+                    prices.append(price)
+                    highs.append(price * math.exp(abs(rng.gauss(0, sigma))))
+                    lows.append(price * math.exp(-abs(rng.gauss(0, sigma))))
+                    price *= math.exp(rng.gauss(0, sigma))
+                self.series[coin] = (times, prices, highs, lows)
+
+    def _load_csv(self, path):
+        rows = {}
+        with open(path) as f:
+            for seconds, coin, price in csv.reader(f):
+                rows.setdefault(coin, []).append((self.start + float(seconds), float(price)))
+        for coin, points in rows.items():
+            points.sort()
+            prices = array('d', (p for _, p in points))
+            self.series[coin] = ([t for t, _ in points], prices, prices, prices)
+        self.coins = sorted(self.series)
+
+    def price(self, coin, when):
+        times, prices = self.series[coin][:2]
+        index = bisect.bisect_right(times, when) - 1
+        return prices[max(index, 0)]
+
+    def prices(self, coins, when):
+        return {coin: self.price(coin, when) for coin in coins if coin in self.series}
+
+    def segments(self, coin, since, until):
+        """(time, high, low) of the points from `since` to `until`. The point still
+        in progress at `until` only counts its own price: its wick has not happened yet."""
+        times, prices, highs, lows = self.series[coin]
+        lo, hi = bisect.bisect_left(times, since), bisect.bisect_right(times, until)
+        for i in range(lo, hi):
+            if i + 1 < len(times) and times[i + 1] <= until:
+                yield times[i], highs[i], lows[i]
+            else:
+                yield times[i], prices[i], prices[i]
+
+    def candles(self, coins, since, until):
+        """{coin: [(open_ms, high, low)]} of the minutes overlapping since..until, like get_recent_candles.
+
+        As on the exchange, the first candle may have opened before `since`
+        and the last one is cut off at `until`.
+        """
+        result = {}
+        for coin in coins:
+            if coin not in self.series:
+                continue
+            minutes = {}
+            for t, high, low in self.segments(coin, since - since % 60, until):
+                open_ms = int(t - t % 60) * 1000
+                old = minutes.get(open_ms)
+                minutes[open_ms] = (max(old[0], high), min(old[1], low)) if old else (high, low)
+            result[coin] = [(open_ms, high, low) for open_ms, (high, low) in sorted(minutes.items())]
+        return result
+
+    def range(self, coin, since, until):
+        """(high, low) reached from the first whole minute at or after `since` until `until`, or None."""
+        points = list(self.segments(coin, math.ceil(since / 60) * 60, until))
+        return (max(p[1] for p in points), min(p[2] for p in points)) if points else None
+
+
+# ---------- fake Discord ----------
+class FakeMessage:
+    def __init__(self, channel, content, embed):
+        self.channel = channel
+        self.id = len(channel.sent) + 1
+        self.content = content
+        self.embed = embed
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def edit(self, **kwargs):
+        self.channel.edits += 1
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+        self.edits = 0
+
+    async def send(self, content=None, embed=None):
+        message = FakeMessage(self, content, embed)
+        self.sent.append(message)
+        return message
+
+
+# ---------- alerts and oracle ----------
+def make_alerts(path, count, users, seed, start):
+    """Write `count` alerts spread over `users` users and return them."""
+    rng = random.Random(seed + 1)
+    alerts = {}
+    coins = path.coins
+    for i in range(count):
+        coin = coins[int(rng.paretovariate(1.2)) % len(coins)]
+        vs_currency = 'eur' if rng.random() < 0.1 else 'usd'
+        price = path.price(coin, start) * FX[vs_currency]
+        target = price * (1 + rng.choice((-1, 1)) * rng.uniform(0.01, 0.3))
+        user_id = str(10_000 + rng.randrange(users))
+        alert = bot.AlertRecord.from_dict({
+            'unique_id': f"sim{i}",
+            'coin_id': coin,
+            'symbol': coin.upper(),
+            'name': coin.title(),
+            'target_price': target,
+            'current_price': price,
+            'channel_id': CHANNEL_ID,
+            'user_id': user_id,
+            'user_name': f"user{user_id}",
+            'triggered': False,
+            'vs_currency': vs_currency
+        })
+        alert.created_at = int(start)
+        alerts.setdefault(user_id, []).append(alert)
+    return alerts
+
+
+class CrossingOracle:
+    """Independent model of which alerts should fire at each sweep.
+
+    An alert fires the first time its target lies between the price its coin
+    had when it was last priced (in the alert's currency; the creation price
+    before that) and the furthest price reached in that direction since then,
+    counting from the first whole minute after that time, matching the
+    engine's touch rule. A coin missing from a sweep keeps its old price and
+    time, so its next window covers the gap.
+    """
+
+    def __init__(self, alerts, path, start):
+        self.path = path
+        self.targets = {}
+        for user_alerts in alerts.values():
+            for alert in user_alerts:
+                key = (alert.coin_id, alert.vs_currency)
+                self.targets.setdefault(key, []).append((alert.target_price, alert.unique_id))
+        for entries in self.targets.values():
+            entries.sort()
+        self.fired = set()
+        self.previous = {key: (path.price(key[0], start) * FX[key[1]], start) for key in self.targets}
+
+    def sweep(self, prices, now):
+        expected = set()
+        ranges = {}
+        for (coin, vs_currency), entries in self.targets.items():
+            if coin not in prices:
+                continue
+            current = prices[coin] * FX[vs_currency]
+            previous, since = self.previous[(coin, vs_currency)]
+            self.previous[(coin, vs_currency)] = (current, now)
+            if (coin, since) not in ranges:
+                ranges[coin, since] = self.path.range(coin, since, now)
+            high = low = current
+            if ranges[coin, since]:
+                high = max(high, ranges[coin, since][0] * FX[vs_currency])
+                low = min(low, ranges[coin, since][1] * FX[vs_currency])
+            # Targets in (previous, high] fire upwards, targets in [low, previous) downwards
+            up = entries[bisect.bisect_right(entries, (previous, chr(0x10FFFF))):
+                         bisect.bisect_right(entries, (high, chr(0x10FFFF)))]
+            down = entries[bisect.bisect_left(entries, (low, '')):bisect.bisect_left(entries, (previous, ''))]
+            for _, unique_id in up + down:
+                if unique_id not in self.fired:
+                    expected.add(unique_id)
+        self.fired |= expected
+        return expected
+
+
+# ---------- simulation ----------
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix='bot-sim-')
+    clock = VirtualClock(EPOCH)
+    bot.time = virtual_time_module(clock)
+    bot.asyncio = virtual_asyncio_module(clock)
+
+    coins = [f"coin{i}" for i in range(args.coins)]
+    sweep_seconds = bot.check_alerts.minutes * 60 or bot.check_alerts.seconds
+    path = PricePath(coins, EPOCH, args.days, 60, args.seed, args.volatility, args.prices)
+
+    # Files, channels and upstreams all local to this run
+    bot.ALERTS_FILE = os.path.join(workdir, 'alerts.json')
+    bot.alert_archive = bot.AlertArchive(os.path.join(workdir, 'archive.sqlite3'))
+    bot.fx_rates = {'rates': dict(FX), 'units': {'eur': ('€', 'fiat')}, 'updated': EPOCH}
+    channels = {cid: FakeChannel(cid) for cid in (CHANNEL_ID, 2000, 3000)}
+    bot.PRICE_CHANNEL_ID = 2000 if args.board else 0
+    bot.NEWS_CHANNEL_ID = 3000 if args.news else 0
+    bot.ALERTS_CHANNEL_ID = 0
+    bot.bot.get_channel = channels.get
+
+    async def ready():
+        return None
+
+    bot.bot.wait_until_ready = ready
+    # Prices for the current sweep, with a few coins left out as if their upstream failed
+    sweep_prices = {}
+    outages = random.Random(args.seed + 2)
+    bot.get_crypto_prices = lambda coin_ids, vs_currency='usd': {
+        coin: sweep_prices[coin] for coin in coin_ids if coin in sweep_prices}
+    bot.get_recent_candles = lambda coin_ids, since, until: path.candles(coin_ids, since, until)
+    board_symbols = [f"{coin.upper()}USDT" for coin in path.coins[:bot.TOP_N]]
+
+    def mexc_tickers(max_age=None):
+        return [{'symbol': symbol, 'quoteVolume': str(1e9 / (i + 1))} for i, symbol in enumerate(board_symbols)]
+
+    def mexc_price(symbol):
+        price = path.price(symbol[:-4].lower(), clock.now)
+        return {'lastPrice': price, 'priceChangePercent': 0, 'highPrice': price, 'lowPrice': price, 'quoteVolume': 1e6}
+
+    bot.get_mexc_tickers = mexc_tickers
+    bot.get_mexc_price = mexc_price
+    bot.get_crypto_news = lambda force_refresh=False: [
+        {'title': f"Headline {int(clock.now // 3600)}", 'link': f"https://news.invalid/{int(clock.now // 3600)}",
+         'source': 'CoinDesk', 'published': ''}
+    ]
+
+    alerts = make_alerts(path, args.alerts, args.users, args.seed, EPOCH)
+    started = time.perf_counter()
+    bot.save_alerts(alerts)
+    print(f"Wrote {args.alerts:,} alerts for {args.users:,} users in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(bot.ALERTS_FILE) / 1e6:.1f} MB)")
+    oracle = CrossingOracle(alerts, path, EPOCH)
+    del alerts
+    bot.seed_stats()
+
+    fired = []
+    submit = bot.alert_notifier.submit
+
+    def capture(triggered):
+        fired.extend(alert.unique_id for _, alert in triggered)
+        submit(triggered)
+
+    bot.alert_notifier.submit = capture
+    bot.alert_notifier.start()
+
+    # (due time, order, name, coroutine function, interval function)
+    jobs = [
+        ('check_alerts', bot.check_alerts.coro, lambda: sweep_seconds),
+        ('sweep_alert_store', bot.sweep_alert_store.coro, lambda: bot.ALERT_SWEEP_MINUTES * 60),
+        ('cleanup_posted_news', bot.cleanup_posted_news.coro, lambda: 3600),
+    ]
+    if args.board:
+        jobs.append(('auto_price_update', bot.auto_price_update.coro, lambda: bot.board_interval['seconds']))
+    if args.news:
+        jobs.append(('auto_news_update', bot.auto_news_update.coro, lambda: 300))
+    queue = [(EPOCH + (interval() if name == 'check_alerts' else 0), i, name, coro, interval)
+             for i, (name, coro, interval) in enumerate(jobs)]
+    heapq.heapify(queue)
+
+    end = EPOCH + args.days * 86400
+    sweeps = []
+    mismatches = 0
+    runs = {name: 0 for name, _, _ in jobs}
+    while queue and queue[0][0] <= end:
+        due, order, name, coro, interval = heapq.heappop(queue)
+        clock.advance_to(due)
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        expected = None
+        if name == 'check_alerts':
+            sweep_prices = {coin: price for coin, price in path.prices(path.coins, clock.now).items()
+                            if outages.random() >= args.outage}
+            expected = oracle.sweep(sweep_prices, clock.now)
+        before = len(fired)
+        await coro()
+        await bot.alert_notifier.queue.join()
+        runs[name] += 1
+        if name == 'check_alerts':
+            actual = set(fired[before:])
+            if actual != expected:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  mismatch at day {(clock.now - EPOCH) / 86400:.2f}: "
+                          f"missing {len(expected - actual)}, unexpected {len(actual - expected)}")
+            sweeps.append({
+                'day': (clock.now - EPOCH) / 86400,
+                'cpu_ms': (time.process_time() - cpu) * 1000,
+                'wall_ms': (time.perf_counter() - wall) * 1000,
+                'triggered': len(actual),
+                'active': bot.stats_registry.active_alerts(),
+                'rss_mb': bot.current_rss_mb()
+            })
+            if args.progress and len(sweeps) % args.progress == 0:
+                last = sweeps[-1]
+                print(f"  day {last['day']:6.2f}  active {last['active']:>9,}  "
+                      f"cpu {last['cpu_ms']:8.1f} ms  rss {last['rss_mb']:7.1f} MB")
+        heapq.heappush(queue, (clock.now + interval(), order, name, coro, interval))
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(sweeps[0]))
+            writer.writeheader()
+            writer.writerows(sweeps)
+
+    cpu_times = [s['cpu_ms'] for s in sweeps]
+    delivered = len(channels[CHANNEL_ID].sent)
+    print(f"\nSimulated {args.days} days in {time.perf_counter() - started:.1f}s wall")
+    print(f"Task runs: {', '.join(f'{name} {count:,}' for name, count in runs.items())}")
+    print(f"Alert sweeps: {len(sweeps):,} • triggered {len(fired):,} of {args.alerts:,} "
+          f"• {mismatches} sweep(s) disagreed with the oracle")
+    print(f"Sweep CPU ms: p50 {percentile(cpu_times, 50):.1f} • p95 {percentile(cpu_times, 95):.1f} "
+          f"• max {max(cpu_times, default=0):.1f} • mean {statistics.fmean(cpu_times) if cpu_times else 0:.1f}")
+    print(f"RSS MB: peak {max((s['rss_mb'] for s in sweeps), default=0):.1f}")
+    print(f"Notifications delivered: {delivered:,} digest message(s) • "
+          f"board edits {channels[2000].edits + len(channels[2000].sent):,} • news posts {len(channels[3000].sent):,}")
+    return 1 if mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--coins', type=int, default=200)
+    parser.add_argument('--days', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--volatility', type=float, default=0.8, help='annualised volatility of the random walk')
+    parser.add_argument('--prices', help='CSV of seconds,coin_id,price rows to replay instead of a random walk')
+    parser.add_argument('--outage', type=float, default=0.05,
+                        help='chance a coin has no price in a given sweep')
+    parser.add_argument('--board', action='store_true', help='also drive the price board task')
+    parser.add_argument('--news', action='store_true', help='also drive the news poster task')
+    parser.add_argument('--csv', help='write per-sweep measurements to this file')
+    parser.add_argument('--progress', type=int, default=0, help='print every N sweeps')
+    parser.add_argument('--verbose', action='store_true', help='keep the bot INFO logs')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
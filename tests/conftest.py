@@ -0,0 +1,9 @@
+import os
+import sys
+
+# bot.py reads its config at import time; give it a token and keep tracing off
+os.environ.setdefault("DISCORD_TOKEN", "test")
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+os.environ.setdefault("TRACE_SLOW_MS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import bot
+
+
+def alert_dict(**overrides):
+    data = {
+        'unique_id': 'a1b2c3d4e5f6',
+        'coin_id': 'bitcoin',
+        'symbol': 'BTC',
+        'name': 'Bitcoin',
+        'target_price': 70000.0,
+        'current_price': 65000.5,
+        'timestamp': '2026-10-19T11:40:38.123456',
+        'channel_id': 1234,
+        'user_id': '42',
+        'user_name': 'alice',
+        'triggered': False,
+        'vs_currency': 'usd',
+        'last_checked_price': None,
+        'last_checked_at': '2026-10-19T11:45:00.000001',
+    }
+    data.update(overrides)
+    return data
+
+
+def test_round_trip_keeps_microseconds_nulls_and_extra_keys():
+    data = alert_dict(touched=True, note={'source': 'import'})
+    alert = bot.AlertRecord.from_dict(data)
+    assert alert.to_dict() == data
+    assert json.loads(json.dumps({'42': [alert]}, default=bot.to_json)) == {'42': [data]}
+
+
+def test_absent_keys_stay_absent():
+    data = alert_dict()
+    del data['last_checked_price'], data['last_checked_at']
+    assert bot.AlertRecord.from_dict(data).to_dict() == data
+
+
+def test_timestamps_are_stored_as_epoch_seconds():
+    alert = bot.AlertRecord.from_dict(alert_dict())
+    assert alert.created_at == bot.iso_to_epoch('2026-10-19T11:40:38.123456')
+    assert alert['timestamp'] == '2026-10-19T11:40:38.123456'
+    alert['triggered_at'] = '2026-10-19T12:00:00'
+    assert alert.triggered_ts == bot.iso_to_epoch('2026-10-19T12:00:00')
+
+
+def test_unset_known_fields_read_as_none():
+    alert = bot.AlertRecord.from_dict(alert_dict())
+    assert alert['last_checked_price'] is None
+    assert alert['triggered_at'] is None
+    assert alert['direction'] is None
+    assert 'last_checked_price' not in alert
+
+
+def test_unknown_keys_raise_key_error():
+    alert = bot.AlertRecord.from_dict(alert_dict(touched=True))
+    assert alert['touched'] is True
+    with pytest.raises(KeyError):
+        alert['no_such_field']
+
+
+def test_get_falls_back_for_missing_and_null_values():
+    alert = bot.AlertRecord.from_dict(alert_dict(vs_currency=None))
+    assert alert.get('vs_currency', 'usd') == 'usd'
+    assert alert.get('no_such_field', 'x') == 'x'
+    assert alert.get('symbol') == 'BTC'
+
+
+def test_setitem_routes_known_and_extra_keys():
+    alert = bot.AlertRecord.from_dict(alert_dict())
+    alert['symbol'] = 'XBT'
+    alert['touched'] = True
+    assert alert.symbol == 'XBT'
+    assert alert.extra == {'touched': True}
+    assert alert.to_dict()['touched'] is True
@@ -0,0 +1,93 @@
+import bot
+
+T0 = 1_700_000_040  # minute-aligned epoch seconds
+MS = 1000
+
+
+def make_alert(target, current, last_checked=None, checked_ts=None, created_at=T0, vs_currency='usd'):
+    alert = bot.AlertRecord.from_dict({
+        'coin_id': 'bitcoin', 'user_id': '1', 'triggered': False, 'vs_currency': vs_currency,
+        'target_price': target, 'current_price': current, 'last_checked_price': last_checked,
+    })
+    alert.created_at = created_at
+    alert.checked_ts = checked_ts
+    return alert
+
+
+def evaluate(alert, price, candles=(), now=T0 + 300):
+    return bot.evaluate_alerts({'1': [alert]}, {'bitcoin': price}, {'bitcoin': list(candles)}, now=now)
+
+
+def test_candle_range_skips_candles_opened_before_the_window():
+    candles = [(T0 * MS, 130, 90), ((T0 + 60) * MS, 110, 95), ((T0 + 120) * MS, 105, 99)]
+    assert bot.candle_range(candles, T0 * MS) == (130, 90)
+    assert bot.candle_range(candles, (T0 + 30) * MS) == (110, 95)  # straddling candle excluded
+    assert bot.candle_range(candles, (T0 + 180) * MS) is None
+    assert bot.candle_range([], 0) is None
+
+
+def test_alert_window_start():
+    assert bot.alert_window_start(make_alert(1, 1), fallback=5) == T0
+    assert bot.alert_window_start(make_alert(1, 1, last_checked=1, checked_ts=T0 + 60), fallback=5) == T0 + 60
+    assert bot.alert_window_start(make_alert(1, 1, last_checked=1), fallback=5) == 5
+
+
+def test_point_crossing_triggers():
+    alert = make_alert(100, 90, last_checked=95, checked_ts=T0)
+    assert evaluate(alert, 101) == [('1', alert)]
+    assert alert.direction == 'above'
+    assert alert.triggered_price == 101
+    assert alert.extra is None
+
+
+def test_touch_between_checks_triggers_from_candles():
+    alert = make_alert(100, 90, last_checked=95, checked_ts=T0)
+    candles = [((T0 + 60) * MS, 100.5, 94), ((T0 + 120) * MS, 97, 93)]
+    assert evaluate(alert, 96, candles) == [('1', alert)]
+    assert alert.direction == 'above'
+    assert alert['touched'] is True
+
+
+def test_candles_before_the_last_check_are_ignored():
+    alert = make_alert(100, 90, last_checked=95, checked_ts=T0 + 90)
+    candles = [((T0 + 60) * MS, 120, 94), ((T0 + 120) * MS, 97, 93)]
+    assert evaluate(alert, 96, candles) == []
+    assert alert.last_checked_price == 96
+    assert alert.checked_ts == T0 + 300
+
+
+def test_fresh_alert_only_sees_candles_after_creation():
+    # Created at 95 with a target of 90 below; the dip to 85 happened before creation
+    alert = make_alert(90, 95, created_at=T0 + 60)
+    candles = [(T0 * MS, 96, 85), ((T0 + 60) * MS, 97, 91)]
+    assert evaluate(alert, 94, candles) == []
+    candles.append(((T0 + 120) * MS, 95, 89))
+    alert = make_alert(90, 95, created_at=T0 + 60)
+    assert evaluate(alert, 94, candles) == [('1', alert)]
+    assert alert.direction == 'below'
+
+
+def test_candles_are_converted_to_the_alert_currency(monkeypatch):
+    monkeypatch.setitem(bot.fx_rates, 'rates', {'usd': 1.0, 'eur': 0.5})
+    alert = make_alert(50, 45, last_checked=45, checked_ts=T0, vs_currency='eur')
+    candles = [((T0 + 60) * MS, 99, 90)]  # 49.5 EUR high: short of the target
+    assert evaluate(alert, 92, candles) == []
+    alert = make_alert(50, 45, last_checked=45, checked_ts=T0, vs_currency='eur')
+    candles = [((T0 + 60) * MS, 101, 90)]
+    assert evaluate(alert, 92, candles) == [('1', alert)]
+
+
+def test_kline_cache_only_fetches_from_the_newest_held_candle(monkeypatch):
+    calls = []
+
+    def fake_klines(symbol, start_ms, end_ms):
+        calls.append(start_ms)
+        return [[open_ms, 0, 100 + i, 90 - i, 0] for i, open_ms in enumerate(range(start_ms, end_ms + 1, 60_000))]
+
+    monkeypatch.setattr(bot, 'get_mexc_klines', fake_klines)
+    cache = bot.KlineCache()
+    first = cache.window('BTCUSDT', T0 * MS, (T0 + 180) * MS)
+    assert [row[0] for row in first] == [(T0 + 60 * i) * MS for i in range(4)]
+    second = cache.window('BTCUSDT', (T0 + 60) * MS, (T0 + 300) * MS)
+    assert calls == [T0 * MS, (T0 + 180) * MS]
+    assert [row[0] for row in second] == [(T0 + 60 * i) * MS for i in range(1, 6)]
@@ -0,0 +1,80 @@
+import pytest
+
+import bot
+
+COINS = [
+    bot.CoinRecord('bitcoin', 'btc', 'Bitcoin'),
+    bot.CoinRecord('bitcoin-cash', 'bch', 'Bitcoin Cash'),
+    bot.CoinRecord('ethereum', 'eth', 'Ethereum'),
+    bot.CoinRecord('ethereum-classic', 'etc', 'Ethereum Classic'),
+    bot.CoinRecord('solana', 'sol', 'Solana'),
+    bot.CoinRecord('cardano', 'ada', 'Cardano'),
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(bot, 'market_rank', lambda coin_id: None)
+    return bot.FuzzyCoinIndex(COINS)
+
+
+def ids(matches):
+    return [coin.id for coin, _ in matches]
+
+
+def test_normalize_coin_term():
+    assert bot.normalize_coin_term('Bitcoin Cash') == bot.normalize_coin_term('bitcoin-cash') == 'bitcoincash'
+
+
+@pytest.mark.parametrize('a, b, distance', [
+    ('bitcoin', 'bitcoin', 0),
+    ('bitcoin', 'bitcon', 1),
+    ('bitcoin', 'bitocin', 1),  # transposition counts once
+    ('solana', 'salona', 2),
+    ('cardano', 'car', 3),  # capped at max_distance + 1
+])
+def test_edit_distance(a, b, distance):
+    assert bot.edit_distance(a, b, 2) == min(distance, 3)
+
+
+def test_typos_find_the_coin(index):
+    assert ids(index.lookup('bitcon'))[0] == 'bitcoin'
+    assert ids(index.lookup('etherum'))[0] == 'ethereum'
+    assert ids(index.lookup('Solanna'))[0] == 'solana'
+
+
+def test_exact_match_ranks_first_with_distance_zero(index):
+    matches = index.lookup('ethereum')
+    assert matches[0] == (COINS[2], 0)
+
+
+def test_short_queries_get_less_slack(index):
+    assert index.allowed_distance('bt') == 0
+    assert index.allowed_distance('btcx') == 1
+    assert index.allowed_distance('bitcoinn') == 2
+    assert index.lookup('bx') == []
+    assert ids(index.lookup('adaa')) == ['cardano']
+
+
+def test_symbol_beats_name_on_equal_distance(index):
+    # 'eth' is an exact symbol; 'etc' is one edit away
+    assert ids(index.lookup('eth'))[:2] == ['ethereum', 'ethereum-classic']
+
+
+def test_market_rank_breaks_ties(monkeypatch):
+    ranks = {'ethereum': 2, 'ethereum-classic': 30}
+    monkeypatch.setattr(bot, 'market_rank', ranks.get)
+    index = bot.FuzzyCoinIndex(COINS)
+    assert ids(index.lookup('etx')) == ['ethereum', 'ethereum-classic']
+    ranks.update({'ethereum': 30, 'ethereum-classic': 2})
+    assert ids(index.lookup('etx')) == ['ethereum-classic', 'ethereum']
+
+
+def test_limit_and_empty_query(index):
+    assert len(index.lookup('bitcoin', limit=1)) == 1
+    assert index.lookup('') == []
+    assert index.lookup('--') == []
+
+
+def test_empty_index_finds_nothing():
+    assert bot.FuzzyCoinIndex([]).lookup('bitcoin') == []
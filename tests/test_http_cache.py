@@ -0,0 +1,130 @@
+import pytest
+import requests
+
+import bot
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b'{}', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class Upstream:
+    """Stands in for requests.get: replies from a queue and records the request headers."""
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+
+    def __call__(self, url, params=None, headers=None, timeout=None):
+        self.requests.append((url, params, dict(headers or {})))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = Upstream()
+    monkeypatch.setattr(bot.requests, 'get', fake)
+    return fake
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(bot.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(bot.HTTP_CACHE_TTLS, 'test', 60)
+    monkeypatch.setitem(bot.HTTP_CACHE_MAX_STALE, 'test', 120)
+    cache = bot.HttpCache(str(tmp_path / 'http_cache.sqlite3'), 1024 * 1024)
+    yield cache
+    if cache.db is not None:
+        cache.db.close()
+
+
+def test_cache_key_normalizes_params_and_host():
+    assert bot.HttpCache.cache_key('https://API.example.com/x?b=2', {'a': 1}) == \
+        bot.HttpCache.cache_key('https://api.example.com/x?a=1&b=2')
+
+
+def test_fresh_hits_skip_the_upstream(cache, upstream, clock):
+    upstream.replies.append(FakeResponse(content=b'one'))
+    assert cache.get('https://example.com/a', endpoint='test').content == b'one'
+    clock.now += 59
+    response = cache.get('https://example.com/a', endpoint='test')
+    assert response.content == b'one' and response.from_cache
+    assert len(upstream.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_endpoints_without_ttl_are_not_cached(cache, upstream, clock):
+    upstream.replies += [FakeResponse(content=b'one'), FakeResponse(content=b'two')]
+    assert cache.get('https://example.com/a').content == b'one'
+    assert cache.get('https://example.com/a').content == b'two'
+
+
+def test_expired_entries_are_revalidated(cache, upstream, clock):
+    upstream.replies.append(FakeResponse(content=b'one', headers={'ETag': '"v1"'}))
+    cache.get('https://example.com/a', endpoint='test')
+    clock.now += 61
+    upstream.replies.append(FakeResponse(status_code=304, content=b''))
+    response = cache.get('https://example.com/a', endpoint='test')
+    assert response.content == b'one'
+    assert upstream.requests[-1][2]['If-None-Match'] == '"v1"'
+    assert cache.revalidated == 1
+    # The 304 renewed the TTL
+    clock.now += 59
+    assert cache.get('https://example.com/a', endpoint='test').from_cache
+    assert len(upstream.requests) == 2
+
+
+def test_stale_entries_are_served_only_within_max_stale(cache, upstream, clock):
+    upstream.replies.append(FakeResponse(content=b'one'))
+    cache.get('https://example.com/a', endpoint='test')
+    clock.now += 60 + 120
+    upstream.replies.append(requests.ConnectionError())
+    assert cache.get('https://example.com/a', endpoint='test').content == b'one'
+    clock.now += 1
+    upstream.replies.append(requests.ConnectionError())
+    with pytest.raises(requests.ConnectionError):
+        cache.get('https://example.com/a', endpoint='test')
+
+
+def test_error_responses_are_not_stored(cache, upstream, clock):
+    upstream.replies += [FakeResponse(status_code=503, content=b'down'), FakeResponse(content=b'up')]
+    assert cache.get('https://example.com/a', endpoint='test').status_code == 503
+    assert cache.get('https://example.com/a', endpoint='test').content == b'up'
+
+
+def test_eviction_drops_least_recently_used_first(cache, upstream, clock):
+    cache.max_bytes = 2500
+    for name in 'abc':
+        clock.now += 1
+        upstream.replies.append(FakeResponse(content=b'x' * 1000))
+        cache.get(f'https://example.com/{name}', endpoint='test')
+    # A fresh hit on 'a' makes 'b' the oldest; it is flushed with the next write
+    clock.now += 1
+    cache.get('https://example.com/a', endpoint='test')
+    clock.now += 1
+    cache.writes = 49  # the next store runs eviction
+    upstream.replies.append(FakeResponse(content=b'x' * 1000))
+    cache.get('https://example.com/d', endpoint='test')
+    keys = {row[0] for row in cache.db.execute("SELECT key FROM responses")}
+    # 4000 bytes over a 2500 budget: evict down to 2250, so the two oldest go
+    assert keys == {cache.cache_key('https://example.com/a'), cache.cache_key('https://example.com/d')}
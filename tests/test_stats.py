@@ -0,0 +1,62 @@
+import bot
+
+
+def make_alert(coin_id, user_id='1', triggered=False):
+    return bot.AlertRecord.from_dict({'coin_id': coin_id, 'user_id': user_id, 'triggered': triggered})
+
+
+def test_rolling_counter_counts_within_window():
+    counter = bot.RollingCounter(3600, bucket=60)
+    counter.add('alerts', now=1000)
+    counter.add('alerts', 2, now=1030)
+    counter.add('news', now=2000)
+    assert counter.get('alerts', now=2000) == 3
+    assert counter.get('news', now=2000) == 1
+    assert counter.get('missing', now=2000) == 0
+
+
+def test_rolling_counter_expires_whole_buckets():
+    counter = bot.RollingCounter(600, bucket=60)
+    counter.add('x', now=0)     # bucket [0, 60)
+    counter.add('x', now=59)
+    counter.add('x', now=120)   # bucket [120, 180)
+    assert len(counter.buckets) == 2
+    assert counter.get('x', now=599) == 3
+    assert counter.get('x', now=600) == 1  # first bucket aged out
+    assert counter.get('x', now=720) == 0
+    assert not counter.buckets
+
+
+def test_rolling_counter_expires_on_add():
+    counter = bot.RollingCounter(60, bucket=10)
+    for now in range(0, 1000, 5):
+        counter.add('x', now=now)
+    assert len(counter.buckets) <= 7
+    assert counter.get('x', now=995) == 12
+
+
+def test_registry_seed_ignores_triggered_alerts():
+    registry = bot.StatsRegistry()
+    registry.seed({'1': [make_alert('bitcoin'), make_alert('ethereum', triggered=True)]}, {'expired': 4})
+    assert registry.alert_users == {'1': 1}
+    assert registry.alert_coins == {'bitcoin': 1}
+    assert registry.archived == {'expired': 4}
+
+
+def test_registry_removal_only_moves_counted_alerts():
+    live, legacy = make_alert('bitcoin'), make_alert('ethereum', triggered=True)
+    registry = bot.StatsRegistry()
+    registry.seed({'1': [live, legacy]}, {})
+    registry.alerts_removed([live], 'cleared')
+    registry.alerts_archived([legacy], 'cleared')
+    assert not registry.alert_users
+    assert not registry.alert_coins
+    assert registry.archived == {'cleared': 2}
+    assert registry.events['alerts_cleared'] == 1
+
+
+def test_registry_archive_pruned_drops_empty_reasons():
+    registry = bot.StatsRegistry()
+    registry.seed({}, {'triggered': 3, 'expired': 1})
+    registry.archive_pruned({'triggered': 1, 'expired': 1})
+    assert registry.archived == {'triggered': 2}